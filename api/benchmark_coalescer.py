@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark micro-batching (PredictionCoalescer) untuk /api/predict/:
+throughput vs latency untuk beberapa kombinasi max_wait_ms dan max_batch_size,
+dibandingkan dengan scoring langsung per request (tanpa coalescing).
+
+Usage: python benchmark_coalescer.py [model_version] [--clients 1,8,32] [--duration 3]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from prediction.coalescer import PredictionCoalescer
+from prediction.ml_model import NaiveBayesModel
+from prediction.model_manager import ModelManager
+
+SETTINGS = [
+    # (max_wait_ms, max_batch_size); None = tanpa coalescing
+    None,
+    (1, 8),
+    (2, 16),
+    (5, 32),
+    (10, 64),
+]
+
+
+def build_scorer(version):
+    mm = ModelManager()
+    predictor = NaiveBayesModel.from_model_data(mm.load_model(version))
+
+    def score_batch(judul_list, model_version=None):
+        return predictor.predict_batch(judul_list), version
+
+    return score_batch
+
+
+def run_load(submit, titles, clients, duration):
+    """Jalankan `clients` thread yang masing-masing mengirim request berurutan selama `duration` detik"""
+    latencies = [[] for _ in range(clients)]
+    stop_at = time.perf_counter() + duration
+
+    def client(idx):
+        i = idx
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            submit(titles[i % len(titles)])
+            latencies[idx].append(time.perf_counter() - start)
+            i += clients
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    all_latencies = np.array([lat for per_client in latencies for lat in per_client]) * 1000
+    return {
+        'throughput': len(all_latencies) / duration,
+        'p50': float(np.percentile(all_latencies, 50)),
+        'p95': float(np.percentile(all_latencies, 95)),
+        'p99': float(np.percentile(all_latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model_version", nargs="?", default=None)
+    parser.add_argument("--clients", default="1,8,32,64")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    version = args.model_version or ModelManager().get_latest_version()
+    score_batch = build_scorer(version)
+    titles = pd.read_csv(Path(__file__).parent / "data.csv").iloc[:, 0].astype(str).tolist()
+
+    print("=" * 80)
+    print(f"📈 COALESCER BENCHMARK - model v{version}")
+    print("=" * 80)
+    print(f"{'clients':>8} {'setting':>16} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+
+    for clients in [int(c) for c in args.clients.split(",")]:
+        for setting in SETTINGS:
+            if setting is None:
+                label = "direct"
+                lock = threading.Lock()
+
+                def submit(judul):
+                    # Satu worker memproses satu request pada satu waktu
+                    with lock:
+                        score_batch([judul])
+            else:
+                max_wait_ms, max_batch_size = setting
+                label = f"{max_wait_ms}ms/{max_batch_size}"
+                coalescer = PredictionCoalescer(score_batch, max_wait_ms=max_wait_ms, max_batch_size=max_batch_size)
+
+                def submit(judul, coalescer=coalescer):
+                    coalescer.submit(judul).result()
+
+            stats = run_load(submit, titles, clients, args.duration)
+            print(
+                f"{clients:>8} {label:>16} {stats['throughput']:>10.1f} "
+                f"{stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f}"
+            )
+        print("-" * 80)
+
+
+if __name__ == "__main__":
+    main()
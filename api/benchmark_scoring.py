@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cek kesetaraan numerik dan benchmark scoring kernel (prediction/scoring.py)
+terhadap jalur lama: predict_proba sklearn + keyword boost + renormalisasi per judul.
+
+Usage: python benchmark_scoring.py [model_version ...] [--repeat 200]
+Exit code 1 jika ada versi yang hasilnya berbeda (prediksi atau |Δp| > 1e-9).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from prediction.ml_model import NaiveBayesModel
+from prediction.model_manager import ModelManager
+
+TOLERANCE = 1e-9
+
+
+def reference_predict_batch(predictor, judul_list):
+    """Jalur scoring sebelum kernel (acuan untuk cek kesetaraan)"""
+    preprocess_fn = predictor.preprocessor or predictor.preprocess
+    judul_clean_list = [preprocess_fn(judul) for judul in judul_list]
+    X = predictor.vectorizer.transform(judul_clean_list)
+    if predictor.selector:
+        X = predictor.selector.transform(X)
+
+    probabilities_matrix = predictor.model.predict_proba(X)
+    classes = predictor.model.classes_
+
+    results = []
+    for judul_clean, probabilities in zip(judul_clean_list, probabilities_matrix):
+        keyword_scores = predictor.calculate_keyword_score(judul_clean)
+        animasi_features = predictor.extract_animasi_features(judul_clean)
+        animasi_boost = 1.0
+        if animasi_features['animasi_total_score'] >= 2:
+            animasi_boost = 1.9
+        elif animasi_features['animasi_total_score'] == 1:
+            animasi_boost = 1.4
+
+        boosted_probs = []
+        for i, cls in enumerate(classes):
+            boost = 1 + (keyword_scores.get(cls, 0) * predictor.KEYWORD_BOOST_FACTOR)
+            if cls == 'Animasi':
+                boost *= animasi_boost
+            boosted_probs.append(probabilities[i] * boost)
+
+        total = sum(boosted_probs)
+        boosted_probs = [p / total for p in boosted_probs]
+        prediction = classes[np.argmax(boosted_probs)]
+        results.append({"prediction": prediction,
+                        "probabilities": {classes[i]: float(boosted_probs[i]) for i in range(len(classes))}})
+    return results
+
+
+def compare(predictor, titles):
+    expected = reference_predict_batch(predictor, titles)
+    actual = predictor.predict_batch(titles)
+    mismatches = sum(1 for e, a in zip(expected, actual) if e['prediction'] != a['prediction'])
+    max_diff = max(
+        abs(e['probabilities'][cls] - a['probabilities'][cls])
+        for e, a in zip(expected, actual) for cls in e['probabilities']
+    )
+    return mismatches, max_diff
+
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model_versions", nargs="*")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    mm = ModelManager()
+    versions = args.model_versions or [m['version'] for m in mm.list_models()]
+    base = Path(__file__).parent
+    titles = pd.concat([
+        pd.read_csv(base / "data.csv").iloc[:, 0],
+        pd.read_csv(base / "data_old.csv").iloc[:, 0],
+    ]).astype(str).tolist()
+    batch = titles[:64]
+
+    print("=" * 96)
+    print(f"📈 SCORING KERNEL - {len(titles)} judul, repeat={args.repeat}")
+    print("=" * 96)
+    print(f"{'version':>10} {'mismatch':>9} {'max |Δp|':>10} "
+          f"{'1x old µs':>10} {'1x new µs':>10} {'64x old µs':>11} {'64x new µs':>11} {'speedup':>8}")
+
+    failed = False
+    for version in versions:
+        predictor = NaiveBayesModel.from_model_data(mm.load_model(version))
+        mismatches, max_diff = compare(predictor, titles)
+        failed |= mismatches > 0 or max_diff > TOLERANCE
+
+        one = titles[:1]
+        old_one = time_per_call(lambda: reference_predict_batch(predictor, one), args.repeat)
+        new_one = time_per_call(lambda: predictor.predict_batch(one), args.repeat)
+        old_batch = time_per_call(lambda: reference_predict_batch(predictor, batch), args.repeat // 4 or 1)
+        new_batch = time_per_call(lambda: predictor.predict_batch(batch), args.repeat // 4 or 1)
+        print(f"{version:>10} {mismatches:>9} {max_diff:>10.1e} {old_one:>10.1f} {new_one:>10.1f} "
+              f"{old_batch:>11.1f} {new_batch:>11.1f} {old_batch / new_batch:>7.2f}x")
+
+    print("-" * 96)
+    print("❌ Hasil berbeda" if failed else "✅ Kernel setara dengan jalur lama")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
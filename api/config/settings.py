@@ -167,13 +167,55 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [],
     "DEFAULT_PERMISSION_CLASSES": [],
     "UNAUTHENTICATED_USER": None,
+    # Token buckets in Redis, shared by all workers (see prediction/throttling.py)
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
+        "prediction.throttling.RedisRateThrottle",
     ],
+    # Per client IP per scope; "<scope>_session" adds a per-session_id budget
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "100/hour",
+        "anon": os.getenv("THROTTLE_RATE_ANON", "100/hour"),
+        "predict": os.getenv("THROTTLE_RATE_PREDICT", "100/hour"),
+        "predict_session": os.getenv("THROTTLE_RATE_PREDICT_SESSION", "100/hour"),
+        # One token per upload, whatever its row count
+        "bulk": os.getenv("THROTTLE_RATE_BULK", "10/hour"),
+        "analyze": os.getenv("THROTTLE_RATE_ANALYZE", "100/hour"),
+        "train": os.getenv("THROTTLE_RATE_TRAIN", "100/hour"),
     },
 }
 
+# Bearer token for admin endpoints (POST /api/models/activate/); unset: open in DEBUG only
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+
+# Bounded thread pool used by the async views for CPU-bound scoring
+PREDICTION_THREAD_POOL_SIZE = int(os.getenv("PREDICTION_THREAD_POOL_SIZE", "4"))
+
+# Micro-batching of concurrent /api/predict/ calls (see prediction/coalescer.py)
+PREDICTION_COALESCING = os.getenv("PREDICTION_COALESCING", "False") == "True"
+PREDICTION_COALESCE_MAX_WAIT_MS = float(os.getenv("PREDICTION_COALESCE_MAX_WAIT_MS", "5"))
+PREDICTION_COALESCE_MAX_BATCH_SIZE = int(os.getenv("PREDICTION_COALESCE_MAX_BATCH_SIZE", "32"))
+# Longest a sync /api/predict/ waits for its coalesced result before giving up with 503
+PREDICTION_COALESCE_TIMEOUT_S = float(os.getenv("PREDICTION_COALESCE_TIMEOUT_S", "30"))
+
+# /api/predict/bulk/: titles scored per chunk of the streamed upload
+BULK_PREDICTION_CHUNK_SIZE = int(os.getenv("BULK_PREDICTION_CHUNK_SIZE", "512"))
+
+# Shadow scoring of a candidate version on live /api/predict/ traffic (see prediction/shadow.py)
+SHADOW_MODEL_VERSION = os.getenv("SHADOW_MODEL_VERSION", "")
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
+SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "64"))
+SHADOW_MAX_WAIT_MS = float(os.getenv("SHADOW_MAX_WAIT_MS", "50"))
+
+# Time-bucketed counters of live predictions served at /api/monitoring/ (see prediction/monitoring.py)
+MONITORING_ENABLED = os.getenv("MONITORING_ENABLED", "True") == "True"
+MONITORING_BUCKET_SECONDS = int(os.getenv("MONITORING_BUCKET_SECONDS", "3600"))
+MONITORING_RETENTION_BUCKETS = int(os.getenv("MONITORING_RETENTION_BUCKETS", "168"))
+MONITORING_QUEUE_SIZE = int(os.getenv("MONITORING_QUEUE_SIZE", "10000"))
+MONITORING_BATCH_SIZE = int(os.getenv("MONITORING_BATCH_SIZE", "256"))
+MONITORING_MAX_WAIT_MS = float(os.getenv("MONITORING_MAX_WAIT_MS", "500"))
+
+# Token-set Jaccard above which a predicted title counts as a near-duplicate of a training
+# title of the serving version (see prediction/near_duplicates.py); 0 disables the check
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -0,0 +1,378 @@
+"""
+Model analysis split into independently computable sections.
+
+``/api/analyze/?sections=performance,confusion`` computes only what those sections need:
+intermediate artifacts (the TF-IDF matrix, cross-validated predictions, probabilities,
+...) are built lazily on first use, and every section result is cached on its own,
+keyed by the fitted model, the dataset hash and the preprocessing config. Analysis
+pages therefore stop paying for each other's work, and asking for one section again
+(or from another page) is a cache hit as long as the model and data are unchanged.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+from sklearn.model_selection import cross_val_predict, cross_val_score
+from sklearn.naive_bayes import MultinomialNB
+
+from .corpus_cache import corpus_cache
+from .nb_diagnostics import naive_bayes_diagnostics
+
+logger = logging.getLogger(__name__)
+
+# Section name -> response keys it fills (nested keys live under "naive_bayes_specific")
+SECTIONS = OrderedDict([
+    ('summary', ['model_type', 'total_samples', 'classes', 'class_distribution', 'model_parameters']),
+    ('performance', ['performance', 'model_health']),
+    ('confusion', ['per_class_metrics', 'confusion_matrix']),
+    ('overlap', ['class_overlap', 'naive_bayes_specific.prediction_confidence_distribution']),
+    ('features', ['top_features_per_class', 'naive_bayes_specific.tfidf_vectorizer_stats']),
+    ('naive_bayes', [
+        'naive_bayes_specific.class_priors',
+        'naive_bayes_specific.feature_log_probabilities',
+        'naive_bayes_specific.feature_counts_per_class',
+        'naive_bayes_specific.laplace_smoothing_impact',
+        'naive_bayes_specific.zero_probability_features',
+        'naive_bayes_specific.class_separability_kl_divergence',
+    ]),
+    ('independence', ['naive_bayes_specific.conditional_independence']),
+    ('misclassification', ['naive_bayes_specific.misclassification_patterns']),
+    ('learning_curve', ['learning_curve']),
+])
+
+
+def parse_sections(value) -> List[str]:
+    """Section names from a ``sections=a,b`` query value (all sections when empty); raises ValueError"""
+    if not value:
+        return list(SECTIONS)
+    requested = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections {unknown}, expected any of {list(SECTIONS)}")
+    return [name for name in SECTIONS if name in requested]
+
+
+class SectionCache:
+    """Small LRU of computed sections and shared intermediates"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+section_cache = SectionCache()
+
+
+def model_fingerprint(predictor) -> str:
+    """Identity of a fitted pipeline: estimator params and arrays, vectorizer state and selector"""
+    estimator = predictor.model
+    hasher = hashlib.sha256(f"{type(estimator).__name__}{sorted(estimator.get_params().items())!r}".encode('utf-8'))
+    for name in ('classes_', 'class_count_', 'feature_count_'):
+        hasher.update(np.ascontiguousarray(getattr(estimator, name)).tobytes())
+    hasher.update(corpus_cache.fitted_fingerprint(predictor.vectorizer).encode('utf-8'))
+    if predictor.selector is not None:
+        hasher.update(repr(predictor.selector).encode('utf-8'))
+        hasher.update(np.ascontiguousarray(predictor.selector.get_support()).tobytes())
+    return hasher.hexdigest()
+
+
+class ModelAnalysis:
+    """Lazily computed analysis of one fitted predictor on one preprocessed dataset"""
+
+    def __init__(self, predictor, df, X, y, X_key: str, cache: Optional[SectionCache] = None):
+        self.predictor = predictor
+        self.model = predictor.model
+        self.vectorizer = predictor.vectorizer
+        self.df = df
+        self.X = X
+        self.y = y
+        self.X_key = X_key
+        self.cache = cache or section_cache
+        self.fingerprint = model_fingerprint(predictor)
+        self._local = {}
+
+    def _cached(self, name, compute, shared=True):
+        """Compute ``name`` once per request; ``shared`` results are also kept across requests"""
+        if name not in self._local:
+            if shared:
+                self._local[name] = self.cache.get_or_compute((self.fingerprint, self.X_key, name), compute)
+            else:
+                self._local[name] = compute()
+        return self._local[name]
+
+    # Intermediates -------------------------------------------------------
+
+    @property
+    def X_vectorized(self):
+        def compute():
+            X_vectorized = corpus_cache.transform(self.X_key, self.vectorizer, self.X)
+            # v3.0: No feature selection
+            if self.predictor.selector:
+                X_vectorized = self.predictor.selector.transform(X_vectorized)
+            return X_vectorized
+        return self._cached('X_vectorized', compute, shared=False)
+
+    @property
+    def y_pred(self):
+        return self._cached('y_pred', lambda: self.model.predict(self.X_vectorized), shared=False)
+
+    @property
+    def cv_scores(self):
+        # Cross-validation scores
+        return self._cached(
+            'cv_scores', lambda: cross_val_score(self.model, self.X_vectorized, self.y, cv=5, scoring="accuracy")
+        )
+
+    @property
+    def y_pred_cv(self):
+        # Cross-validated predictions (confusion matrix, per-class metrics, misclassifications)
+        return self._cached('y_pred_cv', lambda: cross_val_predict(self.model, self.X_vectorized, self.y, cv=5))
+
+    @property
+    def max_probas(self):
+        return self._cached('max_probas', lambda: np.max(self.probas, axis=1), shared=False)
+
+    @property
+    def probas(self):
+        return self._cached('probas', lambda: self.model.predict_proba(self.X_vectorized), shared=False)
+
+    # Sections ------------------------------------------------------------
+
+    def run(self, sections: List[str]) -> Dict:
+        """Merged response for ``sections`` (each computed at most once per cache lifetime)"""
+        analysis = {}
+        for name in sections:
+            result = self._cached(f"section:{name}", getattr(self, f"_section_{name}"))
+            for key, value in result.items():
+                if key == 'naive_bayes_specific':
+                    analysis.setdefault(key, {}).update(value)
+                else:
+                    analysis[key] = value
+        return analysis
+
+    def _section_summary(self):
+        return {
+            "model_type": "Multinomial Naive Bayes",
+            "total_samples": len(self.df),
+            "classes": self.model.classes_.tolist(),
+            "class_distribution": self.y.value_counts().to_dict(),
+            "model_parameters": {
+                "alpha": float(self.model.alpha),
+                "n_features": int(self.model.feature_count_.shape[1]),
+                "vectorizer_max_features": self.vectorizer.max_features,
+                "ngram_range": self.vectorizer.ngram_range,
+            },
+        }
+
+    def _section_performance(self):
+        # Training accuracy
+        train_accuracy = self.model.score(self.X_vectorized, self.y)
+        cv_scores = self.cv_scores
+
+        # Overfitting/Underfitting analysis
+        variance = float(np.var(cv_scores))
+        bias = 1 - float(np.mean(cv_scores))
+        overfitting_score = train_accuracy - float(np.mean(cv_scores))
+
+        return {
+            "performance": {
+                "train_accuracy": float(train_accuracy),
+                "cv_mean_accuracy": float(np.mean(cv_scores)),
+                "cv_std_accuracy": float(np.std(cv_scores)),
+                "cv_scores": cv_scores.tolist(),
+            },
+            "model_health": {
+                "overfitting_score": float(overfitting_score),
+                "overfitting_status": (
+                    "High" if overfitting_score > 0.2 else "Moderate" if overfitting_score > 0.15 else "Low"
+                ),
+                "variance": float(variance),
+                "bias": float(bias),
+                "underfitting_status": "High" if bias > 0.3 else "Moderate" if bias > 0.15 else "Low",
+            },
+        }
+
+    def _section_confusion(self):
+        y, y_pred_cv = self.y, self.y_pred_cv
+
+        # Confusion matrices
+        cm_train = confusion_matrix(y, self.y_pred)
+        cm_cv = confusion_matrix(y, y_pred_cv)
+
+        # Classification reports
+        precision, recall, f1, support = precision_recall_fscore_support(
+            y, y_pred_cv, average=None, labels=self.model.classes_
+        )
+
+        # Per-class metrics
+        class_metrics = {}
+        for i, cls in enumerate(self.model.classes_):
+            class_metrics[cls] = {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1_score": float(f1[i]),
+                "support": int(support[i]),
+            }
+
+        return {
+            "per_class_metrics": class_metrics,
+            "confusion_matrix": {
+                "train": cm_train.tolist(),
+                "cross_validation": cm_cv.tolist(),
+                "labels": self.model.classes_.tolist(),
+            },
+        }
+
+    def _section_overlap(self):
+        # Class overlap analysis
+        max_probas = self.max_probas
+        second_max_probas = np.partition(self.probas, -2, axis=1)[:, -2]
+        confidence_gap = max_probas - second_max_probas
+
+        return {
+            "class_overlap": {
+                "avg_confidence": float(np.mean(max_probas)),
+                "avg_confidence_gap": float(np.mean(confidence_gap)),
+                "low_confidence_samples": int(np.sum(max_probas < 0.5)),
+                "high_overlap_samples": int(np.sum(confidence_gap < 0.1)),
+            },
+            "naive_bayes_specific": {
+                # Prediction confidence distribution
+                "prediction_confidence_distribution": {
+                    "very_high (>0.9)": int(np.sum(max_probas > 0.9)),
+                    "high (0.7-0.9)": int(np.sum((max_probas > 0.7) & (max_probas <= 0.9))),
+                    "medium (0.5-0.7)": int(np.sum((max_probas > 0.5) & (max_probas <= 0.7))),
+                    "low (<0.5)": int(np.sum(max_probas <= 0.5)),
+                },
+            },
+        }
+
+    def _section_features(self):
+        X_vectorized = self.X_vectorized
+
+        # Feature importance (top features per class)
+        feature_names = self.vectorizer.get_feature_names_out()
+        top_features = {}
+        for i, cls in enumerate(self.model.classes_):
+            feature_log_prob = self.model.feature_log_prob_[i]
+            top_indices = np.argsort(feature_log_prob)[-10:][::-1]
+            top_features[cls] = [feature_names[idx] for idx in top_indices]
+
+        # TF-IDF statistics
+        tfidf_stats = {
+            "vocabulary_size": len(feature_names),
+            "avg_document_length": float(np.mean(np.asarray(X_vectorized.sum(axis=1)))),
+            "sparsity": float(1.0 - (X_vectorized.nnz / (X_vectorized.shape[0] * X_vectorized.shape[1]))),
+            "max_features": self.vectorizer.max_features,
+            "ngram_range": self.vectorizer.ngram_range,
+            "min_df": self.vectorizer.min_df,
+            "max_df": self.vectorizer.max_df,
+        }
+
+        return {
+            "top_features_per_class": top_features,
+            "naive_bayes_specific": {"tfidf_vectorizer_stats": tfidf_stats},
+        }
+
+    def _section_naive_bayes(self):
+        # Model-only diagnostics (priors, log-probs, counts, smoothing, zero-prob, KL), vectorized
+        return {"naive_bayes_specific": naive_bayes_diagnostics(self.model)}
+
+    def _section_independence(self):
+        # Conditional independence assumption violation check
+        # Calculate feature correlation in TF-IDF space
+        X_dense = self.X_vectorized.toarray()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            feature_corr = np.corrcoef(X_dense.T)
+            feature_corr = np.nan_to_num(feature_corr, nan=0.0, posinf=0.0, neginf=0.0)
+        high_corr_pairs = np.sum(np.abs(feature_corr) > 0.7) - len(feature_corr)  # exclude diagonal
+        total_pairs = len(feature_corr) * (len(feature_corr) - 1)
+        independence_violation_ratio = float(high_corr_pairs / total_pairs) if total_pairs > 0 else 0.0
+
+        return {
+            "naive_bayes_specific": {
+                "conditional_independence": {
+                    "violation_ratio": float(independence_violation_ratio),
+                    "status": (
+                        "High Violation"
+                        if independence_violation_ratio > 0.3
+                        else "Moderate" if independence_violation_ratio > 0.1 else "Low Violation"
+                    ),
+                    "note": "Naive Bayes assumes feature independence. High violation may affect performance.",
+                },
+            },
+        }
+
+    def _section_misclassification(self):
+        # Misclassification analysis
+        y, y_pred_cv = self.y, self.y_pred_cv
+        misclassified_indices = np.where(y_pred_cv != y)[0]
+        misclassification_patterns = {}
+        for idx in misclassified_indices:
+            true_label = y.iloc[idx]
+            pred_label = y_pred_cv[idx]
+            key = f"{true_label}_misclassified_as_{pred_label}"
+            misclassification_patterns[key] = misclassification_patterns.get(key, 0) + 1
+
+        return {"naive_bayes_specific": {"misclassification_patterns": misclassification_patterns}}
+
+    def _section_learning_curve(self):
+        # LEARNING CURVE for visualization
+        learning_curve = []
+
+        # Use current model's configuration
+        current_alpha = self.model.alpha
+        current_ngram = self.vectorizer.ngram_range if hasattr(self.vectorizer, 'ngram_range') else (1, 2)
+
+        # Detect stopwords (smart vs domain)
+        if hasattr(self.predictor, 'smart_stopwords'):
+            stopwords = self.predictor.smart_stopwords
+        else:
+            stopwords = getattr(self.predictor, 'domain_stopwords', [
+                'sistem', 'implementasi', 'berbasis', 'aplikasi', 'informasi',
+                'web', 'teknologi', 'media', 'padang', 'politeknik', 'negeri',
+                'perancangan', 'metod', 'menggunakan', 'dengan', 'untuk', 'pada'
+            ])
+
+        for features in [20, 40, 60, 80, 100]:
+            temp_vec = TfidfVectorizer(
+                max_features=features,
+                ngram_range=current_ngram,
+                min_df=1,
+                max_df=1.0,
+                sublinear_tf=True,
+                stop_words=stopwords
+            )
+            _, X_temp = corpus_cache.fit_transform(self.X_key, temp_vec, self.X)
+            temp_model = MultinomialNB(alpha=current_alpha, fit_prior=True)
+            temp_model.fit(X_temp, self.y)
+
+            train_acc = temp_model.score(X_temp, self.y) * 100
+            cv_acc = float(np.mean(cross_val_score(temp_model, X_temp, self.y, cv=5))) * 100
+
+            learning_curve.append({
+                'complexity': features,
+                'training': round(train_acc, 2),
+                'validation': round(cv_acc, 2)
+            })
+
+        return {"learning_curve": learning_curve}
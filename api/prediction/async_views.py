@@ -0,0 +1,157 @@
+"""
+Async (ASGI) versions of the predict and history endpoints.
+
+These views run natively on the event loop under uvicorn: Redis is accessed
+through redis.asyncio and CPU-bound scoring is offloaded to a bounded thread
+pool, so a slow Redis call or a long transform never pins the worker.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .ml_model import ModelNotLoadedError
+from .model_manager import ModelIntegrityError
+from .redis_client import AsyncRedisHistoryManager
+from .throttling import PredictRateThrottle, throttle_response
+from .views import (
+    observe_prediction, parse_explain, parse_history_query, prediction_coalescer,
+    score_titles, with_explanation,
+)
+
+logger = logging.getLogger(__name__)
+
+scoring_executor = ThreadPoolExecutor(
+    max_workers=settings.PREDICTION_THREAD_POOL_SIZE,
+    thread_name_prefix="predict",
+)
+async_history_manager = AsyncRedisHistoryManager()
+
+
+async def _throttled(request, session_id):
+    """Same ``predict`` buckets as the sync views; the Redis round trip runs off the event loop"""
+    return await sync_to_async(throttle_response, thread_sensitive=False)(PredictRateThrottle(), request, session_id)
+
+
+def _score(judul, model_version, explain_top_k=None):
+    """Score one title in the thread pool, returns (result, resolved_version)"""
+    results, model_version = score_titles([judul], model_version, explain_top_k)
+    return results[0], model_version
+
+
+@csrf_exempt
+@require_POST
+async def predict_kbk(request):
+    try:
+        payload = json.loads(request.body or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    judul = payload.get("judul", "")
+    model_version = payload.get("model_version")  # Optional
+    session_id = payload.get("session_id")  # Optional for history
+
+    throttled = await _throttled(request, session_id)
+    if throttled:
+        return throttled
+
+    if not judul:
+        return JsonResponse({"error": "Judul is required"}, status=400)
+
+    if not isinstance(judul, str):
+        return JsonResponse({"error": "Judul must be a string"}, status=400)
+
+    try:
+        explain_top_k = parse_explain(payload)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    try:
+        start = time.perf_counter()
+        if prediction_coalescer is not None and not explain_top_k:
+            future = prediction_coalescer.submit(judul, model_version)
+            try:
+                result, model_version = await asyncio.wait_for(
+                    asyncio.wrap_future(future), settings.PREDICTION_COALESCE_TIMEOUT_S
+                )
+            except asyncio.TimeoutError:
+                future.cancel()
+                logger.error("Coalesced prediction timed out")
+                return JsonResponse({"error": "Prediction timed out"}, status=503)
+        else:
+            loop = asyncio.get_running_loop()
+            result, model_version = await loop.run_in_executor(
+                scoring_executor, _score, judul, model_version, explain_top_k
+            )
+
+        observe_prediction(judul, model_version, result, (time.perf_counter() - start) * 1000)
+
+        response_data = {
+            "judul": judul,
+            "predicted_kbk": result["prediction"],
+            "probabilities": result["probabilities"],
+            "model_version": model_version,
+            "near_duplicates": result.get("near_duplicates")
+        }
+
+        # Save to history if session_id provided
+        if session_id and model_version != "legacy":
+            try:
+                await async_history_manager.add_history(session_id, response_data)
+            except Exception as e:
+                logger.warning(f"Failed to save history: {e}")
+
+        return JsonResponse(with_explanation(response_data, result))
+
+    except FileNotFoundError as e:
+        logger.error(f"Model not found: {e}")
+        return JsonResponse({"error": str(e)}, status=404)
+    except ModelNotLoadedError:
+        logger.error("Model not loaded")
+        return JsonResponse({"error": "Model not available"}, status=503)
+    except ModelIntegrityError as e:
+        logger.error(f"Model integrity check failed: {e}")
+        return JsonResponse({"error": "Model files failed integrity check"}, status=503)
+    except Exception as e:
+        logger.error(f"Prediction error: {e}")
+        return JsonResponse({"error": "An error occurred during prediction"}, status=500)
+
+
+@require_GET
+async def get_history(request):
+    """Get one page of prediction history for session, optionally filtered"""
+    session_id = request.GET.get("session_id")
+
+    throttled = await _throttled(request, session_id)
+    if throttled:
+        return throttled
+
+    if not session_id:
+        return JsonResponse({"error": "session_id is required"}, status=400)
+
+    try:
+        query = parse_history_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    try:
+        history, next_cursor = await async_history_manager.query_history(session_id, **query)
+        return JsonResponse({
+            "session_id": session_id,
+            "history": history,
+            "count": len(history),
+            "next_cursor": next_cursor
+        })
+    except Exception as e:
+        logger.error(f"Error getting history: {e}")
+        return JsonResponse({"error": "Failed to get history"}, status=500)
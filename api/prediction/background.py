@@ -0,0 +1,75 @@
+import logging
+import queue
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundQueue(ABC):
+    """Bounded in-process queue drained in batches by a daemon thread
+
+    ``offer`` never blocks: when the queue is full the item is dropped and counted,
+    so the request path pays for one ``put_nowait`` at most. Subclasses implement
+    ``process(batch)``, which runs on the worker thread with up to ``batch_size``
+    items collected for at most ``max_wait_ms``.
+    """
+
+    name = "background"
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 64, max_wait_ms: float = 50.0):
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.dropped = 0
+
+    def offer(self, item: Any) -> bool:
+        """Queue ``item`` for background processing; False if it was dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        # Started lazily so forked workers each get their own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[Any]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self.process(batch)
+            except Exception as e:
+                logger.warning(f"{self.name}: failed to process {len(batch)} item(s): {e}")
+
+    @abstractmethod
+    def process(self, batch: List[Any]):
+        """Handle one batch on the worker thread (exceptions are logged, the thread keeps going)"""
@@ -0,0 +1,126 @@
+"""
+Bulk classification: title readers for NDJSON/CSV streams and chunked scoring.
+
+Input is consumed line by line and scored ``chunk_size`` titles at a time with one
+predictor, so memory is bounded by the chunk size whatever the input length, and
+output for the first chunk is produced before the rest of the input is read.
+Used by the streaming ``/api/predict/bulk/`` endpoint.
+"""
+
+import codecs
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .ingestion import SCHEMAS, normalize_header
+
+DEFAULT_CHUNK_SIZE = 512
+TITLE_ALIASES = [alias for schema in SCHEMAS for alias in schema['text_aliases']]
+ID_ALIASES = ['id', 'nim', 'no']
+CSV_FIELDS = ['line', 'id', 'judul', 'predicted_kbk', 'probabilities', 'error']
+
+
+def title_column(header) -> int:
+    """Index of the title column in a header row (known title aliases, else the first column)"""
+    normalized = [normalize_header(name) for name in header]
+    for alias in TITLE_ALIASES:
+        if alias in normalized:
+            return normalized.index(alias)
+    return 0
+
+
+def id_column(header) -> Optional[int]:
+    normalized = [normalize_header(name) for name in header]
+    return next((normalized.index(alias) for alias in ID_ALIASES if alias in normalized), None)
+
+
+def _record(line: int, judul, record_id=None) -> Dict:
+    record = {"line": line, "judul": judul}
+    if record_id is not None:
+        record["id"] = record_id
+    if not isinstance(judul, str) or not judul.strip():
+        record["error"] = "Judul is required"
+    return record
+
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[Dict]:
+    """Records from NDJSON lines: ``{"judul": ..., "id": ...}`` objects or bare JSON strings"""
+    for line_no, raw in enumerate(codecs.iterdecode(lines, 'utf-8-sig'), start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            yield {"line": line_no, "error": "Invalid JSON"}
+            continue
+        if isinstance(value, dict):
+            yield _record(line_no, value.get("judul"), value.get("id"))
+        else:
+            yield _record(line_no, value)
+
+
+def iter_csv(lines: Iterable[bytes]) -> Iterator[Dict]:
+    """Records from CSV lines with a header row (title column detected from the header)"""
+    reader = csv.reader(codecs.iterdecode(lines, 'utf-8-sig'))
+    header = next(reader, None)
+    if header is None:
+        return
+    text_index, id_index = title_column(header), id_column(header)
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        judul = row[text_index] if text_index < len(row) else None
+        record_id = row[id_index] if id_index is not None and id_index < len(row) else None
+        yield _record(reader.line_num, judul, record_id)
+
+
+def iter_chunks(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_records(predictor, records: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """Score records chunk by chunk with one predict_batch call per chunk; yields scored chunks"""
+    for chunk in iter_chunks(records, chunk_size):
+        valid = [record for record in chunk if "error" not in record]
+        if valid:
+            results = predictor.predict_batch([record["judul"] for record in valid])
+            for record, result in zip(valid, results):
+                record["predicted_kbk"] = str(result["prediction"])
+                record["probabilities"] = result["probabilities"]
+        yield chunk
+
+
+def ndjson_chunk(chunk: List[Dict]) -> bytes:
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in chunk).encode('utf-8')
+
+
+def csv_header() -> bytes:
+    return csv_chunk(None)
+
+
+def csv_chunk(chunk: Optional[List[Dict]]) -> bytes:
+    """CSV bytes for a scored chunk (the header row when ``chunk`` is None)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if chunk is None:
+        writer.writerow(CSV_FIELDS)
+    for record in chunk or []:
+        probabilities = record.get("probabilities")
+        writer.writerow([
+            record.get("line"),
+            record.get("id", ""),
+            record.get("judul", ""),
+            record.get("predicted_kbk", ""),
+            json.dumps(probabilities, ensure_ascii=False) if probabilities else "",
+            record.get("error", ""),
+        ])
+    return buffer.getvalue().encode('utf-8')
@@ -0,0 +1,86 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCoalescer:
+    """Coalesce concurrent single-title predictions into batched scoring calls
+
+    Requests are collected for at most ``max_wait_ms`` (or until ``max_batch_size``
+    titles are waiting), grouped by model version, and each group is scored with
+    one ``score_batch(judul_list, model_version)`` call. ``score_batch`` returns
+    ``(results, resolved_version)`` and every caller receives ``(result, resolved_version)``
+    through its Future.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[str], Optional[str]], Tuple[List[dict], str]],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 32,
+    ):
+        self.score_batch = score_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, judul: str, model_version: Optional[str] = None) -> Future:
+        """Queue one title for scoring and return a Future for its result"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((judul, model_version, future))
+        return future
+
+    def _ensure_started(self):
+        # Started lazily so forked workers each get their own dispatcher thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="predict-coalescer", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first request, then gather more until the wait or size limit"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            groups = {}
+            for judul, model_version, future in batch:
+                # Cancelled while queued (e.g. the async client disconnected): skip it
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(model_version, []).append((judul, future))
+
+            for model_version, items in groups.items():
+                try:
+                    results, resolved_version = self.score_batch([judul for judul, _ in items], model_version)
+                    for (_, future), result in zip(items, results):
+                        future.set_result((result, resolved_version))
+                except Exception as e:
+                    # One failing batch must not kill the dispatcher or strand its callers
+                    logger.error(f"Coalesced batch for version {model_version} failed: {e}")
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+
+            logger.debug(f"Coalesced {len(batch)} predictions into {len(groups)} batch(es)")
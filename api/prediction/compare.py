@@ -0,0 +1,71 @@
+"""
+Score titles against several model versions in one pass.
+
+Versions trained with the same preprocessing config share one preprocessing run over
+the titles; the per-version transform and scoring then run concurrently on a thread
+pool (the numpy/scipy parts release the GIL). The result is a version x class
+probability matrix per title plus agreement statistics across versions.
+"""
+
+from collections import Counter
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+from .ml_model import NaiveBayesModel
+from .preprocessing import config_key
+
+
+def compare_versions(judul_list: List[str], loaded: List[Tuple[str, Dict]], executor) -> Dict:
+    """Compare ``loaded`` [(version, model_data), ...] on ``judul_list``"""
+    # Preprocess once per distinct preprocessing config
+    cleaned = {}
+    version_keys = []
+    for version, model_data in loaded:
+        key = config_key(model_data['preprocessing'])
+        if key not in cleaned:
+            cleaned[key] = [model_data['preprocess'](judul) for judul in judul_list]
+        version_keys.append(key)
+
+    def score(item):
+        (version, model_data), key = item
+        return NaiveBayesModel.from_model_data(model_data).predict_preprocessed(cleaned[key])
+
+    per_version = list(executor.map(score, zip(loaded, version_keys)))
+    versions = [version for version, _ in loaded]
+    classes = sorted({str(cls) for version_results in per_version for cls in version_results[0]["probabilities"]})
+
+    results = []
+    for i, judul in enumerate(judul_list):
+        predictions = {version: str(version_results[i]["prediction"])
+                       for version, version_results in zip(versions, per_version)}
+        matrix = [
+            [version_results[i]["probabilities"].get(cls) for cls in classes]
+            for version_results in per_version
+        ]
+        majority, votes = Counter(predictions.values()).most_common(1)[0]
+        results.append({
+            "judul": judul,
+            "predictions": predictions,
+            "matrix": matrix,
+            "agreement": {
+                "majority": majority,
+                "ratio": votes / len(versions),
+                "unanimous": votes == len(versions),
+            },
+        })
+
+    pairwise = {
+        f"{a}_vs_{b}": sum(r["predictions"][a] == r["predictions"][b] for r in results) / len(results)
+        for a, b in combinations(versions, 2)
+    }
+    return {
+        "versions": versions,
+        "classes": classes,
+        "preprocessing_runs": len(cleaned),
+        "results": results,
+        "agreement": {
+            "unanimous_titles": sum(r["agreement"]["unanimous"] for r in results),
+            "mean_ratio": sum(r["agreement"]["ratio"] for r in results) / len(results),
+            "pairwise": pairwise,
+        },
+    }
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+
+def corpus_key(dataset_hash: str, column: str, preprocess_config: dict) -> str:
+    """Identity of a preprocessed text column: (data hash, column, preprocessing config)"""
+    return _digest('corpus', dataset_hash, column, preprocess_config)
+
+
+class CorpusCache:
+    """Share preprocessed corpora and TF-IDF matrices between train and analyze
+
+    Entries are keyed by the dataset hash, the preprocessing config and the
+    vectorizer config (unfitted params for ``fit_transform``, fitted state for
+    ``transform``). Fitting also registers the matrix under the fitted state, so
+    the ``transform`` that ``analyze_model`` runs right after ``train`` is a hit
+    and each artifact of a training run is computed exactly once.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprints = weakref.WeakKeyDictionary()  # fitted vectorizer -> state digest
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def fitted_fingerprint(self, vectorizer) -> str:
+        """Digest of a fitted vectorizer's params, vocabulary and idf (memoized per object)"""
+        fingerprint = self._fingerprints.get(vectorizer)
+        if fingerprint is None:
+            hasher = hashlib.sha256(_digest('params', vectorizer.get_params()).encode('utf-8'))
+            for term, idx in sorted(vectorizer.vocabulary_.items()):
+                hasher.update(f"{term}\x00{idx}\x01".encode('utf-8'))
+            idf = getattr(vectorizer, 'idf_', None)
+            if idf is not None:
+                hasher.update(np.ascontiguousarray(idf).tobytes())
+            fingerprint = hasher.hexdigest()
+            self._fingerprints[vectorizer] = fingerprint
+        return fingerprint
+
+    def preprocess(self, dataset_hash: str, column: str, preprocess_config: dict, series, preprocess_fn):
+        """Preprocessed text column (a pandas Series), computed once per corpus key"""
+        key = ('text', corpus_key(dataset_hash, column, preprocess_config))
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        return self._put(key, series.apply(preprocess_fn))
+
+    def fit_transform(self, key: str, vectorizer, texts):
+        """Fit ``vectorizer`` on the corpus ``key``; returns (fitted vectorizer, matrix)
+
+        On a hit the previously fitted vectorizer is returned instead of ``vectorizer``.
+        """
+        fit_key = ('fit', key, _digest('params', vectorizer.get_params()))
+        cached = self._get(fit_key)
+        if cached is not None:
+            return cached
+        X = vectorizer.fit_transform(texts)
+        self._put(('transform', key, self.fitted_fingerprint(vectorizer)), X)
+        return self._put(fit_key, (vectorizer, X))
+
+    def transform(self, key: str, vectorizer, texts):
+        """Transform the corpus ``key`` with an already fitted vectorizer"""
+        transform_key = ('transform', key, self.fitted_fingerprint(vectorizer))
+        cached = self._get(transform_key)
+        if cached is not None:
+            return cached
+        return self._put(transform_key, vectorizer.transform(texts))
+
+
+corpus_cache = CorpusCache()
@@ -0,0 +1,128 @@
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .storage import atomic_write_bytes, sha256_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetStore:
+    """Content-addressed store for training/evaluation datasets
+
+    Each distinct dataset is kept once as ``<sha256>.csv`` (the exact source bytes)
+    and model versions reference it by hash via ``dataset_hash`` in their metadata.
+    The parsed table is cached next to it as ``<sha256>.npz`` (one array per column)
+    and in a small in-process LRU, so loading a version's dataset does not re-parse CSV.
+    """
+
+    def __init__(self, root: Optional[Path] = None, memory_cache_size: int = 4):
+        self.root = Path(root) if root else Path(__file__).parent / "datasets"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.memory_cache_size = memory_cache_size
+        self._frames = OrderedDict()  # dataset_hash -> DataFrame
+        self._file_hashes = {}  # (path, size, mtime_ns) -> dataset_hash
+        self._lock = threading.Lock()
+
+    def csv_path(self, dataset_hash: str) -> Path:
+        return self.root / f"{dataset_hash}.csv"
+
+    def exists(self, dataset_hash: str) -> bool:
+        return self.csv_path(dataset_hash).exists()
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store raw CSV bytes, returns their hash (no-op if already stored)"""
+        dataset_hash = sha256_bytes(data)
+        if not self.exists(dataset_hash):
+            atomic_write_bytes(self.csv_path(dataset_hash), data)
+            logger.info(f"Stored dataset {dataset_hash[:12]} ({len(data)} bytes)")
+        return dataset_hash
+
+    def put_file(self, path) -> str:
+        """Store a CSV file by content; unchanged files are not re-hashed"""
+        path = Path(path)
+        stat = path.stat()
+        key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        dataset_hash = self._file_hashes.get(key)
+        if dataset_hash is None or not self.exists(dataset_hash):
+            dataset_hash = self.put_bytes(path.read_bytes())
+            self._file_hashes[key] = dataset_hash
+        return dataset_hash
+
+    def put_dataframe(self, df: pd.DataFrame) -> str:
+        return self.put_bytes(df.to_csv(index=False).encode('utf-8'))
+
+    def read_csv(self, path) -> Tuple[str, pd.DataFrame]:
+        """Register a CSV file in the store and return (dataset_hash, DataFrame)"""
+        dataset_hash = self.put_file(path)
+        return dataset_hash, self.load(dataset_hash)
+
+    def load(self, dataset_hash: str) -> pd.DataFrame:
+        """Load a dataset: memory cache, then columnar .npz cache, then CSV parse"""
+        with self._lock:
+            if dataset_hash in self._frames:
+                self._frames.move_to_end(dataset_hash)
+                return self._frames[dataset_hash]
+
+        npz_path = self.root / f"{dataset_hash}.npz"
+        if npz_path.exists():
+            df = self._read_columns(npz_path)
+        else:
+            csv_path = self.csv_path(dataset_hash)
+            if not csv_path.exists():
+                raise FileNotFoundError(f"Dataset {dataset_hash} not found")
+            df = pd.read_csv(csv_path)
+            self._write_columns(npz_path, df)
+
+        with self._lock:
+            self._frames[dataset_hash] = df
+            while len(self._frames) > self.memory_cache_size:
+                self._frames.popitem(last=False)
+        return df
+
+    @staticmethod
+    def _write_columns(npz_path: Path, df: pd.DataFrame):
+        arrays: Dict[str, np.ndarray] = {'columns': np.array(df.columns, dtype=str)}
+        for i, column in enumerate(df.columns):
+            series = df[column]
+            if series.dtype == object:
+                # Strings are stored fixed-width; missing values are tracked in a mask
+                arrays[f"col_{i}_mask"] = series.isna().to_numpy()
+                arrays[f"col_{i}"] = series.fillna('').astype(str).to_numpy(dtype=str)
+            else:
+                arrays[f"col_{i}"] = series.to_numpy()
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        atomic_write_bytes(npz_path, buffer.getvalue())
+
+    @staticmethod
+    def _read_columns(npz_path: Path) -> pd.DataFrame:
+        with np.load(npz_path, allow_pickle=False) as data:
+            columns = data['columns'].tolist()
+            frame = {}
+            for i, column in enumerate(columns):
+                values = data[f"col_{i}"]
+                if f"col_{i}_mask" in data:
+                    values = values.astype(object)
+                    values[data[f"col_{i}_mask"]] = np.nan
+                frame[column] = values
+        return pd.DataFrame(frame, columns=columns)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_dataset_store() -> DatasetStore:
+    """Process-wide store, so its in-memory cache is shared by every ModelManager"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DatasetStore()
+        return _default_store
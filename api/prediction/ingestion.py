@@ -0,0 +1,188 @@
+"""
+Dataset ingestion: schema detection, streaming CSV/xlsx readers and normalization.
+
+The two dataset layouts in use are detected from their header row:
+
+* ``cleaned`` - ``Judul TA Bersih`` / ``KBK`` (pre-cleaned titles, legacy preprocessing)
+* ``raw``     - ``Judul`` / ``Kategori`` (raw titles, smart-stopword preprocessing)
+
+Spreadsheets are read with openpyxl's read-only mode, row by row, so large drops are
+never loaded as a whole workbook. Rows are normalized and deduplicated once and the
+result is stored in the content-addressed DatasetStore (which also caches the parsed
+columnar ``.npz``).
+"""
+
+import csv
+import io
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMAS = [
+    {
+        'name': 'cleaned',
+        'text_column': 'Judul TA Bersih',
+        'label_column': 'KBK',
+        'text_aliases': ['judul ta bersih', 'judul bersih'],
+        'label_aliases': ['kbk'],
+        'preprocess': {'use_smart_stopwords': False},
+    },
+    {
+        'name': 'raw',
+        'text_column': 'Judul',
+        'label_column': 'Kategori',
+        'text_aliases': ['judul', 'judul ta', 'title'],
+        'label_aliases': ['kategori', 'category', 'label'],
+        'preprocess': {'use_smart_stopwords': True},
+    },
+]
+
+EXCEL_SUFFIXES = {'.xlsx', '.xlsm'}
+_WHITESPACE = re.compile(r"\s+")
+_ingested = {}  # (path, size, mtime_ns) -> dataset_hash of already ingested spreadsheets
+
+
+def normalize_header(name) -> str:
+    return _WHITESPACE.sub(' ', str(name or '')).strip().lower()
+
+
+def detect_schema(columns) -> Dict:
+    """Match a header row against the known schemas (header names are compared case-insensitively)
+
+    Returns a copy of the schema with ``source_text_column``/``source_label_column``
+    naming the columns as they appear in ``columns``.
+    """
+    normalized = {normalize_header(column): column for column in columns}
+    for schema in SCHEMAS:
+        text = next((normalized[a] for a in schema['text_aliases'] if a in normalized), None)
+        label = next((normalized[a] for a in schema['label_aliases'] if a in normalized), None)
+        if text is not None and label is not None:
+            return {**schema, 'source_text_column': text, 'source_label_column': label}
+    expected = ", ".join(f"'{s['text_column']}'/'{s['label_column']}'" for s in SCHEMAS)
+    raise ValueError(f"Unrecognized dataset columns {list(columns)}, expected one of {expected}")
+
+
+def frame_schema(df) -> Dict:
+    """Schema of an already loaded DataFrame"""
+    return detect_schema(df.columns)
+
+
+def iter_rows(path, sheet: Optional[str] = None, all_sheets: bool = False) -> Iterator[Tuple[List, tuple]]:
+    """Yield (header, row) pairs from a CSV or xlsx file without loading it whole"""
+    path = Path(path)
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            if sheet:
+                worksheets = [workbook[sheet]]
+            elif all_sheets:
+                worksheets = workbook.worksheets
+            else:
+                worksheets = [workbook.worksheets[0]]
+            for worksheet in worksheets:
+                header = None
+                for row in worksheet.iter_rows(values_only=True):
+                    if header is None:
+                        if any(cell not in (None, '') for cell in row):
+                            header = list(row)
+                        continue
+                    yield header, row
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            for row in reader:
+                yield header, tuple(row)
+
+
+def normalize_text(value) -> str:
+    if value is None:
+        return ''
+    return _WHITESPACE.sub(' ', str(value)).strip()
+
+
+def ingest(path, sheet: Optional[str] = None, all_sheets: bool = False, store=None) -> Dict:
+    """Stream a CSV/xlsx file into the dataset store
+
+    Titles and labels are whitespace-normalized, rows with an empty title or label are
+    skipped and case-insensitive duplicate titles are dropped (first occurrence wins).
+    The stored dataset uses the schema's canonical column names.
+    """
+    if store is None:
+        from .dataset_store import get_dataset_store  # pulls in pandas
+        store = get_dataset_store()
+    schema = None
+    current_header = positions = None
+    seen = set()
+    rows = []
+    skipped = duplicates = 0
+
+    for header, row in iter_rows(path, sheet=sheet, all_sheets=all_sheets):
+        if header is not current_header:
+            # New file/sheet: locate its title and label columns
+            sheet_schema = detect_schema(header)
+            if schema is None:
+                schema = sheet_schema
+            elif sheet_schema['name'] != schema['name']:
+                raise ValueError(f"Sheets of {path} use different schemas")
+            positions = (
+                header.index(sheet_schema['source_text_column']),
+                header.index(sheet_schema['source_label_column']),
+            )
+            current_header = header
+        text = normalize_text(row[positions[0]] if positions[0] < len(row) else None)
+        label = normalize_text(row[positions[1]] if positions[1] < len(row) else None)
+        if not text or not label:
+            skipped += 1
+            continue
+        key = text.casefold()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        rows.append((text, label))
+
+    if schema is None:
+        raise ValueError(f"No rows found in {path}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([schema['text_column'], schema['label_column']])
+    writer.writerows(rows)
+    dataset_hash = store.put_bytes(buffer.getvalue().encode('utf-8'))
+    store.load(dataset_hash)  # Emit the parsed columnar cache right away
+
+    logger.info(f"Ingested {path}: {len(rows)} rows, {duplicates} duplicates, {skipped} skipped")
+    return {
+        'dataset_hash': dataset_hash,
+        'schema': schema['name'],
+        'rows': len(rows),
+        'duplicates': duplicates,
+        'skipped': skipped,
+    }
+
+
+def load_dataset_file(path, store=None):
+    """(dataset_hash, DataFrame) for a CSV (stored as-is) or a spreadsheet (ingested first)"""
+    if store is None:
+        from .dataset_store import get_dataset_store  # pulls in pandas
+        store = get_dataset_store()
+    path = Path(path)
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        stat = path.stat()
+        key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        dataset_hash = _ingested.get(key)
+        if dataset_hash is None or not store.exists(dataset_hash):
+            dataset_hash = ingest(path, store=store)['dataset_hash']
+            _ingested[key] = dataset_hash
+        return dataset_hash, store.load(dataset_hash)
+    return store.read_csv(path)
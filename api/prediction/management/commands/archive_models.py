@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from prediction.model_manager import ModelManager
+
+
+class Command(BaseCommand):
+    requires_system_checks = []
+    help = "Pack rarely used model versions into compressed bundles (extracted again on first load)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-latest", type=int, default=3, help="Newest versions that always stay unpacked")
+        parser.add_argument(
+            "--max-idle-days",
+            type=float,
+            default=30,
+            help="Versions loaded within this many days stay unpacked",
+        )
+        parser.add_argument("--keep", nargs="*", default=[], help="Extra versions to keep unpacked")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the versions that would be archived")
+
+    def handle(self, *args, **options):
+        model_manager = ModelManager()
+        pinned = list(options["keep"])
+        if settings.SHADOW_MODEL_VERSION:
+            pinned.append(settings.SHADOW_MODEL_VERSION)
+
+        archived = model_manager.archive_cold_versions(
+            keep_latest=options["keep_latest"],
+            max_idle_days=options["max_idle_days"],
+            pinned=pinned,
+            dry_run=options["dry_run"],
+        )
+
+        if options["dry_run"]:
+            for version in archived:
+                self.stdout.write(f"would archive mlk2-{version}")
+            self.stdout.write(self.style.SUCCESS(f"{len(archived)} version(s) would be archived"))
+            return
+
+        unpacked = sum(sizes["unpacked_bytes"] for sizes in archived.values())
+        bundled = sum(sizes["bundle_bytes"] for sizes in archived.values())
+        for version, sizes in archived.items():
+            self.stdout.write(f"mlk2-{version}: {sizes['unpacked_bytes']:,} -> {sizes['bundle_bytes']:,} bytes")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {len(archived)} version(s): {unpacked:,} -> {bundled:,} bytes"
+        ))
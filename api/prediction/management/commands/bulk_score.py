@@ -0,0 +1,167 @@
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.bulk import id_column, title_column
+from prediction.ingestion import iter_rows, normalize_text
+from prediction.ml_model import NaiveBayesModel
+from prediction.model_manager import ModelManager
+
+_predictor = None  # Per worker process, loaded once by _init_worker
+
+
+def _init_worker(version):
+    global _predictor
+    _predictor = NaiveBayesModel.from_model_data(ModelManager().load_model(version))
+
+
+def _score_chunk(titles):
+    """Score one shard in a worker: (class labels, predicted labels, probability rows)"""
+    results = _predictor.predict_batch(titles)
+    classes = [str(cls) for cls in _predictor.model.classes_]
+    return (
+        classes,
+        [str(result["prediction"]) for result in results],
+        [[result["probabilities"][cls] for cls in _predictor.model.classes_] for result in results],
+    )
+
+
+def _read_chunks(path, sheet, chunk_size):
+    """Yield (ids, titles) shards of the input, streamed row by row"""
+    header = text_index = id_index = None
+    ids, titles = [], []
+    for row_header, row in iter_rows(path, sheet=sheet):
+        if row_header is not header:
+            header = row_header
+            text_index, id_index = title_column(header), id_column(header)
+        judul = normalize_text(row[text_index] if text_index < len(row) else None)
+        if not judul:
+            continue
+        ids.append(row[id_index] if id_index is not None and id_index < len(row) else None)
+        titles.append(judul)
+        if len(titles) >= chunk_size:
+            yield ids, titles
+            ids, titles = [], []
+    if titles:
+        yield ids, titles
+
+
+class CsvOutput:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.header_written = False
+
+    def write(self, ids, titles, classes, predictions, probabilities):
+        if not self.header_written:
+            self.writer.writerow(['id', 'judul', 'predicted_kbk', 'confidence'] + classes)
+            self.header_written = True
+        for record_id, judul, prediction, probs in zip(ids, titles, predictions, probabilities):
+            self.writer.writerow(['' if record_id is None else record_id, judul, prediction, max(probs)] + probs)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetOutput:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError("Parquet output requires pyarrow (pip install pyarrow)")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+
+    def write(self, ids, titles, classes, predictions, probabilities):
+        columns = {
+            'id': [None if record_id is None else str(record_id) for record_id in ids],
+            'judul': titles,
+            'predicted_kbk': predictions,
+            'confidence': [max(probs) for probs in probabilities],
+        }
+        for i, cls in enumerate(classes):
+            columns[cls] = [probs[i] for probs in probabilities]
+        table = self.pa.table(columns)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class Command(BaseCommand):
+    requires_system_checks = []
+    help = "Classify a large CSV/xlsx of titles with a model version, sharded across a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or xlsx file with a title column (e.g. 'Judul')")
+        parser.add_argument("--model-version", help="Model version (default: active version)")
+        parser.add_argument(
+            "--output", help="Output .csv or .parquet (needs pyarrow); default: <input>.predictions.csv"
+        )
+        parser.add_argument("--sheet", help="Worksheet to read (default: first sheet)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Titles per shard sent to a worker")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+        output_path = Path(options["output"] or path.with_suffix(".predictions.csv"))
+        workers = max(1, options["workers"])
+        chunk_size = max(1, options["chunk_size"])
+
+        mm = ModelManager()
+        version = options["model_version"] or mm.get_active_version()
+        if not version:
+            raise CommandError("No model versions available, train a model first")
+        try:
+            mm.load_model(version)  # Fail fast (missing version / integrity) before starting workers
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        output = ParquetOutput(output_path) if output_path.suffix.lower() == ".parquet" else CsvOutput(output_path)
+        chunks = _read_chunks(path, options["sheet"], chunk_size)
+        rows = 0
+        start = time.perf_counter()
+        try:
+            if workers == 1:
+                _init_worker(version)
+                for ids, titles in chunks:
+                    output.write(ids, titles, *_score_chunk(titles))
+                    rows += len(titles)
+            else:
+                with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(version,)) as pool:
+                    # Bounded number of shards in flight keeps memory flat; results are written in input order
+                    pending = deque()
+                    for ids, titles in chunks:
+                        pending.append((ids, titles, pool.submit(_score_chunk, titles)))
+                        if len(pending) >= workers * 2:
+                            ids, titles, future = pending.popleft()
+                            output.write(ids, titles, *future.result())
+                            rows += len(titles)
+                    while pending:
+                        ids, titles, future = pending.popleft()
+                        output.write(ids, titles, *future.result())
+                        rows += len(titles)
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            output.close()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f"Model:      v{version}")
+        self.stdout.write(f"Rows:       {rows}")
+        self.stdout.write(f"Workers:    {workers}")
+        self.stdout.write(f"Elapsed:    {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/sec)")
+        self.stdout.write(f"Written:    {output_path}")
+        self.stdout.write(self.style.SUCCESS("Bulk scoring completed"))
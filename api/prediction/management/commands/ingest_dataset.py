@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.dataset_store import get_dataset_store
+from prediction.ingestion import ingest
+
+
+class Command(BaseCommand):
+    requires_system_checks = []
+    help = "Stream a CSV/xlsx dataset into the dataset store (schema detection, normalization, dedup)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or xlsx file")
+        parser.add_argument("--sheet", help="Worksheet to read (default: first sheet)")
+        parser.add_argument("--all-sheets", action="store_true", help="Read every worksheet of the workbook")
+        parser.add_argument("--output", help="Also write the normalized dataset as CSV to this path")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        try:
+            result = ingest(path, sheet=options["sheet"], all_sheets=options["all_sheets"])
+        except (ValueError, KeyError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Schema:     {result['schema']}")
+        self.stdout.write(
+            f"Rows:       {result['rows']} ({result['duplicates']} duplicates, {result['skipped']} skipped)"
+        )
+        self.stdout.write(f"Dataset:    {result['dataset_hash']}")
+
+        if options["output"]:
+            store = get_dataset_store()
+            Path(options["output"]).write_bytes(store.csv_path(result["dataset_hash"]).read_bytes())
+            self.stdout.write(f"Written:    {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS("Ingestion completed"))
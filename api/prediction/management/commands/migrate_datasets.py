@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from prediction.model_manager import ModelManager
+
+
+class Command(BaseCommand):
+    requires_system_checks = []
+    help = "Move per-version data.csv copies into the content-addressed dataset store"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--remove-copies",
+            action="store_true",
+            help="Delete each version's data.csv once its metadata references the stored dataset",
+        )
+
+    def handle(self, *args, **options):
+        model_manager = ModelManager()
+        migrated = model_manager.migrate_datasets(remove_copies=options["remove_copies"])
+
+        for version, dataset_hash in migrated.items():
+            self.stdout.write(f"mlk2-{version} -> {dataset_hash[:12]}")
+        distinct = len(set(migrated.values()))
+        self.stdout.write(self.style.SUCCESS(f"Migrated {len(migrated)} version(s) onto {distinct} stored dataset(s)"))
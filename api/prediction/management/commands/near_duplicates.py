@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.ingestion import frame_schema, load_dataset_file
+from prediction.ml_model import NaiveBayesModel
+from prediction.near_duplicates import DEFAULT_THRESHOLD, mask_from_clusters, near_duplicate_clusters
+
+DEFAULT_DATASET = Path(__file__).resolve().parents[3] / "data.csv"
+
+
+class Command(BaseCommand):
+    requires_system_checks = []
+    help = "List near-duplicate title clusters (MinHash-LSH over preprocessed titles) of a training dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", default=str(DEFAULT_DATASET), help="CSV or xlsx training data")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="Token-set Jaccard similarity of near-duplicates")
+        parser.add_argument("--show", type=int, default=10, help="Clusters printed, largest first")
+        parser.add_argument("--output", help="Write every cluster as JSON")
+
+    def handle(self, *args, **options):
+        if not 0 < options["threshold"] <= 1:
+            raise CommandError("--threshold must be in (0, 1]")
+        dataset = Path(options["dataset"])
+        if not dataset.exists():
+            raise CommandError(f"Dataset not found: {dataset}")
+        dataset_hash, df = load_dataset_file(dataset)
+        texts, labels, _, _ = NaiveBayesModel()._prepare_corpus(dataset_hash, df)
+        titles = df[frame_schema(df)['source_text_column']].tolist()
+        labels = labels.tolist()
+
+        clusters = near_duplicate_clusters(texts.tolist(), options["threshold"])
+        _, stats = mask_from_clusters(clusters, labels, options["threshold"])
+        clusters.sort(key=len, reverse=True)
+
+        for group in clusters[:options["show"]]:
+            self.stdout.write(f"{len(group)} titles, labels: {', '.join(sorted({str(labels[i]) for i in group}))}")
+            for i in group[:3]:
+                self.stdout.write(f"  [{i}] {titles[i]}")
+            if len(group) > 3:
+                self.stdout.write(f"  ... {len(group) - 3} more")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump([
+                    [{"row": i, "title": titles[i], "label": str(labels[i])} for i in group] for group in clusters
+                ], f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(clusters)} clusters over {sum(map(len, clusters))} of {len(titles)} titles; "
+            f"dedup would drop {stats['removed']}"
+        ))
@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.ingestion import load_dataset_file
+from prediction.ml_model import DOMAIN_STOPWORDS, NaiveBayesModel
+from prediction.nb_search import FOLD_SCHEDULE, SuccessiveHalvingSearch, sample_candidates
+
+DEFAULT_DATASET = Path(__file__).resolve().parents[3] / "data.csv"
+
+
+class Command(BaseCommand):
+    requires_system_checks = []
+    help = "Successive-halving search over NB estimator, alpha and TF-IDF settings; prints the Pareto frontier"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", default=str(DEFAULT_DATASET), help="CSV or xlsx training data")
+        parser.add_argument("--candidates", type=int, default=243, help="Configurations sampled from the grid")
+        parser.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta of each rung")
+        parser.add_argument(
+            "--folds",
+            default=",".join(map(str, FOLD_SCHEDULE)),
+            help="CV folds per rung, cheapest first (default: 2,3,5)",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--latency-repeats", type=int, default=200, help="Single-title predictions timed per finalist"
+        )
+        parser.add_argument("--output", help="Write the full result (rungs, finalists, frontier) as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            fold_schedule = tuple(int(n) for n in options["folds"].split(","))
+        except ValueError:
+            raise CommandError("--folds must be a comma-separated list of integers")
+        if options["eta"] < 2 or any(n < 2 for n in fold_schedule):
+            raise CommandError("--eta and every fold count must be at least 2")
+
+        dataset = Path(options["dataset"])
+        if not dataset.exists():
+            raise CommandError(f"Dataset not found: {dataset}")
+        dataset_hash, df = load_dataset_file(dataset)
+        texts, labels, _, _ = NaiveBayesModel()._prepare_corpus(dataset_hash, df)
+
+        search = SuccessiveHalvingSearch(
+            texts, labels, DOMAIN_STOPWORDS, fold_schedule=fold_schedule, eta=options["eta"], seed=options["seed"]
+        )
+        result = search.run(sample_candidates(options["candidates"], options["seed"]), options["latency_repeats"])
+
+        for rung in result["rungs"]:
+            self.stdout.write(
+                f"{rung['folds']}-fold: {rung['evaluated']}/{rung['candidates']} evaluated, "
+                f"best CV {rung['best_cv_accuracy']:.4f} ({rung['seconds']:.1f}s)"
+            )
+
+        self.stdout.write("")
+        self.stdout.write(f"{'Estimator':<14} {'alpha':>5} {'ngram':>6} {'min_df':>6} {'max_df':>6} "
+                          f"{'max_feat':>8} {'CV acc':>7} {'gap':>7} {'µs/title':>9}")
+        rows = [("*", result["baseline"])] if result["baseline"] else []
+        rows += [("", r) for r in result["pareto_frontier"]]
+        for marker, r in rows:
+            self.stdout.write(
+                f"{r['estimator']:<14} {r['alpha']:>5} {'-'.join(map(str, r['ngram_range'])):>6} {r['min_df']:>6} "
+                f"{r['max_df']:>6} {str(r['max_features']):>8} {r['cv_accuracy']:>7.4f} {r['gap']:>7.4f} "
+                f"{r['latency_us']:>9.1f} {marker}"
+            )
+        self.stdout.write("(* = current training configuration)")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(result, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Pareto frontier: {len(result['pareto_frontier'])} of {len(result['finalists'])} finalists"
+        ))
@@ -1,19 +1,29 @@
-import pandas as pd
 import pickle
-import re
 import numpy as np
 import logging
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB, ComplementNB
-from sklearn.model_selection import cross_val_score, cross_val_predict
-from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
-from sklearn.feature_selection import SelectKBest, mutual_info_classif
-from sklearn.pipeline import Pipeline
 from pathlib import Path
 
+# Importing this module (and so prediction.views) loads no sklearn/pandas: scikit-learn
+# is imported by unpickling the first model version, the estimators, dataset loaders
+# and the analysis module (sklearn.model_selection/metrics) inside train/analyze_model.
+from .corpus_cache import corpus_cache, corpus_key
+from .ingestion import frame_schema
+from .near_duplicates import dedup_mask
+from .preprocessing import SMART_STOPWORDS, build_config, compile_preprocessor
+from .scoring import get_kernel
+from .storage import atomic_write_bytes
+
 logger = logging.getLogger(__name__)
 
 
+# TF-IDF stop words of the training vectorizer (generic title words that carry no KBK signal)
+DOMAIN_STOPWORDS = [
+    'sistem', 'implementasi', 'berbasis', 'aplikasi', 'informasi', 
+    'web', 'teknologi', 'media', 'padang', 'politeknik', 'negeri', 
+    'perancangan', 'metod', 'menggunakan', 'dengan', 'untuk', 'pada'
+]
+
+
 class ModelNotLoadedError(Exception):
     pass
 
@@ -28,6 +38,12 @@ class NaiveBayesModel:
         'concepts': ['3d', 'karakter', 'character', 'motion', 'vfx', 'cg', 'toon']
     }
 
+    # v3.0: ANIMASI BOOST - boost ekstra untuk Animasi per jumlah keyword animasi (animasi_total_score)
+    ANIMASI_BOOSTS = {
+        1: 1.4,  # DARI 1.2 → 1.4 (Boost 40% untuk 1 keyword)
+        2: 1.9,  # 2+ keyword: DARI 1.5 → 1.9 (Boost 90% untuk Animasi)
+    }
+
     def __init__(self):
         self.model = None
         self.vectorizer = None
@@ -37,14 +53,15 @@ class NaiveBayesModel:
         self.selector_path = Path(__file__).parent / "selector.pkl"
         
         # Smart stopwords untuk v3.0.0
-        self.smart_stopwords = [
-            'padang', 'kota', 'kabupaten', 'sumatera', 'barat', 'indonesia', 'ri', 'negeri', 
-            'politeknik', 'universitas', 'institut', 'sekolah', 'madrasah', 'pt', 'cv', 
-            'dinas', 'kantor', 'desa', 'kelurahan', 'kecamatan', 'nagari', 'dan', 'di', 
-            'pada', 'dengan', 'menggunakan', 'studi', 'kasus', 'untuk', 'sebagai', 'dalam', 
-            'ke', 'dari', 'yang', 'oleh', 'serta', 'tugas', 'akhir', 'jurusan', 'prodi', 
-            'program', 'tahun'
-        ]
+        self.smart_stopwords = list(SMART_STOPWORDS)
+
+        # Preprocessing config of the loaded/trained version (None: legacy path) and its compiled function
+        self.preprocessing = None
+        self.preprocessor = None
+        self._preprocessors = {}
+
+        # Near-duplicate removal of the training run ({"threshold", "clusters", "removed"}; None: off)
+        self.dedup = None
 
         self.keywords = {
             "AI / Machine Learning": [
@@ -138,30 +155,37 @@ class NaiveBayesModel:
         }
     
     def preprocess(self, text, use_smart_stopwords=False):
-        text = text.lower()
-        
-        if use_smart_stopwords:
-            # v3.0.0: Simple cleaning dengan smart stopwords
-            text = re.sub(r'[^a-z\s]', ' ', text)
-            words = text.split()
-            words = [w for w in words if w not in self.smart_stopwords]
-            return ' '.join(words)
-        
-        # Legacy preprocessing untuk model lama
-        # Normalisasi domain-specific terms
-        text = re.sub(r"na[iï]ve?\s*baye?s?", "naive bayes", text)
-        text = re.sub(r"augment\s*realiti", "augmented reality", text)
-        text = re.sub(r"virtual\s*realiti", "virtual reality", text)
-        text = re.sub(r"komput", "komputer", text)
-        text = re.sub(r"berbasi", "berbasis", text)
-        text = re.sub(r"teknolog", "teknologi", text)
-        text = re.sub(r"uiux|ui/ux", "ui ux", text)
-        # Hapus angka dan simbol
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        # Hapus kata pendek (<4 karakter) - v3.0: lebih agresif
-        tokens = text.split()
-        tokens = [t for t in tokens if len(t) >= 4]
-        return ' '.join(tokens)
+        preprocess_fn = self._preprocessors.get(use_smart_stopwords)
+        if preprocess_fn is None:
+            preprocess_fn = compile_preprocessor(build_config(use_smart_stopwords, self.smart_stopwords))
+            self._preprocessors[use_smart_stopwords] = preprocess_fn
+        return preprocess_fn(text)
+
+    @classmethod
+    def from_model_data(cls, model_data):
+        """Predictor bound to a loaded version (see ModelManager.load_model); cheap to build per call"""
+        predictor = cls()
+        predictor.model = model_data['model']
+        predictor.vectorizer = model_data['vectorizer']
+        predictor.selector = model_data['selector']
+        predictor.preprocessing = model_data.get('preprocessing')
+        predictor.preprocessor = model_data.get('preprocess')
+        return predictor
+
+    def set_preprocessing(self, config):
+        """Use ``config`` (a version's serialized preprocessing) for predict and analyze"""
+        self.preprocessing = config
+        self.preprocessor = compile_preprocessor(config) if config else None
+
+    def scoring_kernel(self):
+        """Precomputed log-space scorer (keyword and Animasi boosts included) for the fitted model"""
+        return get_kernel(
+            self.model,
+            keywords=self.keywords,
+            keyword_boost_factor=self.KEYWORD_BOOST_FACTOR,
+            animation_keywords=self.ANIMATION_KEYWORDS,
+            animasi_boosts=self.ANIMASI_BOOSTS,
+        )
 
     def calculate_keyword_score(self, text):
         scores = {}
@@ -170,28 +194,50 @@ class NaiveBayesModel:
             scores[category] = score
         return scores
 
-    def train(self, csv_path):
+    def _prepare_corpus(self, dataset_hash, df, preprocessing=None):
+        """Detect the dataset schema and return (preprocessed titles, labels, corpus key, preprocessing config)
+
+        ``preprocessing`` pins the config (e.g. the one a version was trained with);
+        otherwise the schema's default path is used.
+        """
+        schema = frame_schema(df)
+        text_column = schema['source_text_column']
+        if preprocessing is None:
+            preprocessing = build_config(smart_stopwords=self.smart_stopwords, **schema['preprocess'])
+        X = corpus_cache.preprocess(
+            dataset_hash, text_column, preprocessing, df[text_column], compile_preprocessor(preprocessing)
+        )
+        X_key = corpus_key(dataset_hash, text_column, preprocessing)
+        return X, df[schema['source_label_column']], X_key, preprocessing
+
+    @staticmethod
+    def _drop_near_duplicates(X, y, X_key, threshold):
+        """Keep one title per (near-duplicate cluster, label); returns (X, y, corpus key, stats)"""
+        keep, stats = dedup_mask(X.tolist(), y.tolist(), threshold)
+        return X[keep], y[keep], f"{X_key}:dedup:{threshold}", stats
+
+    def train(self, csv_path, dedup_threshold=None):
         csv_file = Path(csv_path)
         if not csv_file.exists():
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
-        df = pd.read_csv(csv_path)
-
-        required_columns = ["Judul TA Bersih", "KBK"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {missing_columns}")
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from .ingestion import load_dataset_file
 
-        X = df["Judul TA Bersih"].apply(self.preprocess)
-        y = df["KBK"]
+        # CSV or xlsx, either schema ('Judul TA Bersih'/'KBK' or 'Judul'/'Kategori')
+        dataset_hash, df = load_dataset_file(csv_file)
+        X, y, X_key, preprocessing = self._prepare_corpus(dataset_hash, df)
+        # Near-duplicate titles (same template, another institution) would otherwise be
+        # counted several times and leak across CV folds
+        self.dedup = None
+        if dedup_threshold:
+            X, y, X_key, self.dedup = self._drop_near_duplicates(X, y, X_key, dedup_threshold)
+            logger.info(f"Dropped {self.dedup['removed']} near-duplicate titles ({self.dedup['clusters']} clusters)")
 
         # v3.0: EXTREME SIMPLIFICATION - Closest to <10% overfitting
         # Result: 11.87% overfitting (best possible for 160 data)
-        self.domain_stopwords = [
-            'sistem', 'implementasi', 'berbasis', 'aplikasi', 'informasi', 
-            'web', 'teknologi', 'media', 'padang', 'politeknik', 'negeri', 
-            'perancangan', 'metod', 'menggunakan', 'dengan', 'untuk', 'pada'
-        ]
+        self.domain_stopwords = list(DOMAIN_STOPWORDS)
         
         self.vectorizer = TfidfVectorizer(
             max_features=40,
@@ -201,21 +247,20 @@ class NaiveBayesModel:
             sublinear_tf=True,
             stop_words=self.domain_stopwords
         )
-        X_vectorized = self.vectorizer.fit_transform(X)
+        self.vectorizer, X_vectorized = corpus_cache.fit_transform(X_key, self.vectorizer, X)
         
         self.selector = None
 
         self.model = MultinomialNB(alpha=1.7, fit_prior=True)
         self.model.fit(X_vectorized, y)
+        self.set_preprocessing(preprocessing)
 
         try:
+            # Replace each legacy pickle atomically so a concurrent load() never reads a truncated file
             self.model_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.model_path, "wb") as f:
-                pickle.dump(self.model, f)
-            with open(self.vectorizer_path, "wb") as f:
-                pickle.dump(self.vectorizer, f)
-            with open(self.selector_path, "wb") as f:
-                pickle.dump(self.selector, f)
+            atomic_write_bytes(self.model_path, pickle.dumps(self.model))
+            atomic_write_bytes(self.vectorizer_path, pickle.dumps(self.vectorizer))
+            atomic_write_bytes(self.selector_path, pickle.dumps(self.selector))
         except (IOError, PermissionError, OSError) as e:
             logger.error(f"Failed to save model: {e}")
             raise
@@ -238,312 +283,74 @@ class NaiveBayesModel:
         return False
 
     def predict(self, judul):
+        return self.predict_batch([judul])[0]
+
+    def predict_batch(self, judul_list, explain_top_k=None):
+        """Score several titles with one sparse transform and one pass of the scoring kernel
+
+        With ``explain_top_k`` each result also gets an ``explanation``: the top
+        contributing n-grams and the keyword hits per class.
+        """
         if not self.model or not self.vectorizer:
             if not self.load():
                 raise ModelNotLoadedError("Model not trained yet")
 
-        judul_clean = self.preprocess(judul)
-        X = self.vectorizer.transform([judul_clean])
+        preprocess_fn = self.preprocessor or self.preprocess
+        return self.predict_preprocessed([preprocess_fn(judul) for judul in judul_list], explain_top_k)
+
+    def predict_preprocessed(self, judul_clean_list, explain_top_k=None):
+        """predict_batch for titles already run through this version's preprocessing"""
+        X = self.vectorizer.transform(judul_clean_list)
         
         # v3.0: No feature selection in v3.0
         if self.selector:
             X = self.selector.transform(X)
         
-        probabilities = self.model.predict_proba(X)[0]
-
-        keyword_scores = self.calculate_keyword_score(judul_clean)
+        kernel = self.scoring_kernel()
+        probabilities_matrix = kernel.predict_proba(X, judul_clean_list)
         classes = self.model.classes_
-        
-        # v3.0: ANIMASI BOOST - tambahkan boost ekstra untuk Animasi
-        animasi_features = self.extract_animasi_features(judul_clean)
-        animasi_boost = 1.0
-        if animasi_features['animasi_total_score'] >= 2:  # Jika ada 2+ keyword animasi
-            animasi_boost = 1.9  # DARI 1.5 → 1.9 (Boost 90% untuk Animasi)
-        elif animasi_features['animasi_total_score'] == 1:  # 1 keyword
-            animasi_boost = 1.4  # DARI 1.2 → 1.4 (Boost 40% untuk 1 keyword)
-
-        boosted_probs = []
-        for i, cls in enumerate(classes):
-            boost = 1 + (keyword_scores.get(cls, 0) * self.KEYWORD_BOOST_FACTOR)
-            # Tambahkan animasi boost khusus
-            if cls == 'Animasi':
-                boost *= animasi_boost
-            boosted_probs.append(probabilities[i] * boost)
-
-        total = sum(boosted_probs)
-        boosted_probs = [p / total for p in boosted_probs]
-
-        prediction = classes[np.argmax(boosted_probs)]
-        prob_dict = {classes[i]: float(boosted_probs[i]) for i in range(len(classes))}
-
-        return {"prediction": prediction, "probabilities": prob_dict}
-
-    def analyze_model(self, csv_path, model_version=None):
-        # If model_version provided, use data from model folder
-        if model_version:
-            from prediction.model_manager import ModelManager
-            mm = ModelManager()
-            model_data_path = mm.get_model_path(model_version) / "data.csv"
-            if model_data_path.exists():
-                csv_path = str(model_data_path)
-        
-        csv_file = Path(csv_path)
-        if not csv_file.exists():
-            raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+        results = []
+        for probabilities in probabilities_matrix:
+            prediction = classes[np.argmax(probabilities)]
+            prob_dict = {classes[i]: float(probabilities[i]) for i in range(len(classes))}
+
+            results.append({"prediction": prediction, "probabilities": prob_dict})
+
+        if explain_top_k:
+            explanations = kernel.explain(X, judul_clean_list, self.vectorizer, self.selector, explain_top_k)
+            for result, explanation in zip(results, explanations):
+                result["explanation"] = explanation
+
+        return results
+
+    def analyze_model(self, csv_path, model_version=None, sections=None):
+        """Analysis report of the loaded model; ``sections`` limits it to some of analysis.SECTIONS"""
+        from prediction.model_manager import ModelManager
+        from .analysis import SECTIONS as ANALYSIS_SECTIONS, ModelAnalysis
+        from .ingestion import load_dataset_file
+        mm = ModelManager()
+
+        # If model_version provided, use the dataset the version references
+        dataset_hash = mm.get_dataset_hash(model_version) if model_version else None
+        if dataset_hash is None:
+            csv_file = Path(csv_path)
+            if not csv_file.exists():
+                raise FileNotFoundError(f"CSV file not found: {csv_path}")
+            dataset_hash, df = load_dataset_file(csv_file)
+        else:
+            df = mm.dataset_store.load(dataset_hash)
 
         if not self.model or not self.vectorizer:
             if not self.load():
                 raise ModelNotLoadedError("Model not trained yet")
 
-        df = pd.read_csv(csv_path)
-        
-        # Support both old and new column names
-        if 'Judul TA Bersih' in df.columns:
-            X = df["Judul TA Bersih"].apply(self.preprocess)
-            y = df["KBK"]
-        elif 'Judul' in df.columns:
-            X = df["Judul"].apply(lambda x: self.preprocess(x, use_smart_stopwords=True))
-            y = df["Kategori"]
-        else:
-            raise ValueError("CSV must have 'Judul TA Bersih' or 'Judul' column")
-            
-        X_vectorized = self.vectorizer.transform(X)
-        
-        # v3.0: No feature selection
-        if self.selector:
-            X_vectorized = self.selector.transform(X_vectorized)
-
-        # Training accuracy
-        train_accuracy = self.model.score(X_vectorized, y)
-
-        # Cross-validation scores
-        cv_scores = cross_val_score(self.model, X_vectorized, y, cv=5, scoring="accuracy")
-
-        # Predictions for confusion matrix
-        y_pred = self.model.predict(X_vectorized)
-        y_pred_cv = cross_val_predict(self.model, X_vectorized, y, cv=5)
-
-        # Confusion matrices
-        cm_train = confusion_matrix(y, y_pred)
-        cm_cv = confusion_matrix(y, y_pred_cv)
-
-        # Classification reports
-        precision, recall, f1, support = precision_recall_fscore_support(
-            y, y_pred_cv, average=None, labels=self.model.classes_
-        )
-
-        # Per-class metrics
-        class_metrics = {}
-        for i, cls in enumerate(self.model.classes_):
-            class_metrics[cls] = {
-                "precision": float(precision[i]),
-                "recall": float(recall[i]),
-                "f1_score": float(f1[i]),
-                "support": int(support[i]),
-            }
-
-        # Overfitting/Underfitting analysis
-        variance = float(np.var(cv_scores))
-        bias = 1 - float(np.mean(cv_scores))
-        overfitting_score = train_accuracy - float(np.mean(cv_scores))
-
-        # Class overlap analysis
-        probas = self.model.predict_proba(X_vectorized)
-        max_probas = np.max(probas, axis=1)
-        second_max_probas = np.partition(probas, -2, axis=1)[:, -2]
-        confidence_gap = max_probas - second_max_probas
-
-        overlap_analysis = {
-            "avg_confidence": float(np.mean(max_probas)),
-            "avg_confidence_gap": float(np.mean(confidence_gap)),
-            "low_confidence_samples": int(np.sum(max_probas < 0.5)),
-            "high_overlap_samples": int(np.sum(confidence_gap < 0.1)),
-        }
-
-        # Feature importance (top features per class)
-        feature_names = self.vectorizer.get_feature_names_out()
-        top_features = {}
-        for i, cls in enumerate(self.model.classes_):
-            feature_log_prob = self.model.feature_log_prob_[i]
-            top_indices = np.argsort(feature_log_prob)[-10:][::-1]
-            top_features[cls] = [feature_names[idx] for idx in top_indices]
-
-        # NAIVE BAYES SPECIFIC ANALYSIS
-
-        # 1. Prior probabilities (P(class))
-        class_priors = {cls: float(prob) for cls, prob in zip(self.model.classes_, np.exp(self.model.class_log_prior_))}
-
-        # 2. Feature log probabilities per class (P(feature|class))
-        feature_log_probs = {}
-        for i, cls in enumerate(self.model.classes_):
-            feature_log_probs[cls] = {
-                "mean": float(np.mean(self.model.feature_log_prob_[i])),
-                "std": float(np.std(self.model.feature_log_prob_[i])),
-                "min": float(np.min(self.model.feature_log_prob_[i])),
-                "max": float(np.max(self.model.feature_log_prob_[i])),
-            }
-
-        # 3. Feature count per class
-        feature_counts = {}
-        for i, cls in enumerate(self.model.classes_):
-            feature_counts[cls] = int(np.sum(self.model.feature_count_[i]))
-
-        # 4. Conditional independence assumption violation check
-        # Calculate feature correlation in TF-IDF space
-        X_dense = X_vectorized.toarray()
-        with np.errstate(divide='ignore', invalid='ignore'):
-            feature_corr = np.corrcoef(X_dense.T)
-            feature_corr = np.nan_to_num(feature_corr, nan=0.0, posinf=0.0, neginf=0.0)
-        high_corr_pairs = np.sum(np.abs(feature_corr) > 0.7) - len(feature_corr)  # exclude diagonal
-        total_pairs = len(feature_corr) * (len(feature_corr) - 1)
-        independence_violation_ratio = float(high_corr_pairs / total_pairs) if total_pairs > 0 else 0.0
-
-        # 5. Laplace smoothing effect
-        smoothing_impact = {}
-        for i, cls in enumerate(self.model.classes_):
-            raw_counts = self.model.feature_count_[i]
-            total_count = np.sum(raw_counts)
-            smoothed_prob = (raw_counts + self.model.alpha) / (total_count + self.model.alpha * len(raw_counts))
-            unsmoothed_prob = raw_counts / total_count
-            avg_diff = float(np.mean(np.abs(smoothed_prob - unsmoothed_prob)))
-            smoothing_impact[cls] = avg_diff
-
-        # 6. Zero probability features (features never seen in training)
-        zero_prob_features = {}
-        for i, cls in enumerate(self.model.classes_):
-            zero_count = int(np.sum(self.model.feature_count_[i] == 0))
-            zero_prob_features[cls] = {"count": zero_count, "percentage": float(zero_count / len(feature_names) * 100)}
-
-        # 7. Class separability (KL divergence between classes)
-        kl_divergences = {}
-        for i, cls1 in enumerate(self.model.classes_):
-            for j, cls2 in enumerate(self.model.classes_):
-                if i < j:
-                    p = np.exp(self.model.feature_log_prob_[i])
-                    q = np.exp(self.model.feature_log_prob_[j])
-                    kl_div = float(np.sum(p * np.log(p / q)))
-                    kl_divergences[f"{cls1}_vs_{cls2}"] = kl_div
-
-        # 8. Prediction confidence distribution
-        confidence_distribution = {
-            "very_high (>0.9)": int(np.sum(max_probas > 0.9)),
-            "high (0.7-0.9)": int(np.sum((max_probas > 0.7) & (max_probas <= 0.9))),
-            "medium (0.5-0.7)": int(np.sum((max_probas > 0.5) & (max_probas <= 0.7))),
-            "low (<0.5)": int(np.sum(max_probas <= 0.5)),
-        }
-
-        # 9. Misclassification analysis
-        misclassified_indices = np.where(y_pred_cv != y)[0]
-        misclassification_patterns = {}
-        for idx in misclassified_indices:
-            true_label = y.iloc[idx]
-            pred_label = y_pred_cv[idx]
-            key = f"{true_label}_misclassified_as_{pred_label}"
-            misclassification_patterns[key] = misclassification_patterns.get(key, 0) + 1
-
-        # 10. TF-IDF statistics
-        tfidf_stats = {
-            "vocabulary_size": len(feature_names),
-            "avg_document_length": float(np.mean(np.sum(X_vectorized.toarray(), axis=1))),
-            "sparsity": float(1.0 - (X_vectorized.nnz / (X_vectorized.shape[0] * X_vectorized.shape[1]))),
-            "max_features": self.vectorizer.max_features,
-            "ngram_range": self.vectorizer.ngram_range,
-            "min_df": self.vectorizer.min_df,
-            "max_df": self.vectorizer.max_df,
-        }
-        
-        # 11. LEARNING CURVE for visualization
-        learning_curve = []
-        
-        # Use current model's configuration
-        current_alpha = self.model.alpha
-        current_ngram = self.vectorizer.ngram_range if hasattr(self.vectorizer, 'ngram_range') else (1, 2)
-        
-        # Detect stopwords (smart vs domain)
-        if hasattr(self, 'smart_stopwords'):
-            stopwords = self.smart_stopwords
-        else:
-            stopwords = getattr(self, 'domain_stopwords', [
-                'sistem', 'implementasi', 'berbasis', 'aplikasi', 'informasi', 
-                'web', 'teknologi', 'media', 'padang', 'politeknik', 'negeri', 
-                'perancangan', 'metod', 'menggunakan', 'dengan', 'untuk', 'pada'
-            ])
-        
-        for features in [20, 40, 60, 80, 100]:
-            temp_vec = TfidfVectorizer(
-                max_features=features,
-                ngram_range=current_ngram,
-                min_df=1,
-                max_df=1.0,
-                sublinear_tf=True,
-                stop_words=stopwords
-            )
-            X_temp = temp_vec.fit_transform(X)
-            temp_model = MultinomialNB(alpha=current_alpha, fit_prior=True)
-            temp_model.fit(X_temp, y)
-            
-            train_acc = temp_model.score(X_temp, y) * 100
-            cv_acc = float(np.mean(cross_val_score(temp_model, X_temp, y, cv=5))) * 100
-            
-            learning_curve.append({
-                'complexity': features,
-                'training': round(train_acc, 2),
-                'validation': round(cv_acc, 2)
-            })
+        # Support both old and new column names; a loaded version analyzes with its own pipeline
+        X, y, X_key, _ = self._prepare_corpus(dataset_hash, df, self.preprocessing)
+        if self.dedup:
+            # Analyze on the same deduplicated corpus the model was trained on
+            X, y, X_key, _ = self._drop_near_duplicates(X, y, X_key, self.dedup['threshold'])
+            df = df.loc[X.index]
 
-        return {
-            "model_type": "Multinomial Naive Bayes",
-            "total_samples": len(df),
-            "classes": self.model.classes_.tolist(),
-            "class_distribution": y.value_counts().to_dict(),
-            "performance": {
-                "train_accuracy": float(train_accuracy),
-                "cv_mean_accuracy": float(np.mean(cv_scores)),
-                "cv_std_accuracy": float(np.std(cv_scores)),
-                "cv_scores": cv_scores.tolist(),
-            },
-            "model_health": {
-                "overfitting_score": float(overfitting_score),
-                "overfitting_status": (
-                    "High" if overfitting_score > 0.2 else "Moderate" if overfitting_score > 0.15 else "Low"
-                ),
-                "variance": float(variance),
-                "bias": float(bias),
-                "underfitting_status": "High" if bias > 0.3 else "Moderate" if bias > 0.15 else "Low",
-            },
-            "class_overlap": overlap_analysis,
-            "per_class_metrics": class_metrics,
-            "confusion_matrix": {
-                "train": cm_train.tolist(),
-                "cross_validation": cm_cv.tolist(),
-                "labels": self.model.classes_.tolist(),
-            },
-            "top_features_per_class": top_features,
-            "model_parameters": {
-                "alpha": float(self.model.alpha),
-                "n_features": int(X_vectorized.shape[1]),
-                "vectorizer_max_features": self.vectorizer.max_features,
-                "ngram_range": self.vectorizer.ngram_range,
-            },
-            "naive_bayes_specific": {
-                "class_priors": class_priors,
-                "feature_log_probabilities": feature_log_probs,
-                "feature_counts_per_class": feature_counts,
-                "conditional_independence": {
-                    "violation_ratio": float(independence_violation_ratio),
-                    "status": (
-                        "High Violation"
-                        if independence_violation_ratio > 0.3
-                        else "Moderate" if independence_violation_ratio > 0.1 else "Low Violation"
-                    ),
-                    "note": "Naive Bayes assumes feature independence. High violation may affect performance.",
-                },
-                "laplace_smoothing_impact": smoothing_impact,
-                "zero_probability_features": zero_prob_features,
-                "class_separability_kl_divergence": kl_divergences,
-                "prediction_confidence_distribution": confidence_distribution,
-                "misclassification_patterns": misclassification_patterns,
-                "tfidf_vectorizer_stats": tfidf_stats,
-            },
-            "learning_curve": learning_curve,
-        }
+        # Only the requested sections are computed; each one is cached per (model, dataset, preprocessing)
+        return ModelAnalysis(self, df, X, y, X_key).run(sections or list(ANALYSIS_SECTIONS))
@@ -0,0 +1,191 @@
+"""
+Compressed bundles for cold model versions plus the registry index.
+
+A hot version is an unpacked ``models/mlk2-{version}/`` directory. Archiving packs
+it into ``models/archive/mlk2-{version}.tar.xz`` (metadata.json first, then the
+pickles) and removes the directory; the first ``load_model()`` of an archived
+version streams the bundle members back into a fresh directory, publishes it with
+one rename and deletes the bundle, so a version is always in exactly one form.
+
+``models/.registry/index.json`` maps every version, hot or archived, to its
+metadata. It is stamped with the mtimes of ``models/`` and ``models/archive/``
+(which change whenever a version directory or bundle appears or disappears), so
+``list_models()`` reads one file and two stats instead of one metadata.json per
+version, and rebuilds the index only after the set of versions changed.
+"""
+
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from .storage import atomic_write_bytes, fsync_dir, write_fsync
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_SUFFIX = ".tar.xz"
+# Members a bundle may contain; anything else is ignored on extraction
+BUNDLE_MEMBERS = ["metadata.json", "model.pkl", "vectorizer.pkl", "selector.pkl", "data.csv"]
+
+
+def read_metadata(model_path: Path) -> Optional[Dict]:
+    try:
+        with open(model_path / "metadata.json", 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        return None
+
+
+class ModelArchive:
+    """Packs/unpacks version bundles and maintains the registry index"""
+
+    def __init__(self, models_dir: Path):
+        self.models_dir = models_dir
+        self.archive_dir = models_dir / "archive"
+        self.index_file = models_dir / ".registry" / "index.json"
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_stamp = None
+
+    def bundle_path(self, version: str) -> Path:
+        return self.archive_dir / f"mlk2-{version}{BUNDLE_SUFFIX}"
+
+    def is_archived(self, version: str) -> bool:
+        return self.bundle_path(version).exists()
+
+    def _stamp(self):
+        try:
+            archive_mtime = self.archive_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            archive_mtime = None
+        return [self.models_dir.stat().st_mtime_ns, archive_mtime]
+
+    def index(self) -> Dict[str, Dict]:
+        """{version: {"metadata": ..., "archived": bool}} for every hot and archived version"""
+        with self._lock:
+            # Created before stamping so creating it does not immediately outdate the stamp
+            self.index_file.parent.mkdir(exist_ok=True)
+            stamp = self._stamp()
+            if self._index is not None and stamp == self._index_stamp:
+                return self._index
+
+            index = None
+            try:
+                stored = json.loads(self.index_file.read_text())
+                if stored.get("stamp") == stamp:
+                    index = stored["versions"]
+            except (FileNotFoundError, ValueError, KeyError):
+                pass
+
+            if index is None:
+                index = self._rebuild(self._index or {})
+                try:
+                    atomic_write_bytes(self.index_file, json.dumps({"stamp": stamp, "versions": index}).encode('utf-8'))
+                except OSError as e:
+                    logger.warning(f"Could not write model registry index: {e}")
+
+            self._index, self._index_stamp = index, stamp
+            return index
+
+    def invalidate(self):
+        """Force every worker to rebuild the index (after a metadata.json was rewritten in place)"""
+        os.utime(self.models_dir)
+
+    def _rebuild(self, previous: Dict[str, Dict]) -> Dict[str, Dict]:
+        index = {}
+        if self.archive_dir.exists():
+            for bundle in self.archive_dir.iterdir():
+                if not (bundle.name.startswith("mlk2-") and bundle.name.endswith(BUNDLE_SUFFIX)):
+                    continue
+                version = bundle.name[len("mlk2-"):-len(BUNDLE_SUFFIX)]
+                known = previous.get(version)
+                metadata = known["metadata"] if known else self.read_bundle_metadata(bundle)
+                if metadata is not None:
+                    index[version] = {"metadata": metadata, "archived": True}
+
+        for model_dir in self.models_dir.iterdir():
+            if model_dir.is_dir() and model_dir.name.startswith("mlk2-"):
+                metadata = read_metadata(model_dir)
+                if metadata is None:
+                    if (model_dir / "metadata.json").exists():
+                        logger.warning(f"Skipping {model_dir.name}: unreadable metadata")
+                    continue
+                # An unpacked directory wins over a bundle left behind by an interrupted extraction
+                index[metadata['version']] = {"metadata": metadata, "archived": False}
+        return index
+
+    @staticmethod
+    def read_bundle_metadata(bundle: Path) -> Optional[Dict]:
+        try:
+            with tarfile.open(bundle, "r:xz") as tar:
+                member = tar.extractfile("metadata.json")
+                return json.load(member) if member else None
+        except (tarfile.TarError, KeyError, ValueError, OSError) as e:
+            logger.warning(f"Skipping {bundle.name}: unreadable bundle ({e})")
+            return None
+
+    def pack(self, version: str, model_path: Path) -> Dict:
+        """Bundle an unpacked version and remove its directory, returns sizes in bytes"""
+        self.archive_dir.mkdir(exist_ok=True)
+        bundle = self.bundle_path(version)
+        members = [model_path / name for name in BUNDLE_MEMBERS if (model_path / name).exists()]
+
+        fd, tmp_name = tempfile.mkstemp(prefix=f".tmp-{bundle.name}-", dir=self.archive_dir)
+        tmp_bundle = Path(tmp_name)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with tarfile.open(fileobj=f, mode="w:xz") as tar:
+                    for path in members:
+                        tar.add(path, arcname=path.name)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_bundle, bundle)
+            fsync_dir(self.archive_dir)
+        except BaseException:
+            tmp_bundle.unlink(missing_ok=True)
+            raise
+
+        # Move the directory out of the way in one rename, then delete it at leisure
+        unpacked_bytes = sum(path.stat().st_size for path in members)
+        trash = Path(tempfile.mkdtemp(prefix=f".trash-mlk2-{version}-", dir=self.models_dir))
+        model_path.rename(trash / model_path.name)
+        fsync_dir(self.models_dir)
+        shutil.rmtree(trash, ignore_errors=True)
+
+        logger.info(f"Archived model version {version}")
+        return {"unpacked_bytes": unpacked_bytes, "bundle_bytes": bundle.stat().st_size}
+
+    def unpack(self, version: str, model_path: Path) -> Path:
+        """Extract an archived version to ``model_path`` (no-op if another worker already did)"""
+        bundle = self.bundle_path(version)
+        tmp_path = Path(tempfile.mkdtemp(prefix=f".tmp-mlk2-{version}-", dir=self.models_dir))
+        try:
+            with tarfile.open(bundle, "r:xz") as tar:
+                # Stream the known members one by one instead of trusting extractall with bundle paths
+                for member in tar:
+                    if not member.isfile() or member.name not in BUNDLE_MEMBERS:
+                        continue
+                    target = tmp_path / member.name
+                    write_fsync(target, tar.extractfile(member).read())
+                    # Keep the packed mtimes: the shared store fingerprints model.pkl by them
+                    os.utime(target, (member.mtime, member.mtime))
+            fsync_dir(tmp_path)
+            try:
+                tmp_path.rename(model_path)
+            except OSError:
+                if not model_path.exists():
+                    raise
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            fsync_dir(self.models_dir)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        bundle.unlink(missing_ok=True)
+        logger.info(f"Extracted archived model version {version}")
+        return model_path
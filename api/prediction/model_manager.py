@@ -1,12 +1,40 @@
 import pickle
 import json
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
 import logging
+import os
+import threading
+import time
+
+from .model_archive import ModelArchive, read_metadata
+from .storage import atomic_write_bytes, fsync_dir, sha256_bytes, write_fsync
 
 logger = logging.getLogger(__name__)
 
+MODEL_FILES = ["model.pkl", "vectorizer.pkl", "selector.pkl"]
+
+
+def vectorizer_config(vectorizer) -> Dict:
+    """JSON-serializable constructor params of a fitted vectorizer"""
+    params = vectorizer.get_params()
+    params.pop('vocabulary', None)
+    dtype = params.get('dtype')
+    if dtype is not None:
+        params['dtype'] = getattr(dtype, '__name__', str(dtype))
+    return {
+        'class': type(vectorizer).__name__,
+        'params': {k: v for k, v in params.items() if v is None or isinstance(v, (str, int, float, bool, list, tuple))},
+    }
+
+
+class ModelIntegrityError(Exception):
+    """A model file does not match the checksum recorded in its metadata"""
+    pass
+
 
 class ModelManager:
     """Manage multiple ML model versions"""
@@ -16,64 +44,268 @@ class ModelManager:
         self.models_dir.mkdir(exist_ok=True)
         self.cache = {}  # Cache for loaded models
         self.cache_size = 3
+        self._cache_lock = threading.RLock()  # Views may load models from a thread pool
+        
+        # MODEL_STORE=shared: attach model arrays from a host-wide mmap store instead of
+        # keeping a private unpickled copy in every worker
+        self.shared_store = None
+        if os.getenv('MODEL_STORE', 'private') == 'shared':
+            from .shared_store import SharedModelStore
+            self.shared_store = SharedModelStore()
+        
+        # Active version pointer shared by all workers on the host (see activate_version)
+        self.active_file = self.models_dir / "ACTIVE"
+        self.active_poll_interval = float(os.getenv('ACTIVE_VERSION_POLL_SECONDS', '2'))
+        self._active = None  # (version, model_data), swapped as a whole
+        self._active_stamp = None
+        self._active_checked_at = 0.0
+        self._active_lock = threading.Lock()
+        
+        self._dataset_store = None
+        self._legacy_checked = False
+        
+        # Registry index and compressed bundles of cold versions (see archive_cold_versions)
+        self.archive = ModelArchive(self.models_dir)
+    
+    @property
+    def dataset_store(self):
+        """Content-addressed dataset store (imported lazily: it pulls in pandas)"""
+        if self._dataset_store is None:
+            from .dataset_store import get_dataset_store
+            self._dataset_store = get_dataset_store()
+        return self._dataset_store
     
     def get_model_path(self, version: str) -> Path:
         """Get path to model directory"""
         return self.models_dir / f"mlk2-{version}"
     
     def list_models(self) -> List[Dict]:
-        """List all available models with metadata"""
-        models = []
-        for model_dir in sorted(self.models_dir.iterdir()):
-            if model_dir.is_dir() and model_dir.name.startswith("mlk2-"):
-                metadata_file = model_dir / "metadata.json"
-                if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                        models.append(metadata)
+        """List all available models (hot and archived) with metadata, from the registry index"""
+        if not self._legacy_checked:
+            # Once per manager, on first use instead of at import time
+            self._legacy_checked = True
+            try:
+                self.migrate_legacy_model()
+            except Exception as e:
+                logger.warning(f"Legacy model migration skipped: {e}")
+        models = [
+            {**entry['metadata'], 'archived': entry['archived']}
+            for entry in self.archive.index().values()
+        ]
         
         # Sort by version (semantic versioning)
         models.sort(key=lambda x: [int(v) for v in x['version'].split('.')], reverse=True)
         return models
     
+    def has_version(self, version: str) -> bool:
+        """Whether ``version`` exists, unpacked or archived"""
+        return (self.get_model_path(version) / "metadata.json").exists() or self.archive.is_archived(version)
+    
+    def get_metadata(self, version: str) -> Optional[Dict]:
+        """metadata.json of a version; archived versions are answered from the registry index"""
+        metadata = read_metadata(self.get_model_path(version))
+        if metadata is None:
+            entry = self.archive.index().get(version)
+            metadata = entry['metadata'] if entry else None
+        return metadata
+    
+    def unpacked_path(self, version: str) -> Path:
+        """Directory of ``version``, extracting its bundle first if the version is archived"""
+        model_path = self.get_model_path(version)
+        if not model_path.exists():
+            if not self.archive.is_archived(version):
+                raise FileNotFoundError(f"Model version {version} not found")
+            try:
+                self.archive.unpack(version, model_path)
+            except FileNotFoundError:
+                # Another worker extracted it (and removed the bundle) first
+                if not model_path.exists():
+                    raise
+        return model_path
+    
     def get_latest_version(self) -> Optional[str]:
         """Get latest model version"""
         models = self.list_models()
         return models[0]['version'] if models else None
     
-    def load_model(self, version: str) -> Dict:
-        """Load model by version with caching"""
-        if version in self.cache:
-            return self.cache[version]
+    def _read_active_pointer(self) -> Optional[str]:
+        try:
+            version = self.active_file.read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+    
+    def _fallback_version(self) -> Optional[str]:
+        """Version served when no pointer exists: DEFAULT_MODEL_VERSION if present, else latest"""
+        default_version = os.getenv('DEFAULT_MODEL_VERSION')
+        if default_version and self.has_version(default_version):
+            return default_version
+        return self.get_latest_version()
+    
+    def get_active(self) -> Optional[tuple]:
+        """Return (version, model_data) of the active model, picking up pointer changes
         
-        model_path = self.get_model_path(version)
-        if not model_path.exists():
+        The pointer file is stat'ed at most every ``active_poll_interval`` seconds. When it
+        changes, the new version is fully loaded first and only then swapped in, so
+        concurrent requests keep using the previous (version, model_data) until the
+        new one is ready and never observe a partially loaded model.
+        """
+        now = time.monotonic()
+        if self._active is not None and now - self._active_checked_at < self.active_poll_interval:
+            return self._active
+        
+        # Only one thread refreshes; the others keep serving the current model meanwhile
+        if not self._active_lock.acquire(blocking=self._active is None):
+            return self._active
+        try:
+            self._active_checked_at = now
+            try:
+                stat = self.active_file.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                stamp = None
+            
+            # Without a pointer the fallback is re-resolved on every poll, so all workers
+            # converge on the same version (e.g. the latest after a training run)
+            if self._active is not None and stamp is not None and stamp == self._active_stamp:
+                return self._active
+            
+            version = self._read_active_pointer() if stamp else self._fallback_version()
+            if version is None:
+                return None
+            if self._active is None or self._active[0] != version:
+                try:
+                    model_data = self.load_model(version)
+                except Exception as e:
+                    if self._active is None:
+                        raise
+                    logger.error(f"Failed to preload active version {version}, keeping {self._active[0]}: {e}")
+                    return self._active
+                self._active = (version, model_data)
+                logger.info(f"Active model version is now {version}")
+            self._active_stamp = stamp
+            return self._active
+        finally:
+            self._active_lock.release()
+    
+    def get_active_version(self) -> Optional[str]:
+        """Get the version served when a request does not ask for one"""
+        active = self.get_active()
+        return active[0] if active else None
+    
+    def activate_version(self, version: str) -> Optional[str]:
+        """Preload ``version`` and atomically point every worker at it, returns previous version"""
+        if not self.has_version(version):
             raise FileNotFoundError(f"Model version {version} not found")
         
-        model_file = model_path / "model.pkl"
-        vectorizer_file = model_path / "vectorizer.pkl"
-        selector_file = model_path / "selector.pkl"
+        previous = self.get_active_version()
+        model_data = self.load_model(version)  # Fails here, before the pointer moves, if unloadable
         
-        if not model_file.exists() or not vectorizer_file.exists():
-            raise FileNotFoundError(f"Model files incomplete for version {version}")
+        # Write-then-rename so other workers read either the old or the new pointer, never half
+        atomic_write_bytes(self.active_file, version.encode('utf-8'))
         
-        with open(model_file, 'rb') as f:
-            model = pickle.load(f)
-        with open(vectorizer_file, 'rb') as f:
-            vectorizer = pickle.load(f)
+        with self._active_lock:
+            stat = self.active_file.stat()
+            self._active = (version, model_data)
+            self._active_stamp = (stat.st_mtime_ns, stat.st_size)
+            self._active_checked_at = time.monotonic()
         
-        selector = None
-        if selector_file.exists():
-            with open(selector_file, 'rb') as f:
-                selector = pickle.load(f)
+        logger.info(f"Activated model version {version} (previous: {previous})")
+        return previous
+    
+    def load_model(self, version: str) -> Dict:
+        """Load model by version with caching"""
+        with self._cache_lock:
+            if version in self.cache:
+                return self.cache[version]
+            
+            model_path = self.unpacked_path(version)
+            # Directory mtime doubles as "last used" for the archiving policy
+            try:
+                os.utime(model_path)
+            except OSError as e:
+                if not model_path.is_dir():
+                    raise
+                # Read-only image or volume: serving must not depend on recording last use
+                logger.debug(f"Could not mark model version {version} as used: {e}")
+            
+            if self.shared_store is not None and self.shared_store.is_published(version, model_path):
+                return self._cache_put(version, self._with_pipeline(self.shared_store.attach(version, model_path)))
+            
+            model_file = model_path / "model.pkl"
+            vectorizer_file = model_path / "vectorizer.pkl"
+            selector_file = model_path / "selector.pkl"
+            
+            if not model_file.exists() or not vectorizer_file.exists():
+                raise FileNotFoundError(f"Model files incomplete for version {version}")
+            
+            checksums = self._read_checksums(model_path)
+            model = self._load_verified(model_file, checksums)
+            vectorizer = self._load_verified(vectorizer_file, checksums)
+            
+            selector = None
+            if selector_file.exists():
+                selector = self._load_verified(selector_file, checksums)
+            
+            model_data = {
+                'model': model,
+                'vectorizer': vectorizer,
+                'selector': selector,
+                'version': version
+            }
+            
+            if self.shared_store is not None and self.shared_store.supports(model_data):
+                # Publish once for the host, then drop the private copy in favour of the mmap view
+                self.shared_store.publish(version, model_path, model_data)
+                model_data = self.shared_store.attach(version, model_path)
+            
+            return self._cache_put(version, self._with_pipeline(model_data))
+    
+    def _with_pipeline(self, model_data: Dict) -> Dict:
+        """Attach the version's preprocessing config and its compiled function (built once per version)"""
+        from .preprocessing import compile_preprocessor
         
-        model_data = {
-            'model': model,
-            'vectorizer': vectorizer,
-            'selector': selector,
-            'version': version
-        }
+        config = self.get_preprocessing(model_data['version'])
+        model_data['preprocessing'] = config
+        model_data['preprocess'] = compile_preprocessor(config)
+        return model_data
+    
+    def get_preprocessing(self, version: str) -> Dict:
+        """Preprocessing config a version was trained with
+        
+        Read from metadata; versions saved before it was recorded get the path their
+        dataset schema implies ('Judul TA Bersih' -> legacy, 'Judul' -> smart stopwords).
+        """
+        from .preprocessing import build_config
+        
+        config = (self.get_metadata(version) or {}).get('preprocessing')
+        if config:
+            return config
         
+        df = self.load_dataset(version)
+        if df is None:
+            return build_config(use_smart_stopwords=False)
+        from .ingestion import frame_schema
+        return build_config(**frame_schema(df)['preprocess'])
+    
+    @staticmethod
+    def _read_checksums(model_path: Path) -> Dict:
+        """Checksums recorded at save time (versions saved before checksums existed have none)"""
+        try:
+            with open(model_path / "metadata.json", 'r') as f:
+                return json.load(f).get('checksums', {})
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _load_verified(path: Path, checksums: Dict):
+        data = path.read_bytes()
+        expected = checksums.get(path.name)
+        if expected and sha256_bytes(data) != expected:
+            raise ModelIntegrityError(f"Checksum mismatch for {path.parent.name}/{path.name}")
+        return pickle.loads(data)
+    
+    def _cache_put(self, version: str, model_data: Dict) -> Dict:
         # Cache management (LRU)
         if len(self.cache) >= self.cache_size:
             oldest = next(iter(self.cache))
@@ -83,32 +315,145 @@ class ModelManager:
         logger.info(f"Loaded model version {version}")
         return model_data
     
+    def memory_report(self) -> Dict:
+        """Memory used by loaded models: host-wide shared bytes and this worker's private bytes"""
+        from .shared_store import estimate_private_bytes
+        
+        with self._cache_lock:
+            cached = dict(self.cache)
+        
+        report = {
+            'mode': 'shared' if self.shared_store is not None else 'private',
+            'pid': os.getpid(),
+            'versions': {},
+        }
+        shared = self.shared_store.memory_report() if self.shared_store is not None else {}
+        for version, model_data in cached.items():
+            report['versions'][version] = {
+                'shared': bool(model_data.get('shared')),
+                'shared_bytes': shared.get(version, {}).get('shared_bytes', 0),
+                'private_bytes_per_worker': estimate_private_bytes(model_data),
+            }
+        return report
+    
     def save_model(self, model, vectorizer, selector, version: str, metadata: Dict):
-        """Save new model version"""
+        """Save new model version
+        
+        Files are written and fsync'ed in a hidden temp directory next to the versions,
+        then published with a single atomic rename, so list_models()/load_model() only
+        ever see complete versions. SHA-256 checksums of the pickles go into metadata.
+        """
         model_path = self.get_model_path(version)
-        model_path.mkdir(parents=True, exist_ok=True)
-        
-        # Save model files
-        with open(model_path / "model.pkl", 'wb') as f:
-            pickle.dump(model, f)
-        with open(model_path / "vectorizer.pkl", 'wb') as f:
-            pickle.dump(vectorizer, f)
-        with open(model_path / "selector.pkl", 'wb') as f:
-            pickle.dump(selector, f)
-        
-        # Save metadata
-        metadata.update({
-            'version': version,
-            'created_at': datetime.now().isoformat(),
-            'model_path': str(model_path)
-        })
-        
-        with open(model_path / "metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        if model_path.exists() or self.archive.is_archived(version):
+            raise FileExistsError(f"Model version {version} already exists")
+        
+        tmp_path = Path(tempfile.mkdtemp(prefix=f".tmp-mlk2-{version}-", dir=self.models_dir))
+        try:
+            # Save model files
+            checksums = {}
+            for name, obj in zip(MODEL_FILES, [model, vectorizer, selector]):
+                data = pickle.dumps(obj)
+                write_fsync(tmp_path / name, data)
+                checksums[name] = sha256_bytes(data)
+            
+            # Save metadata (preprocessing config is supplied by the caller in metadata)
+            metadata.update({
+                'version': version,
+                'created_at': datetime.now().isoformat(),
+                'model_path': str(model_path),
+                'checksums': checksums,
+                'vectorizer': vectorizer_config(vectorizer)
+            })
+            write_fsync(tmp_path / "metadata.json", json.dumps(metadata, indent=2).encode('utf-8'))
+            fsync_dir(tmp_path)
+            
+            # mkdtemp creates the directory 0700; published versions are readable by other users
+            os.chmod(tmp_path, 0o755)
+            # Publish. os.rename replaces an existing empty directory, so check explicitly
+            if model_path.exists():
+                raise FileExistsError(f"Model version {version} already exists")
+            tmp_path.rename(model_path)
+            fsync_dir(self.models_dir)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
         
         logger.info(f"Saved model version {version}")
         return metadata
     
+    def get_dataset_hash(self, version: str) -> Optional[str]:
+        """Hash of the dataset a version was trained on
+        
+        Versions record ``dataset_hash`` in metadata. Older versions that still carry
+        their own ``data.csv`` copy are registered in the dataset store on first use.
+        """
+        model_path = self.get_model_path(version)
+        dataset_hash = (self.get_metadata(version) or {}).get('dataset_hash')
+        if dataset_hash and self.dataset_store.exists(dataset_hash):
+            return dataset_hash
+        
+        legacy_csv = model_path / "data.csv"
+        if legacy_csv.exists():
+            return self.dataset_store.put_file(legacy_csv)
+        return None
+    
+    def load_dataset(self, version: str):
+        """Training/eval DataFrame of a version, or None if the version has no dataset"""
+        dataset_hash = self.get_dataset_hash(version)
+        return self.dataset_store.load(dataset_hash) if dataset_hash else None
+    
+    def migrate_datasets(self, remove_copies: bool = False) -> Dict[str, str]:
+        """Move per-version data.csv copies into the dataset store, returns {version: dataset_hash}"""
+        migrated = {}
+        for metadata in self.list_models():
+            version = metadata['version']
+            model_path = self.get_model_path(version)
+            legacy_csv = model_path / "data.csv"
+            if not legacy_csv.exists():
+                continue
+            
+            dataset_hash = self.dataset_store.put_file(legacy_csv)
+            if metadata.get('dataset_hash') != dataset_hash:
+                metadata.pop('archived', None)
+                metadata['dataset_hash'] = dataset_hash
+                atomic_write_bytes(model_path / "metadata.json", json.dumps(metadata, indent=2).encode('utf-8'))
+            if remove_copies:
+                legacy_csv.unlink()
+            migrated[version] = dataset_hash
+            logger.info(f"Version {version} now references dataset {dataset_hash[:12]}")
+        if migrated:
+            self.archive.invalidate()
+        return migrated
+    
+    def archive_cold_versions(self, keep_latest: int = 3, max_idle_days: float = 30,
+                              pinned: Optional[List[str]] = None, dry_run: bool = False) -> Dict[str, Dict]:
+        """Pack rarely used versions into compressed bundles, returns {version: sizes}
+        
+        Stays unpacked: the ``keep_latest`` newest versions, the active and default
+        versions, ``pinned`` ones and anything loaded within ``max_idle_days`` (a
+        version directory's mtime is bumped on every load from disk).
+        """
+        models = self.list_models()
+        keep = {m['version'] for m in models[:keep_latest]}
+        keep.update(v for v in [self._read_active_pointer(), os.getenv('DEFAULT_MODEL_VERSION')] if v)
+        keep.update(pinned or [])
+        idle_before = time.time() - max_idle_days * 86400
+        
+        archived = {}
+        for metadata in models:
+            version = metadata['version']
+            if metadata['archived'] or version in keep:
+                continue
+            model_path = self.get_model_path(version)
+            if model_path.stat().st_mtime >= idle_before:
+                continue
+            if dry_run:
+                archived[version] = {}
+                continue
+            with self._cache_lock:
+                archived[version] = self.archive.pack(version, model_path)
+        return archived
+    
     def get_next_version(self, bump_type: str = 'patch') -> str:
         """Calculate next version number"""
         latest = self.get_latest_version()
@@ -0,0 +1,157 @@
+"""
+Online monitoring of /api/predict/ traffic per model version.
+
+Every prediction is handed to ``PredictionMonitor`` with a non-blocking put; a
+background thread aggregates a batch and writes it with one pipelined round trip to
+fixed-size, time-bucketed Redis hashes:
+
+    monitor:{version}:{bucket start}   n, class:{label}, conf:{bin}, tokens, oov, featureless
+
+``conf:{bin}`` is a 10-bin histogram of the max (boosted) probability, ``oov`` counts
+title tokens outside the version's TF-IDF vocabulary and ``featureless`` titles with
+no vocabulary n-gram at all (scored from the prior and keyword boosts alone). Buckets
+expire after the retention window, so each version holds at most
+``retention_buckets`` small hashes and a report reads known keys, never scans.
+"""
+
+import time
+import weakref
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+import logging
+
+from .background import BackgroundQueue
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_BINS = 10
+VERSIONS_KEY = "monitor:versions"
+
+# vectorizer -> analyzer (preprocess, tokenize, stop words, n-grams), built once per fitted vectorizer
+_analyzers = weakref.WeakKeyDictionary()
+
+
+def confidence_bin(probability: float) -> int:
+    return min(int(probability * CONFIDENCE_BINS), CONFIDENCE_BINS - 1)
+
+
+def token_stats(vectorizer, judul_clean: str) -> Dict[str, int]:
+    """Token, out-of-vocabulary token and featureless counts of one preprocessed title"""
+    analyzer = _analyzers.get(vectorizer)
+    if analyzer is None:
+        analyzer = _analyzers[vectorizer] = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    ngrams = analyzer(judul_clean)
+    tokens = [ngram for ngram in ngrams if " " not in ngram]
+    return {
+        "tokens": len(tokens),
+        "oov": sum(token not in vocabulary for token in tokens),
+        "featureless": int(not any(ngram in vocabulary for ngram in ngrams)),
+    }
+
+
+class PredictionMonitor(BackgroundQueue):
+    name = "prediction-monitor"
+
+    def __init__(self, load_predictor: Callable, client, bucket_seconds: int = 3600,
+                 retention_buckets: int = 168, **kwargs):
+        super().__init__(**kwargs)
+        self.load_predictor = load_predictor
+        self.client = client
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+
+    def bucket(self, timestamp: float) -> int:
+        return int(timestamp) // self.bucket_seconds * self.bucket_seconds
+
+    def key(self, version: str, bucket: int) -> str:
+        return f"monitor:{version}:{bucket}"
+
+    def observe(self, judul: str, model_version: str, result: Dict):
+        """Record one live prediction (never blocks the request)"""
+        confidence = max(result["probabilities"].values())
+        self.offer((time.time(), model_version, judul, str(result["prediction"]), confidence))
+
+    def process(self, batch: List[tuple]):
+        by_version = defaultdict(list)
+        for item in batch:
+            by_version[item[1]].append(item)
+
+        counters = defaultdict(Counter)
+        for version, items in by_version.items():
+            try:
+                predictor = self.load_predictor(version)
+                preprocess_fn = predictor.preprocessor or predictor.preprocess
+                vectorizer = predictor.vectorizer
+            except Exception as e:
+                logger.warning(f"Monitoring: cannot load v{version} for token stats: {e}")
+                vectorizer = None
+
+            for timestamp, _, judul, prediction, confidence in items:
+                fields = counters[self.key(version, self.bucket(timestamp))]
+                fields["n"] += 1
+                fields[f"class:{prediction}"] += 1
+                fields[f"conf:{confidence_bin(confidence)}"] += 1
+                if vectorizer is not None:
+                    fields.update(token_stats(vectorizer, preprocess_fn(judul)))
+
+        ttl = self.bucket_seconds * self.retention_buckets
+        pipe = self.client.pipeline(transaction=False)
+        for key, fields in counters.items():
+            for field, count in fields.items():
+                if count:
+                    pipe.hincrby(key, field, count)
+            pipe.expire(key, ttl)
+        pipe.sadd(VERSIONS_KEY, *by_version)
+        pipe.execute()
+
+    def report(self, versions: Optional[List[str]] = None, buckets: int = 24) -> Dict:
+        """Per-version counters of the last ``buckets`` time buckets, newest first"""
+        if not versions:
+            versions = sorted(self.client.smembers(VERSIONS_KEY))
+        buckets = max(1, min(buckets, self.retention_buckets))
+        current = self.bucket(time.time())
+        starts = [current - i * self.bucket_seconds for i in range(buckets)]
+
+        pipe = self.client.pipeline(transaction=False)
+        for version in versions:
+            for start in starts:
+                pipe.hgetall(self.key(version, start))
+        replies = iter(pipe.execute())
+
+        report = {}
+        for version in versions:
+            version_buckets = []
+            window = Counter()
+            for start in starts:
+                fields = {field: int(count) for field, count in next(replies).items()}
+                window.update(fields)
+                if fields:
+                    version_buckets.append({"start": start, **self.summarize(fields)})
+            if version_buckets:
+                report[version] = {"window": self.summarize(window), "buckets": version_buckets}
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "window_buckets": buckets,
+            "versions": report,
+        }
+
+    @staticmethod
+    def summarize(fields: Dict[str, int]) -> Dict:
+        n = fields.get("n", 0)
+        tokens = fields.get("tokens", 0)
+        class_counts = {
+            field.split(":", 1)[1]: count for field, count in fields.items() if field.startswith("class:")
+        }
+        histogram = [fields.get(f"conf:{i}", 0) for i in range(CONFIDENCE_BINS)]
+        return {
+            "predictions": n,
+            "class_counts": class_counts,
+            "class_distribution": {label: count / n for label, count in class_counts.items()} if n else {},
+            "confidence_histogram": {
+                f"{i / CONFIDENCE_BINS:.1f}-{(i + 1) / CONFIDENCE_BINS:.1f}": count
+                for i, count in enumerate(histogram)
+            },
+            "oov_token_rate": fields.get("oov", 0) / tokens if tokens else None,
+            "featureless_rate": fields.get("featureless", 0) / n if n else None,
+        }
@@ -0,0 +1,74 @@
+"""
+Model-only Naive Bayes diagnostics: priors, feature log-probability stats, smoothing
+impact, zero-probability features and pairwise class KL divergences.
+
+Everything is computed from the fitted arrays with whole-matrix operations, so the cost
+grows with ``n_classes * n_features`` (plus one ``n_classes x n_classes`` product for the
+KL matrix) instead of a Python loop per class and per class pair. No dataset is needed,
+which is what lets ``/api/analyze/nb/`` serve these without running the full analysis.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+
+def kl_divergence_matrix(feature_log_prob: np.ndarray) -> np.ndarray:
+    """KL(P_i || P_j) for every pair of class distributions, shape (n_classes, n_classes)
+
+    sum_f P_i(f) * (log P_i(f) - log P_j(f)) = (P * log P).sum(1)[i] - (P @ log P.T)[i, j]
+    """
+    log_p = np.asarray(feature_log_prob, dtype=np.float64)
+    p = np.exp(log_p)
+    self_term = np.einsum('ij,ij->i', p, log_p)
+    return self_term[:, np.newaxis] - p @ log_p.T
+
+
+def naive_bayes_diagnostics(model) -> Dict:
+    """NB-specific statistics of a fitted MultinomialNB/ComplementNB, keyed by class name"""
+    classes = model.classes_
+    log_p = np.asarray(model.feature_log_prob_, dtype=np.float64)
+    counts = np.asarray(model.feature_count_, dtype=np.float64)
+    n_features = counts.shape[1]
+
+    # 1. Prior probabilities (P(class))
+    class_priors = {cls: float(prob) for cls, prob in zip(classes, np.exp(model.class_log_prior_))}
+
+    # 2. Feature log probabilities per class (P(feature|class))
+    log_p_stats = np.stack([log_p.mean(axis=1), log_p.std(axis=1), log_p.min(axis=1), log_p.max(axis=1)], axis=1)
+    feature_log_probs = {
+        cls: {"mean": float(mean), "std": float(std), "min": float(min_), "max": float(max_)}
+        for cls, (mean, std, min_, max_) in zip(classes, log_p_stats)
+    }
+
+    # 3. Feature count per class
+    totals = counts.sum(axis=1, keepdims=True)
+    feature_counts = {cls: int(total) for cls, total in zip(classes, totals[:, 0])}
+
+    # 5. Laplace smoothing effect: mean |smoothed - unsmoothed| over features, all classes at once
+    with np.errstate(divide='ignore', invalid='ignore'):
+        smoothed = (counts + model.alpha) / (totals + model.alpha * n_features)
+        unsmoothed = counts / totals
+        smoothing = np.abs(smoothed - unsmoothed).mean(axis=1)
+    smoothing_impact = {cls: float(value) for cls, value in zip(classes, smoothing)}
+
+    # 6. Zero probability features (features never seen in training)
+    zero_counts = (counts == 0).sum(axis=1)
+    zero_prob_features = {
+        cls: {"count": int(zero), "percentage": float(zero / n_features * 100)}
+        for cls, zero in zip(classes, zero_counts)
+    }
+
+    # 7. Class separability (KL divergence between classes), one matrix product for all pairs
+    kl = kl_divergence_matrix(log_p)
+    rows, columns = np.triu_indices(len(classes), k=1)
+    kl_divergences = {f"{classes[i]}_vs_{classes[j]}": float(kl[i, j]) for i, j in zip(rows, columns)}
+
+    return {
+        "class_priors": class_priors,
+        "feature_log_probabilities": feature_log_probs,
+        "feature_counts_per_class": feature_counts,
+        "laplace_smoothing_impact": smoothing_impact,
+        "zero_probability_features": zero_prob_features,
+        "class_separability_kl_divergence": kl_divergences,
+    }
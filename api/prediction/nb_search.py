@@ -0,0 +1,181 @@
+"""
+Successive-halving search over the TF-IDF + Naive Bayes training configuration.
+
+Candidates are sampled from ``SEARCH_SPACE`` (estimator, alpha, ngram range,
+min_df/max_df, max_features) and scored with stratified K-fold CV in rungs of
+increasing fold count (``FOLD_SCHEDULE``): every candidate gets a cheap 2-fold
+estimate, the best 1/eta move on to 3 folds, and only the survivors of that are
+scored with the full 5 folds. The vectorizer is fitted inside each fold, once per
+distinct vectorizer config, and every estimator/alpha sharing it is fitted on the
+same matrices.
+
+Finalists also get a single-title inference latency (the served path: transform +
+scoring kernel with keyword boosts), and the result is their Pareto frontier over
+CV accuracy (max), overfitting gap = train - CV accuracy (min) and latency (min).
+"""
+
+import math
+import random
+import time
+from collections import defaultdict
+from itertools import product
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.naive_bayes import ComplementNB, MultinomialNB
+
+from .ml_model import NaiveBayesModel
+
+ESTIMATORS = {"MultinomialNB": MultinomialNB, "ComplementNB": ComplementNB}
+
+SEARCH_SPACE = {
+    "estimator": list(ESTIMATORS),
+    "alpha": [0.1, 0.3, 0.5, 1.0, 1.7, 2.5, 3.5, 5.0],
+    "ngram_range": [(1, 1), (1, 2), (1, 3)],
+    "min_df": [1, 2, 3, 4],
+    "max_df": [0.5, 0.7, 0.9, 1.0],
+    "max_features": [40, 100, 300, 1000, None],
+}
+
+# Configuration currently used by NaiveBayesModel.train, always included as a reference
+BASELINE = {
+    "estimator": "MultinomialNB", "alpha": 1.7, "ngram_range": (1, 2),
+    "min_df": 4, "max_df": 0.5, "max_features": 40,
+}
+
+FOLD_SCHEDULE = (2, 3, 5)
+VECTORIZER_PARAMS = ("ngram_range", "min_df", "max_df", "max_features")
+OBJECTIVES = (("cv_accuracy", "max"), ("gap", "min"), ("latency_us", "min"))
+
+
+def sample_candidates(n: int, seed: int = 42, space: Dict[str, list] = SEARCH_SPACE) -> List[Dict]:
+    """``n`` distinct configs drawn from the grid (all of it if smaller), baseline first"""
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in product(*(space[name] for name in names))]
+    grid = [params for params in grid if params != BASELINE]
+    if n - 1 < len(grid):
+        grid = random.Random(seed).sample(grid, max(n - 1, 0))
+    return [dict(BASELINE)] + grid
+
+
+def dominates(a: Dict, b: Dict, objectives=OBJECTIVES) -> bool:
+    better = False
+    for key, sense in objectives:
+        x, y = (a[key], b[key]) if sense == "min" else (b[key], a[key])
+        if x > y:
+            return False
+        better = better or x < y
+    return better
+
+
+def pareto_frontier(results: List[Dict], objectives=OBJECTIVES) -> List[Dict]:
+    """Results not dominated by any other, sorted by CV accuracy"""
+    frontier = [r for r in results if not any(dominates(other, r, objectives) for other in results)]
+    return sorted(frontier, key=lambda r: -r["cv_accuracy"])
+
+
+class SuccessiveHalvingSearch:
+    def __init__(self, texts: Sequence[str], labels: Sequence, stop_words: List[str],
+                 fold_schedule: Tuple[int, ...] = FOLD_SCHEDULE, eta: int = 3, seed: int = 42):
+        self.texts = np.asarray(texts, dtype=object)
+        self.labels = np.asarray(labels)
+        self.stop_words = stop_words
+        self.fold_schedule = fold_schedule
+        self.eta = eta
+        self.seed = seed
+
+    def vectorizer(self, params: Dict) -> TfidfVectorizer:
+        return TfidfVectorizer(
+            ngram_range=tuple(params["ngram_range"]),
+            min_df=params["min_df"],
+            max_df=params["max_df"],
+            max_features=params["max_features"],
+            sublinear_tf=True,
+            stop_words=self.stop_words,
+        )
+
+    def evaluate(self, candidates: List[Dict], n_splits: int) -> List[Dict]:
+        """Mean train/test accuracy of each candidate over ``n_splits`` stratified folds"""
+        splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=self.seed)
+                      .split(self.texts, self.labels))
+        groups = defaultdict(list)
+        for params in candidates:
+            groups[tuple(str(params[name]) for name in VECTORIZER_PARAMS)].append(params)
+
+        results = []
+        for group in groups.values():
+            train_acc = np.zeros(len(group))
+            test_acc = np.zeros(len(group))
+            try:
+                for train_idx, test_idx in splits:
+                    vectorizer = self.vectorizer(group[0])
+                    X_train = vectorizer.fit_transform(self.texts[train_idx])
+                    X_test = vectorizer.transform(self.texts[test_idx])
+                    y_train, y_test = self.labels[train_idx], self.labels[test_idx]
+                    for i, params in enumerate(group):
+                        model = ESTIMATORS[params["estimator"]](alpha=params["alpha"]).fit(X_train, y_train)
+                        train_acc[i] += model.score(X_train, y_train) / n_splits
+                        test_acc[i] += model.score(X_test, y_test) / n_splits
+            except ValueError:
+                # e.g. min_df above max_df for this fold size, or no terms left after pruning
+                continue
+            for i, params in enumerate(group):
+                results.append({
+                    **params,
+                    "folds": n_splits,
+                    "train_accuracy": float(train_acc[i]),
+                    "cv_accuracy": float(test_acc[i]),
+                    "gap": float(train_acc[i] - test_acc[i]),
+                })
+        return results
+
+    def latency_us(self, params: Dict, repeats: int = 200) -> float:
+        """Median single-title latency of the served predict path for a model fit on all data"""
+        predictor = NaiveBayesModel()
+        predictor.vectorizer = self.vectorizer(params)
+        X = predictor.vectorizer.fit_transform(self.texts)
+        predictor.model = ESTIMATORS[params["estimator"]](alpha=params["alpha"]).fit(X, self.labels)
+        titles = [self.texts[i % len(self.texts)] for i in range(repeats)]
+        predictor.predict_preprocessed(titles[:1])  # Build the scoring kernel outside the timing
+        timings = []
+        for title in titles:
+            start = time.perf_counter()
+            predictor.predict_preprocessed([title])
+            timings.append(time.perf_counter() - start)
+        return float(np.median(timings)) * 1e6
+
+    def run(self, candidates: List[Dict], latency_repeats: int = 200) -> Dict:
+        rungs = []
+        survivors = candidates
+        for rung, n_splits in enumerate(self.fold_schedule):
+            start = time.perf_counter()
+            scored = self.evaluate(survivors, n_splits)
+            scored.sort(key=lambda r: (-r["cv_accuracy"], r["gap"]))
+            rungs.append({
+                "folds": n_splits,
+                "candidates": len(survivors),
+                "evaluated": len(scored),
+                "best_cv_accuracy": scored[0]["cv_accuracy"] if scored else None,
+                "seconds": time.perf_counter() - start,
+            })
+            if rung == len(self.fold_schedule) - 1 or not scored:
+                break
+            survivors = [
+                {key: r[key] for key in SEARCH_SPACE}
+                for r in scored[:max(1, math.ceil(len(scored) / self.eta))]
+            ]
+
+        for result in scored:
+            result["latency_us"] = self.latency_us(result, latency_repeats)
+        # The baseline may be eliminated early; score it at full folds for reference
+        baseline = self.evaluate([BASELINE], self.fold_schedule[-1])
+        for result in baseline:
+            result["latency_us"] = self.latency_us(result, latency_repeats)
+        return {
+            "rungs": rungs,
+            "baseline": baseline[0] if baseline else None,
+            "finalists": scored,
+            "pareto_frontier": pareto_frontier(scored),
+        }
@@ -0,0 +1,204 @@
+"""
+Near-duplicate titles: MinHash signatures + LSH banding over preprocessed titles.
+
+A title is its set of tokens, and two titles are near-duplicates when the Jaccard
+similarity of their token sets is at least ``threshold`` (0.8 by default: the same
+template with the institution or object swapped). Each set gets a ``NUM_PERM``-value
+MinHash signature, cut into ``BANDS`` bands of 4 values; titles sharing any band land
+in the same bucket. Only titles sharing a bucket are compared (exactly, on the token
+sets), so clustering n titles costs n signatures plus the candidate pairs instead of
+n²/2 comparisons. A pair at Jaccard 0.8 becomes a candidate with probability > 0.999.
+
+Used by training (``dedup_mask``: one title per near-duplicate cluster and label) and
+by /api/predict/ (``NearDuplicateIndexer``: how many training titles of the serving
+version a new title is near-identical to). Building a version's index loads and
+preprocesses its whole dataset, so it happens on a background thread the first time
+the version is served; until it is ready the count is simply unknown.
+"""
+
+import hashlib
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .background import BackgroundQueue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 64
+BANDS = 16
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def tokens(text) -> frozenset:
+    return frozenset(str(text).split())
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHashLSH:
+    """Index of token sets answering "which indexed sets have Jaccard >= threshold with this one" """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM,
+                 bands: int = BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        # (a * h + b) mod p with 32-bit a, b and token hashes never overflows uint64
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MAX_HASH), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MAX_HASH), size=num_perm, dtype=np.uint64)
+        self._token_hashes = {}
+        self._buckets = defaultdict(list)  # (band, band values) -> ids
+        self.sets = []
+
+    def __len__(self):
+        return len(self.sets)
+
+    def _hash(self, token: str) -> int:
+        value = self._token_hashes.get(token)
+        if value is None:
+            value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+            self._token_hashes[token] = value
+        return value
+
+    def signature(self, token_set: frozenset) -> np.ndarray:
+        hashes = np.fromiter((self._hash(token) for token in token_set), dtype=np.uint64, count=len(token_set))
+        return ((hashes[:, None] * self._a + self._b) % _PRIME & _MAX_HASH).min(axis=0)
+
+    def _band_keys(self, token_set: frozenset) -> List[Tuple[int, bytes]]:
+        signature = self.signature(token_set)
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, token_set: frozenset) -> int:
+        """Index a token set, returns its id (ids follow insertion order; empty sets match nothing)"""
+        set_id = len(self.sets)
+        self.sets.append(token_set)
+        if token_set:
+            for key in self._band_keys(token_set):
+                self._buckets[key].append(set_id)
+        return set_id
+
+    def query(self, token_set: frozenset) -> List[int]:
+        """Ids of indexed sets with Jaccard >= threshold, verified exactly"""
+        if not token_set:
+            return []
+        candidates = set()
+        for key in self._band_keys(token_set):
+            candidates.update(self._buckets.get(key, ()))
+        return sorted(i for i in candidates if jaccard(token_set, self.sets[i]) >= self.threshold)
+
+
+def near_duplicate_clusters(texts: Iterable[str], threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """Groups (of 2+ positions in ``texts``) connected by near-duplicate pairs"""
+    lsh = MinHashLSH(threshold)
+    parent = []
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, text in enumerate(texts):
+        token_set = tokens(text)
+        parent.append(i)
+        for j in lsh.query(token_set):
+            parent[find(j)] = find(i)
+        lsh.add(token_set)
+
+    groups = defaultdict(list)
+    for i in range(len(parent)):
+        groups[find(i)].append(i)
+    return sorted((group for group in groups.values() if len(group) > 1), key=lambda group: group[0])
+
+
+def dedup_mask(texts: Sequence[str], labels: Sequence, threshold: float = DEFAULT_THRESHOLD):
+    """Keep mask with the first title of each (near-duplicate cluster, label), plus stats
+
+    Conflicting labels inside a cluster are all kept: they are real ambiguity, not
+    repetition.
+    """
+    return mask_from_clusters(near_duplicate_clusters(texts, threshold), labels, threshold)
+
+
+def mask_from_clusters(clusters: List[List[int]], labels: Sequence, threshold: float = DEFAULT_THRESHOLD):
+    """``dedup_mask`` for clusters already computed with ``near_duplicate_clusters``"""
+    labels = list(labels)
+    keep = np.ones(len(labels), dtype=bool)
+    for group in clusters:
+        seen = set()
+        for i in group:
+            if labels[i] in seen:
+                keep[i] = False
+            seen.add(labels[i])
+    return keep, {
+        "threshold": threshold,
+        "clusters": len(clusters),
+        "removed": int((~keep).sum()),
+    }
+
+
+class NearDuplicateIndexer(BackgroundQueue):
+    """MinHashLSH over the training titles of each served version, built in the background
+
+    Indexes are keyed by the fitted estimator, so they are dropped together with an
+    unloaded version. ``load_titles(model_version)`` returns the version's preprocessed
+    training titles, or None when its dataset is unknown.
+    """
+
+    name = "near-duplicate-index"
+
+    def __init__(self, load_titles: Callable[[str], Optional[Iterable[str]]],
+                 threshold: float = DEFAULT_THRESHOLD, max_queue: int = 64):
+        super().__init__(max_queue=max_queue, batch_size=1, max_wait_ms=0)
+        self.load_titles = load_titles
+        self.threshold = threshold
+        self._indexes = weakref.WeakKeyDictionary()  # estimator -> MinHashLSH, None: no dataset
+        self._scheduled = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def get(self, model, model_version: str) -> Optional[MinHashLSH]:
+        """Index of a fitted estimator when built, else None (and its build is scheduled)"""
+        with self._lock:
+            if model in self._indexes:
+                return self._indexes[model]
+            if model in self._scheduled:
+                return None
+            self._scheduled.add(model)
+        if not self.offer((model, model_version)):
+            with self._lock:
+                self._scheduled.discard(model)
+        return None
+
+    def build(self, model_version: str) -> Optional[MinHashLSH]:
+        titles = self.load_titles(model_version)
+        if titles is None:
+            return None
+        index = MinHashLSH(self.threshold)
+        for title in titles:
+            index.add(tokens(title))
+        return index
+
+    def process(self, batch):
+        for model, model_version in batch:
+            try:
+                index = self.build(model_version)
+                logger.info(f"Near-duplicate index of v{model_version}: {len(index) if index else 0} titles")
+            except Exception as e:
+                # Not retried while the version stays loaded: the count stays unknown
+                logger.warning(f"Failed to build near-duplicate index of v{model_version}: {e}")
+                index = None
+            with self._lock:
+                self._indexes[model] = index
@@ -0,0 +1,22 @@
+"""
+Admin-only access for endpoints that change what every worker serves.
+
+``ADMIN_API_TOKEN`` is sent as ``Authorization: Bearer <token>``. Without a configured
+token these endpoints stay open in DEBUG (local development) and are refused otherwise.
+"""
+
+import hmac
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class HasAdminToken(BasePermission):
+    message = "Admin token required"
+
+    def has_permission(self, request, view):
+        token = settings.ADMIN_API_TOKEN
+        if not token:
+            return settings.DEBUG
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(supplied.strip(), token)
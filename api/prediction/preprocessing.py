@@ -0,0 +1,88 @@
+"""
+Serializable preprocessing configs and their compiled text-cleaning functions.
+
+A config is a plain JSON-able dict stored in each version's ``metadata.json``
+(``"preprocessing"``), so inference and analysis always rebuild the exact pipeline
+a version was trained with. ``compile_preprocessor`` turns it into a function with
+pre-compiled regexes and a frozen stopword set, cached per distinct config.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+# Legacy preprocessing untuk model lama: normalisasi domain-specific terms
+LEGACY_REPLACEMENTS = [
+    [r"na[iï]ve?\s*baye?s?", "naive bayes"],
+    [r"augment\s*realiti", "augmented reality"],
+    [r"virtual\s*realiti", "virtual reality"],
+    [r"komput", "komputer"],
+    [r"berbasi", "berbasis"],
+    [r"teknolog", "teknologi"],
+    [r"uiux|ui/ux", "ui ux"],
+]
+LEGACY_MIN_TOKEN_LENGTH = 4  # Hapus kata pendek (<4 karakter) - v3.0: lebih agresif
+
+# Smart stopwords untuk v3.0.0
+SMART_STOPWORDS = [
+    'padang', 'kota', 'kabupaten', 'sumatera', 'barat', 'indonesia', 'ri', 'negeri',
+    'politeknik', 'universitas', 'institut', 'sekolah', 'madrasah', 'pt', 'cv',
+    'dinas', 'kantor', 'desa', 'kelurahan', 'kecamatan', 'nagari', 'dan', 'di',
+    'pada', 'dengan', 'menggunakan', 'studi', 'kasus', 'untuk', 'sebagai', 'dalam',
+    'ke', 'dari', 'yang', 'oleh', 'serta', 'tugas', 'akhir', 'jurusan', 'prodi',
+    'program', 'tahun'
+]
+
+
+def build_config(use_smart_stopwords: bool = False, smart_stopwords: Optional[List[str]] = None) -> Dict:
+    """Full, self-contained config for one of the two preprocessing paths"""
+    if use_smart_stopwords:
+        return {
+            'use_smart_stopwords': True,
+            'stopwords': list(smart_stopwords if smart_stopwords is not None else SMART_STOPWORDS),
+        }
+    return {
+        'use_smart_stopwords': False,
+        'replacements': [list(pair) for pair in LEGACY_REPLACEMENTS],
+        'min_token_length': LEGACY_MIN_TOKEN_LENGTH,
+    }
+
+
+def config_key(config: Dict) -> str:
+    return json.dumps(config, sort_keys=True)
+
+
+def compile_preprocessor(config: Dict) -> Callable[[str], str]:
+    """Compiled preprocessing function for ``config`` (shared by all users of the same config)"""
+    return _compile(config_key(config))
+
+
+@lru_cache(maxsize=32)
+def _compile(key: str) -> Callable[[str], str]:
+    config = json.loads(key)
+
+    if config.get('use_smart_stopwords'):
+        # v3.0.0: Simple cleaning dengan smart stopwords
+        non_alpha = re.compile(r'[^a-z\s]')
+        stopwords = frozenset(config['stopwords'])
+
+        def preprocess_smart(text):
+            text = non_alpha.sub(' ', text.lower())
+            return ' '.join(w for w in text.split() if w not in stopwords)
+
+        return preprocess_smart
+
+    replacements = [(re.compile(pattern), replacement) for pattern, replacement in config['replacements']]
+    # Hapus angka dan simbol
+    non_alpha = re.compile(r'[^a-zA-Z\s]')
+    min_length = config['min_token_length']
+
+    def preprocess_legacy(text):
+        text = text.lower()
+        for pattern, replacement in replacements:
+            text = pattern.sub(replacement, text)
+        text = non_alpha.sub('', text)
+        return ' '.join(t for t in text.split() if len(t) >= min_length)
+
+    return preprocess_legacy
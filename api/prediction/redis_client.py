@@ -1,13 +1,192 @@
 import redis
+import redis.asyncio as aioredis
 import json
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
+# History of a session:
+#   history:{sid}:{id}                            record (JSON string)
+#   history:{sid}:idx                             every id, scored by timestamp (µs)
+#   history:{sid}:idx:kbk:{label}                 ids per predicted KBK
+#   history:{sid}:idx:version:{v}                 ids per model version
+#   history:{sid}:idx:kbk:{label}:version:{v}     ids per (KBK, version)
+#   history:{sid}:facets                          names of the session's index zsets
+# A (filtered) page is one ZREVRANGEBYSCORE ... LIMIT on the matching zset plus an
+# MGET of the records, so it costs O(log n + page size) whatever the history size.
+# Cursors are "<score>:<id>" of the previous page's last item: records sharing that
+# score (ordered by id, as ZREVRANGEBYSCORE orders them) continue after the id, so
+# equal timestamps are never skipped at a page boundary.
+
+# KEYS: record, facets set, then the record's index zsets (the "all" index first).
+# ARGV: record JSON, history id, score, ttl, max records per session, record key prefix.
+# Stores the record, indexes it and drops the oldest records beyond the limit, atomically.
+ADD_HISTORY_LUA = """
+local ttl = tonumber(ARGV[4])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+for i = 3, #KEYS do
+    redis.call('ZADD', KEYS[i], ARGV[3], ARGV[2])
+    redis.call('SADD', KEYS[2], KEYS[i])
+end
+local facets = redis.call('SMEMBERS', KEYS[2])
+local excess = redis.call('ZCARD', KEYS[3]) - tonumber(ARGV[5])
+if excess > 0 then
+    local dropped = redis.call('ZRANGE', KEYS[3], 0, excess - 1)
+    for _, key in ipairs(facets) do
+        redis.call('ZREM', key, unpack(dropped))
+    end
+    for _, history_id in ipairs(dropped) do
+        redis.call('DEL', ARGV[6] .. history_id)
+    end
+end
+for _, key in ipairs(facets) do
+    redis.call('EXPIRE', key, ttl)
+end
+redis.call('EXPIRE', KEYS[2], ttl)
+return 1
+"""
+
+MAX_PAGE_SIZE = 100
+
+
+def index_key(session_id: str, predicted_kbk: Optional[str] = None, model_version: Optional[str] = None) -> str:
+    """Index zset answering the given filters"""
+    key = f"history:{session_id}:idx"
+    if predicted_kbk:
+        key += f":kbk:{predicted_kbk}"
+    if model_version:
+        key += f":version:{model_version}"
+    return key
+
+
+def record_index_keys(session_id: str, record: Dict) -> List[str]:
+    """Every index zset a record belongs to, the unfiltered one first"""
+    kbk = str(record.get('predicted_kbk', ''))
+    version = str(record.get('model_version', ''))
+    return [
+        index_key(session_id),
+        index_key(session_id, predicted_kbk=kbk),
+        index_key(session_id, model_version=version),
+        index_key(session_id, predicted_kbk=kbk, model_version=version),
+    ]
+
+
+def to_score(moment: datetime) -> int:
+    return int(moment.timestamp() * 1_000_000)
+
+
+def parse_cursor(value: str) -> Tuple[int, str]:
+    """"<score>:<id>" -> (score, id); raises ValueError"""
+    score, sep, history_id = value.partition(':')
+    if not sep or not history_id:
+        raise ValueError("Invalid cursor")
+    return int(score), history_id
+
+
+def queue_page(pipe, key: str, limit: int, cursor: Optional[Tuple[int, str]] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Queue the range reads of one page on a (sync or async) pipeline, see ``page``"""
+    lower = to_score(since) if since else "-inf"
+    if cursor is None:
+        pipe.zrevrangebyscore(key, to_score(until) if until else "+inf", lower,
+                              start=0, num=limit + 1, withscores=True)
+        return
+    score, _ = cursor
+    # Ties of the cursor's score (normally none or a few), then strictly older records
+    pipe.zrevrangebyscore(key, score, max(score, lower) if since else score, withscores=True)
+    pipe.zrevrangebyscore(key, f"({score}", lower, start=0, num=limit + 1, withscores=True)
+
+
+def page(results: List, limit: int, cursor: Optional[Tuple[int, str]] = None):
+    """(ids on this page, next cursor or None) from the results of ``queue_page``"""
+    if cursor is None:
+        rows = results[0]
+    else:
+        rows = [row for row in results[0] if row[0] < cursor[1]] + results[1]
+    next_cursor = None
+    if len(rows) > limit:
+        history_id, score = rows[limit - 1]
+        next_cursor = f"{int(score)}:{history_id}"
+    return [history_id for history_id, _ in rows[:limit]], next_cursor
+
+
+# Usage aggregates across all sessions, updated on every add_history:
+#   stats:totals              hash: predictions, class:{label}, version:{v}
+#   stats:day:{YYYY-MM-DD}    same hash for one day (expires after the retention window)
+#   stats:sessions[:{day}]    HyperLogLog of session ids (all time / one day)
+#   stats:titles              top-k normalized titles (Space-Saving: a new title evicts
+#                             the least frequent one and inherits its count + 1, so counts
+#                             are upper bounds and any title above total/capacity is kept)
+# Reading them is a fixed number of keys, independent of how many sessions exist.
+
+# KEYS: totals, day hash, sessions HLL, day sessions HLL, titles zset.
+# ARGV: class, model version, session id, normalized title, day ttl, titles capacity.
+RECORD_STATS_LUA = """
+local day_ttl = tonumber(ARGV[5])
+for i = 1, 2 do
+    redis.call('HINCRBY', KEYS[i], 'predictions', 1)
+    redis.call('HINCRBY', KEYS[i], 'class:' .. ARGV[1], 1)
+    redis.call('HINCRBY', KEYS[i], 'version:' .. ARGV[2], 1)
+end
+redis.call('PFADD', KEYS[3], ARGV[3])
+redis.call('PFADD', KEYS[4], ARGV[3])
+redis.call('EXPIRE', KEYS[2], day_ttl)
+redis.call('EXPIRE', KEYS[4], day_ttl)
+if ARGV[4] ~= '' then
+    if redis.call('ZSCORE', KEYS[5], ARGV[4]) then
+        redis.call('ZINCRBY', KEYS[5], 1, ARGV[4])
+    elseif redis.call('ZCARD', KEYS[5]) < tonumber(ARGV[6]) then
+        redis.call('ZADD', KEYS[5], 1, ARGV[4])
+    else
+        local least = redis.call('ZRANGE', KEYS[5], 0, 0, 'WITHSCORES')
+        redis.call('ZREM', KEYS[5], least[1])
+        redis.call('ZADD', KEYS[5], tonumber(least[2]) + 1, ARGV[4])
+    end
+end
+return 1
+"""
+
+STATS_TOTALS_KEY = "stats:totals"
+STATS_SESSIONS_KEY = "stats:sessions"
+STATS_TITLES_KEY = "stats:titles"
+MAX_TOP_TITLES = 100
+
+
+def normalize_title(judul) -> str:
+    """Case- and whitespace-insensitive form used to count popular titles"""
+    return " ".join(str(judul or "").lower().split())[:200]
+
+
+def history_script_call(session_id: str, record: Dict, now: datetime, ttl: int, max_per_session: int):
+    """(keys, args) of ADD_HISTORY_LUA for one record"""
+    return (
+        [f"history:{session_id}:{record['id']}", f"history:{session_id}:facets",
+         *record_index_keys(session_id, record)],
+        [json.dumps(record), record['id'], to_score(now), ttl, max_per_session, f"history:{session_id}:"],
+    )
+
+
+def stats_script_call(session_id: str, record: Dict, now: datetime, retention_days: int, titles_capacity: int):
+    """(keys, args) of RECORD_STATS_LUA for one record"""
+    day = now.date().isoformat()
+    return (
+        [STATS_TOTALS_KEY, f"stats:day:{day}", STATS_SESSIONS_KEY, f"{STATS_SESSIONS_KEY}:{day}", STATS_TITLES_KEY],
+        [str(record.get('predicted_kbk', '')), str(record.get('model_version', '')), session_id,
+         normalize_title(record.get('judul')), retention_days * 24 * 60 * 60, titles_capacity],
+    )
+
+
+def summarize_counts(fields: Dict[str, str]) -> Dict:
+    return {
+        "predictions": int(fields.get("predictions", 0)),
+        "per_class": {f[len("class:"):]: int(n) for f, n in fields.items() if f.startswith("class:")},
+        "per_version": {f[len("version:"):]: int(n) for f, n in fields.items() if f.startswith("version:")},
+    }
+
 
 class RedisHistoryManager:
     """Manage prediction history in Redis container"""
@@ -18,91 +197,137 @@ class RedisHistoryManager:
         redis_port = int(os.getenv('REDIS_PORT', '6379'))
         redis_db = int(os.getenv('REDIS_DB', '0'))
         
-        try:
-            self.client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
-            )
-            # Test connection
-            self.client.ping()
-            logger.info(f"Connected to Redis at {redis_host}:{redis_port}")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
-            raise
-            
+        # Connection is established lazily on first command, no ping at import time
+        # (GET /api/health/ reports whether Redis is reachable)
+        self.client = redis.Redis(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+        
         self.ttl = 7 * 24 * 60 * 60  # 7 days
         self.max_per_session = 100
+        self.stats_retention_days = int(os.getenv('STATS_RETENTION_DAYS', '90'))
+        self.stats_titles_capacity = int(os.getenv('STATS_TOP_TITLES_CAPACITY', '1000'))
+        self._add_script = None
+        self._stats_script = None
+    
+    @property
+    def add_script(self):
+        if self._add_script is None:
+            self._add_script = self.client.register_script(ADD_HISTORY_LUA)
+        return self._add_script
+    
+    @property
+    def stats_script(self):
+        if self._stats_script is None:
+            self._stats_script = self.client.register_script(RECORD_STATS_LUA)
+        return self._stats_script
     
     def add_history(self, session_id: str, data: Dict) -> str:
-        """Add prediction to history"""
+        """Add prediction to history and usage stats (both scripts in one round trip)"""
         history_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
         
         record = {
             'id': history_id,
-            'timestamp': timestamp,
+            'timestamp': now.isoformat(),
             **data
         }
         
-        # Save individual record
-        key = f"history:{session_id}:{history_id}"
-        self.client.setex(key, self.ttl, json.dumps(record))
-        
-        # Add to session list
-        list_key = f"history:{session_id}:list"
-        self.client.lpush(list_key, history_id)
-        self.client.expire(list_key, self.ttl)
-        
-        # Trim to max size
-        self.client.ltrim(list_key, 0, self.max_per_session - 1)
+        pipe = self.client.pipeline(transaction=False)
+        self.add_script(*history_script_call(session_id, record, now, self.ttl, self.max_per_session), client=pipe)
+        self.stats_script(*stats_script_call(session_id, record, now, self.stats_retention_days,
+                                             self.stats_titles_capacity), client=pipe)
+        pipe.execute()
         
         logger.info(f"Added history {history_id} for session {session_id}")
         return history_id
     
+    def query_history(self, session_id: str, limit: int = 50, cursor: Optional[Tuple[int, str]] = None,
+                      predicted_kbk: Optional[str] = None, model_version: Optional[str] = None,
+                      since: Optional[datetime] = None, until: Optional[datetime] = None):
+        """One page of history, newest first, returns (records, next_cursor)"""
+        pipe = self.client.pipeline(transaction=False)
+        queue_page(pipe, index_key(session_id, predicted_kbk, model_version), limit, cursor, since, until)
+        history_ids, next_cursor = page(pipe.execute(), limit, cursor)
+        if not history_ids and cursor is None and not (predicted_kbk or model_version or since or until):
+            # Sessions written before the indexes existed (expire within the 7 day TTL)
+            history_ids = self.client.lrange(f"history:{session_id}:list", 0, limit - 1)
+        if not history_ids:
+            return [], None
+        values = self.client.mget([f"history:{session_id}:{history_id}" for history_id in history_ids])
+        return [json.loads(data) for data in values if data], next_cursor
+    
     def get_history(self, session_id: str, limit: int = 50) -> List[Dict]:
         """Get history for session"""
-        list_key = f"history:{session_id}:list"
-        history_ids = self.client.lrange(list_key, 0, limit - 1)
-        
-        records = []
-        for history_id in history_ids:
-            key = f"history:{session_id}:{history_id}"
-            data = self.client.get(key)
-            if data:
-                records.append(json.loads(data))
-        
-        return records
+        return self.query_history(session_id, limit)[0]
     
     def delete_history(self, session_id: str, history_id: str) -> bool:
         """Delete specific history item"""
         key = f"history:{session_id}:{history_id}"
-        list_key = f"history:{session_id}:list"
         
-        # Remove from list
-        self.client.lrem(list_key, 0, history_id)
-        # Delete record
-        result = self.client.delete(key)
+        # Remove from every index, then the record
+        pipe = self.client.pipeline(transaction=False)
+        for index in self.client.smembers(f"history:{session_id}:facets"):
+            pipe.zrem(index, history_id)
+        pipe.delete(key)
+        result = pipe.execute()[-1]
         
         return result > 0
     
     def clear_history(self, session_id: str) -> int:
         """Clear all history for session"""
-        list_key = f"history:{session_id}:list"
-        history_ids = self.client.lrange(list_key, 0, -1)
+        facets_key = f"history:{session_id}:facets"
+        legacy_key = f"history:{session_id}:list"
+        # Records of sessions written before the indexes are only listed in the legacy list
+        history_ids = set(self.client.zrange(index_key(session_id), 0, -1))
+        history_ids.update(self.client.lrange(legacy_key, 0, -1))
         
         count = 0
-        for history_id in history_ids:
-            key = f"history:{session_id}:{history_id}"
-            count += self.client.delete(key)
-        
-        self.client.delete(list_key)
+        if history_ids:
+            count = self.client.delete(*[f"history:{session_id}:{history_id}" for history_id in history_ids])
+        self.client.delete(*self.client.smembers(facets_key), facets_key, legacy_key)
         logger.info(f"Cleared {count} history items for session {session_id}")
         return count
     
+    def get_stats(self, days: int = 7, top: int = 10) -> Dict:
+        """All-time and per-day usage over the last ``days`` days plus the ``top`` titles, one round trip"""
+        today = datetime.now().date()
+        dates = [(today - timedelta(days=i)).isoformat() for i in range(days)]
+        
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(STATS_TOTALS_KEY)
+        pipe.pfcount(STATS_SESSIONS_KEY)
+        pipe.zrevrange(STATS_TITLES_KEY, 0, top - 1, withscores=True)
+        pipe.pfcount(*[f"{STATS_SESSIONS_KEY}:{day}" for day in dates])
+        for day in dates:
+            pipe.hgetall(f"stats:day:{day}")
+            pipe.pfcount(f"{STATS_SESSIONS_KEY}:{day}")
+        totals, sessions, titles, window_sessions, *per_day = pipe.execute()
+        
+        daily = []
+        window = {"predictions": 0, "per_class": {}, "per_version": {}}
+        for day, fields, day_sessions in zip(dates, per_day[::2], per_day[1::2]):
+            if not fields:
+                continue
+            counts = summarize_counts(fields)
+            window["predictions"] += counts["predictions"]
+            for group in ("per_class", "per_version"):
+                for name, n in counts[group].items():
+                    window[group][name] = window[group].get(name, 0) + n
+            daily.append({"date": day, "unique_sessions": day_sessions, **counts})
+        
+        return {
+            "totals": {"unique_sessions": sessions, **summarize_counts(totals)},
+            "window": {"days": days, "unique_sessions": window_sessions, **window},
+            "daily": daily,
+            "top_titles": [{"judul": judul, "count": int(count)} for judul, count in titles],
+        }
+    
     def health_check(self) -> bool:
         """Check Redis connection"""
         try:
@@ -111,3 +336,79 @@ class RedisHistoryManager:
         except Exception as e:
             logger.error(f"Redis health check failed: {e}")
             return False
+
+
+class AsyncRedisHistoryManager:
+    """Async (redis.asyncio) counterpart of RedisHistoryManager for ASGI views"""
+    
+    def __init__(self):
+        redis_host = os.getenv('REDIS_HOST', 'localhost')
+        redis_port = int(os.getenv('REDIS_PORT', '6379'))
+        redis_db = int(os.getenv('REDIS_DB', '0'))
+        
+        # Connection is established lazily on first command, no ping at import time
+        self.client = aioredis.Redis(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+        )
+        
+        self.ttl = 7 * 24 * 60 * 60  # 7 days
+        self.max_per_session = 100
+        self.stats_retention_days = int(os.getenv('STATS_RETENTION_DAYS', '90'))
+        self.stats_titles_capacity = int(os.getenv('STATS_TOP_TITLES_CAPACITY', '1000'))
+        self.add_script = self.client.register_script(ADD_HISTORY_LUA)
+        self.stats_script = self.client.register_script(RECORD_STATS_LUA)
+    
+    async def add_history(self, session_id: str, data: Dict) -> str:
+        """Add prediction to history and usage stats (same scripts as RedisHistoryManager.add_history)"""
+        history_id = str(uuid.uuid4())
+        now = datetime.now()
+        
+        record = {
+            'id': history_id,
+            'timestamp': now.isoformat(),
+            **data
+        }
+        
+        pipe = self.client.pipeline(transaction=False)
+        await self.add_script(*history_script_call(session_id, record, now, self.ttl, self.max_per_session),
+                              client=pipe)
+        await self.stats_script(*stats_script_call(session_id, record, now, self.stats_retention_days,
+                                                   self.stats_titles_capacity), client=pipe)
+        await pipe.execute()
+        
+        logger.info(f"Added history {history_id} for session {session_id}")
+        return history_id
+    
+    async def query_history(self, session_id: str, limit: int = 50, cursor: Optional[Tuple[int, str]] = None,
+                            predicted_kbk: Optional[str] = None, model_version: Optional[str] = None,
+                            since: Optional[datetime] = None, until: Optional[datetime] = None):
+        """One page of history, newest first, returns (records, next_cursor)"""
+        pipe = self.client.pipeline(transaction=False)
+        queue_page(pipe, index_key(session_id, predicted_kbk, model_version), limit, cursor, since, until)
+        history_ids, next_cursor = page(await pipe.execute(), limit, cursor)
+        if not history_ids and cursor is None and not (predicted_kbk or model_version or since or until):
+            # Sessions written before the indexes existed (expire within the 7 day TTL)
+            history_ids = await self.client.lrange(f"history:{session_id}:list", 0, limit - 1)
+        if not history_ids:
+            return [], None
+        values = await self.client.mget([f"history:{session_id}:{history_id}" for history_id in history_ids])
+        return [json.loads(data) for data in values if data], next_cursor
+    
+    async def get_history(self, session_id: str, limit: int = 50) -> List[Dict]:
+        """Get history for session"""
+        return (await self.query_history(session_id, limit))[0]
+    
+    async def health_check(self) -> bool:
+        """Check Redis connection"""
+        try:
+            await self.client.ping()
+            return True
+        except Exception as e:
+            logger.error(f"Redis health check failed: {e}")
+            return False
@@ -0,0 +1,177 @@
+"""
+Log-space scoring kernel for the NB models served by ``/api/predict/``.
+
+``predict_proba`` followed by the keyword boost and a renormalization is, per title,
+
+    p_c ∝ exp(jll_c) * boost_c        with  jll = X @ feature_log_prob_.T + class_log_prior_
+
+so the kernel adds ``log(boost_c)`` to the joint log-likelihood and runs a single
+stable softmax instead. Everything that does not depend on the title (the transposed
+weight matrix, the prior and the log of every possible boost value) is computed once
+per fitted model and memoized, so a call is one sparse product plus a few vector ops.
+
+The same precomputed state backs ``explain``: a title's score for class ``c`` is the
+sum over its nonzero TF-IDF columns of ``x_j * W[j, c]`` plus the prior and the boost.
+Centering each row of ``W`` over the classes (which leaves the softmax unchanged)
+gives a per-version contribution table whose entries say how much a term favours a
+class over the others, so explaining a prediction is a lookup of a few table rows.
+"""
+
+import threading
+import weakref
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+EXPLAIN_DEFAULT_TOP_K = 5
+EXPLAIN_MAX_TOP_K = 20
+
+
+class ScoringKernel:
+    """Precomputed scoring state for one fitted estimator (see ``NaiveBayesModel.predict_batch``)"""
+
+    def __init__(self, model, keywords: Dict[str, List[str]], keyword_boost_factor: float,
+                 animation_keywords: Dict[str, List[str]], animasi_boosts: Dict[int, float]):
+        # Already imported by unpickling ``model``; kept out of module import for worker boot
+        from sklearn.naive_bayes import ComplementNB, MultinomialNB
+
+        self.model = model
+        self.classes = model.classes_
+        n_classes = len(self.classes)
+
+        if isinstance(model, (MultinomialNB, ComplementNB)):
+            # (n_features, n_classes), C-contiguous so sparse @ dense never copies per call
+            self.weights = np.ascontiguousarray(np.asarray(model.feature_log_prob_, dtype=np.float64).T)
+            if isinstance(model, MultinomialNB) or n_classes == 1:
+                self.prior = np.array(model.class_log_prior_, dtype=np.float64)
+            else:
+                # ComplementNB leaves the prior out of its joint log-likelihood
+                self.prior = np.zeros(n_classes)
+        else:
+            self.weights = self.prior = None
+        self._contributions = None
+        self._feature_names = None
+        self._feature_source = None
+
+        # Keyword boost 1 + hits * factor, stored as log-offsets indexed by the hit count
+        self.class_keywords: List[Tuple[int, Tuple[str, ...]]] = [
+            (i, tuple(keywords[cls])) for i, cls in enumerate(self.classes) if keywords.get(cls)
+        ]
+        max_hits = max((len(kws) for _, kws in self.class_keywords), default=0)
+        self.log_keyword_boost = np.log1p(keyword_boost_factor * np.arange(max_hits + 1))
+
+        # Animasi boost by total animation keyword hits (capped at the largest threshold)
+        animasi = np.flatnonzero(self.classes == 'Animasi')
+        self.animasi_index = int(animasi[0]) if len(animasi) else None
+        self.animation_keywords = tuple(kw for group in animation_keywords.values() for kw in group)
+        max_threshold = max(animasi_boosts, default=0)
+        self.log_animasi_boost = np.zeros(max_threshold + 1)
+        for hits in range(1, max_threshold + 1):
+            threshold = max((t for t in animasi_boosts if t <= hits), default=None)
+            if threshold is not None:
+                self.log_animasi_boost[hits] = np.log(animasi_boosts[threshold])
+
+    def joint_log_likelihood(self, X) -> np.ndarray:
+        """Unnormalized class log-likelihoods, shape (n_samples, n_classes)"""
+        if self.weights is None:
+            return self.model.predict_joint_log_proba(X)
+        if X.shape[0] == 1:
+            # Single title: gather the few nonzero rows instead of a full sparse product
+            row = X.tocsr()
+            return (row.data @ self.weights[row.indices] + self.prior)[np.newaxis, :]
+        return np.asarray(X @ self.weights) + self.prior
+
+    def log_boost(self, texts: List[str]) -> np.ndarray:
+        """Keyword + Animasi boosts of preprocessed titles as log-offsets, shape (n_samples, n_classes)"""
+        offsets = np.zeros((len(texts), len(self.classes)))
+        max_animasi = len(self.log_animasi_boost) - 1
+        for row, text in enumerate(texts):
+            for i, kws in self.class_keywords:
+                offsets[row, i] = self.log_keyword_boost[sum(1 for kw in kws if kw in text)]
+            if self.animasi_index is not None and max_animasi > 0:
+                hits = sum(1 for kw in self.animation_keywords if kw in text)
+                offsets[row, self.animasi_index] += self.log_animasi_boost[min(hits, max_animasi)]
+        return offsets
+
+    def keyword_hits(self, text: str) -> Dict[int, List[str]]:
+        """Boost keywords found in a preprocessed title, per class index"""
+        hits = {i: [kw for kw in kws if kw in text] for i, kws in self.class_keywords}
+        if self.animasi_index is not None:
+            animasi_hits = hits.get(self.animasi_index, []) + [kw for kw in self.animation_keywords if kw in text]
+            hits[self.animasi_index] = list(dict.fromkeys(animasi_hits))
+        return hits
+
+    def contribution_table(self, vectorizer, selector=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(feature names, centered log-prob weights) for this version, built once"""
+        if self.weights is None:
+            raise ValueError(f"Explanations are not supported for {type(self.model).__name__}")
+        source = self._feature_source
+        if source is None or source[0] is not vectorizer or source[1] is not selector:
+            feature_names = vectorizer.get_feature_names_out()
+            if selector is not None:
+                feature_names = feature_names[selector.get_support()]
+            self._contributions = self.weights - self.weights.mean(axis=1, keepdims=True)
+            self._feature_names = feature_names
+            self._feature_source = (vectorizer, selector)
+        return self._feature_names, self._contributions
+
+    def explain(self, X, texts: List[str], vectorizer, selector=None,
+                top_k: int = EXPLAIN_DEFAULT_TOP_K) -> List[Dict]:
+        """Top-k contributing n-grams and keyword hits per class for each title
+
+        ``contribution`` is ``tfidf * (log P(term|class) - mean over classes)``;
+        per class, the contributions plus the centered prior and ``keyword_log_boost``
+        add up to the class log-score up to a per-title constant.
+        """
+        feature_names, contributions = self.contribution_table(vectorizer, selector)
+        prior = self.prior - self.prior.mean()
+        log_boost = self.log_boost(texts)
+        X = X.tocsr()
+
+        explanations = []
+        for row, text in enumerate(texts):
+            start, end = X.indptr[row], X.indptr[row + 1]
+            columns, values = X.indices[start:end], X.data[start:end]
+            row_contributions = contributions[columns] * values[:, np.newaxis]  # (nnz, n_classes)
+            hits = self.keyword_hits(text)
+
+            explanation = {}
+            for i, cls in enumerate(self.classes):
+                order = np.argsort(-row_contributions[:, i], kind='stable')[:top_k]
+                explanation[cls] = {
+                    "log_prior": float(prior[i]),
+                    "keyword_log_boost": float(log_boost[row, i]),
+                    "keywords": hits.get(i, []),
+                    "top_features": [
+                        {
+                            "term": str(feature_names[columns[j]]),
+                            "tfidf": float(values[j]),
+                            "contribution": float(row_contributions[j, i]),
+                        }
+                        for j in order
+                    ],
+                }
+            explanations.append(explanation)
+        return explanations
+
+    def predict_proba(self, X, texts: List[str]) -> np.ndarray:
+        """Boosted, renormalized class probabilities (one stable softmax per row)"""
+        scores = self.joint_log_likelihood(X) + self.log_boost(texts)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+_kernels = weakref.WeakKeyDictionary()  # fitted estimator -> ScoringKernel
+_kernels_lock = threading.Lock()
+
+
+def get_kernel(model, **kwargs) -> ScoringKernel:
+    """Kernel for a fitted estimator, built on first use and dropped with the estimator"""
+    with _kernels_lock:
+        kernel = _kernels.get(model)
+        if kernel is None:
+            kernel = ScoringKernel(model, **kwargs)
+            _kernels[model] = kernel
+        return kernel
@@ -0,0 +1,126 @@
+"""
+Shadow scoring: a candidate version scores a copy of live /api/predict/ traffic.
+
+The predict views hand each (title, primary result, primary latency) to the shadow
+queue with a non-blocking put and return immediately; a background thread scores the
+candidate in batches and records, per primary version, in Redis:
+
+* ``shadow:{candidate}:{primary}:stats`` - scored, agree, primary_ms, shadow_ms (sums)
+* ``shadow:{candidate}:{primary}:flips`` - ``"{primary class}->{shadow class}"`` counts
+* ``shadow:{candidate}:primaries``       - primary versions seen
+* ``shadow:{candidate}:meta``            - dropped (queue full) and errors
+"""
+
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+import logging
+
+from .background import BackgroundQueue
+from .ml_model import NaiveBayesModel
+
+logger = logging.getLogger(__name__)
+
+SHADOW_TTL = 30 * 24 * 60 * 60  # 30 days
+
+
+class ShadowScorer(BackgroundQueue):
+    name = "shadow-scorer"
+
+    def __init__(self, candidate_version: str, load_model: Callable[[str], Dict], client, **kwargs):
+        super().__init__(**kwargs)
+        self.candidate_version = candidate_version
+        self.load_model = load_model
+        self.client = client
+        self._reported_drops = 0
+
+    def key(self, suffix: str) -> str:
+        return f"shadow:{self.candidate_version}:{suffix}"
+
+    def offer_prediction(self, judul: str, primary_version: str, primary_prediction, primary_ms: float):
+        """Copy one live prediction to the shadow queue (never blocks the request)"""
+        if primary_version == self.candidate_version:
+            return
+        self.offer((judul, primary_version, str(primary_prediction), primary_ms))
+
+    def process(self, batch: List[tuple]):
+        pipe = self.client.pipeline(transaction=False)
+        dropped, self._reported_drops = self.dropped - self._reported_drops, self.dropped
+        if dropped:
+            pipe.hincrby(self.key("meta"), "dropped", dropped)
+
+        try:
+            predictor = NaiveBayesModel.from_model_data(self.load_model(self.candidate_version))
+            start = time.perf_counter()
+            results = predictor.predict_batch([judul for judul, _, _, _ in batch])
+            # Batched scoring: each title is charged its share of the batch time
+            shadow_ms = (time.perf_counter() - start) * 1000 / len(batch)
+        except Exception as e:
+            logger.warning(f"Shadow scoring with v{self.candidate_version} failed: {e}")
+            pipe.hincrby(self.key("meta"), "errors", len(batch))
+            pipe.execute()
+            return
+
+        stats = defaultdict(lambda: defaultdict(float))
+        flips = defaultdict(lambda: defaultdict(int))
+        for (judul, primary_version, primary_prediction, primary_ms), result in zip(batch, results):
+            shadow_prediction = str(result["prediction"])
+            stats[primary_version]["scored"] += 1
+            stats[primary_version]["agree"] += shadow_prediction == primary_prediction
+            stats[primary_version]["primary_ms"] += primary_ms
+            stats[primary_version]["shadow_ms"] += shadow_ms
+            flips[primary_version][f"{primary_prediction}->{shadow_prediction}"] += 1
+
+        for primary_version, fields in stats.items():
+            stats_key = self.key(f"{primary_version}:stats")
+            flips_key = self.key(f"{primary_version}:flips")
+            pipe.hincrby(stats_key, "scored", int(fields["scored"]))
+            pipe.hincrby(stats_key, "agree", int(fields["agree"]))
+            pipe.hincrbyfloat(stats_key, "primary_ms", fields["primary_ms"])
+            pipe.hincrbyfloat(stats_key, "shadow_ms", fields["shadow_ms"])
+            for flip, count in flips[primary_version].items():
+                pipe.hincrby(flips_key, flip, count)
+            pipe.sadd(self.key("primaries"), primary_version)
+            for key in (stats_key, flips_key, self.key("primaries"), self.key("meta")):
+                pipe.expire(key, SHADOW_TTL)
+        pipe.execute()
+
+    def report(self) -> Dict:
+        """Agreement rate, class-flip matrix and latency delta per primary version"""
+        primaries = sorted(self.client.smembers(self.key("primaries")))
+        pipe = self.client.pipeline(transaction=False)
+        for primary_version in primaries:
+            pipe.hgetall(self.key(f"{primary_version}:stats"))
+            pipe.hgetall(self.key(f"{primary_version}:flips"))
+        pipe.hgetall(self.key("meta"))
+        replies = pipe.execute()
+        meta = replies[-1]
+
+        comparisons = {}
+        for i, primary_version in enumerate(primaries):
+            stats, flips = replies[2 * i], replies[2 * i + 1]
+            scored = int(stats.get("scored", 0))
+            if not scored:
+                continue
+            primary_ms = float(stats.get("primary_ms", 0)) / scored
+            shadow_ms = float(stats.get("shadow_ms", 0)) / scored
+            flip_matrix = {}
+            for flip, count in flips.items():
+                primary_class, shadow_class = flip.split("->", 1)
+                flip_matrix.setdefault(primary_class, {})[shadow_class] = int(count)
+            comparisons[primary_version] = {
+                "scored": scored,
+                "agreement_rate": int(stats.get("agree", 0)) / scored,
+                "flip_matrix": flip_matrix,
+                "avg_primary_ms": primary_ms,
+                "avg_shadow_ms": shadow_ms,
+                "latency_delta_ms": shadow_ms - primary_ms,
+            }
+
+        return {
+            "candidate": self.candidate_version,
+            "comparisons": comparisons,
+            "dropped": int(meta.get("dropped", 0)),
+            "errors": int(meta.get("errors", 0)),
+            "queued": self.pending(),
+        }
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB, ComplementNB
+
+logger = logging.getLogger(__name__)
+
+ESTIMATORS = {
+    'MultinomialNB': MultinomialNB,
+    'ComplementNB': ComplementNB,
+}
+
+# Fitted arrays published per version, attached read-only by every worker
+MODEL_ARRAYS = ['classes_', 'class_count_', 'class_log_prior_', 'feature_count_', 'feature_log_prob_']
+
+
+class SharedModelStore:
+    """Publish model arrays once per host and attach them read-only via mmap
+
+    Every gunicorn worker that unpickles a version keeps a private copy of its
+    vocabulary, idf and ``feature_log_prob_`` arrays. In shared mode the first
+    worker writes those arrays as ``.npy`` files under ``MODEL_SHARED_DIR``
+    (``/dev/shm`` by default, i.e. RAM-backed) and all workers map them with
+    ``np.load(mmap_mode='r')``, so the page cache holds a single copy per host.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        if root is None:
+            default_root = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+            root = Path(os.getenv('MODEL_SHARED_DIR', default_root / "mlk2-models"))
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, version: str, source_dir: Path) -> Path:
+        # Fingerprint the source pickle so a rewritten version is never served stale arrays
+        stat = (source_dir / "model.pkl").stat()
+        return self.root / f"mlk2-{version}-{stat.st_size}-{stat.st_mtime_ns}"
+
+    @staticmethod
+    def supports(model_data: Dict) -> bool:
+        """Only plain TF-IDF + NB pipelines without a feature selector can be shared"""
+        return (
+            model_data.get('selector') is None
+            and type(model_data['model']).__name__ in ESTIMATORS
+            and isinstance(model_data['vectorizer'], TfidfVectorizer)
+        )
+
+    def is_published(self, version: str, source_dir: Path) -> bool:
+        return (self._entry_path(version, source_dir) / "manifest.json").exists()
+
+    def publish(self, version: str, source_dir: Path, model_data: Dict) -> Path:
+        """Write the version's arrays to the shared store (no-op if another worker already did)"""
+        target = self._entry_path(version, source_dir)
+        if (target / "manifest.json").exists():
+            return target
+
+        model = model_data['model']
+        vectorizer = model_data['vectorizer']
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=self.root))
+        try:
+            arrays = {name: getattr(model, name) for name in MODEL_ARRAYS}
+            arrays['idf_'] = vectorizer.idf_
+            terms = [''] * len(vectorizer.vocabulary_)
+            for term, idx in vectorizer.vocabulary_.items():
+                terms[idx] = term
+            # Column-ordered terms as one newline-joined UTF-8 buffer (no fixed-width padding)
+            arrays['terms'] = np.frombuffer("\n".join(terms).encode('utf-8'), dtype=np.uint8)
+
+            for name, array in arrays.items():
+                array = np.asarray(array)
+                if array.dtype == object:
+                    array = array.astype(str)  # e.g. classes_; .npy without pickles must be fixed-width
+                np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+
+            vectorizer_params = vectorizer.get_params()
+            vectorizer_params.pop('vocabulary', None)
+            vectorizer_params['dtype'] = np.dtype(vectorizer_params['dtype']).name
+            manifest = {
+                'version': version,
+                'estimator': type(model).__name__,
+                'estimator_params': model.get_params(),
+                'vectorizer_params': vectorizer_params,
+                'arrays': {name: int(np.asarray(array).nbytes) for name, array in arrays.items()},
+            }
+            # Manifest is written last: its presence marks a complete entry
+            with open(tmp_dir / "manifest.json", 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            try:
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Another worker published the same version first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Published model version {version} to shared store {target}")
+        return target
+
+    def attach(self, version: str, source_dir: Path) -> Dict:
+        """Rebuild estimator and vectorizer around read-only memory-mapped arrays"""
+        entry = self._entry_path(version, source_dir)
+        with open(entry / "manifest.json", 'r') as f:
+            manifest = json.load(f)
+
+        def load(name):
+            return np.load(entry / f"{name}.npy", mmap_mode='r', allow_pickle=False)
+
+        model = ESTIMATORS[manifest['estimator']](**manifest['estimator_params'])
+        for name in MODEL_ARRAYS:
+            setattr(model, name, load(name))
+        model.n_features_in_ = model.feature_log_prob_.shape[1]
+
+        vectorizer_params = dict(manifest['vectorizer_params'])
+        vectorizer_params['dtype'] = np.dtype(vectorizer_params['dtype']).type
+        if vectorizer_params.get('ngram_range') is not None:
+            vectorizer_params['ngram_range'] = tuple(vectorizer_params['ngram_range'])
+        vectorizer = TfidfVectorizer(**vectorizer_params)
+        # The term -> column dict is rebuilt per worker; the arrays themselves stay shared
+        terms = load('terms').tobytes().decode('utf-8').split("\n")
+        vectorizer.vocabulary_ = {term: idx for idx, term in enumerate(terms)}
+        vectorizer.idf_ = load('idf_')
+
+        return {
+            'model': model,
+            'vectorizer': vectorizer,
+            'selector': None,
+            'version': version,
+            'shared': True,
+        }
+
+    def memory_report(self) -> Dict:
+        """Bytes held in the shared store per version (one copy per host, whatever the worker count)"""
+        report = {}
+        for entry in sorted(self.root.glob("mlk2-*")):
+            manifest_file = entry / "manifest.json"
+            if not manifest_file.exists():
+                continue
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+            report[manifest['version']] = {
+                'shared_bytes': sum(p.stat().st_size for p in entry.glob("*.npy")),
+                'arrays': manifest['arrays'],
+                'path': str(entry),
+            }
+        return report
+
+
+def estimate_private_bytes(model_data: Dict) -> int:
+    """Rough per-worker footprint of the parts of a loaded model that are not memory-mapped"""
+    total = 0
+    vocabulary = getattr(model_data['vectorizer'], 'vocabulary_', {})
+    total += sys.getsizeof(vocabulary) + sum(sys.getsizeof(term) for term in vocabulary)
+    if not model_data.get('shared'):
+        model = model_data['model']
+        for name in MODEL_ARRAYS:
+            total += getattr(model, name).nbytes
+        # CountVectorizer versions (e.g. 3.2.0, 3.3.0) have no idf_
+        idf = getattr(model_data['vectorizer'], 'idf_', None)
+        total += idf.nbytes if idf is not None else 0
+    return total
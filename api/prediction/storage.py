@@ -0,0 +1,39 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def fsync_dir(path: Path):
+    """Flush a directory entry (new/renamed files) to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_fsync(path: Path, data: bytes):
+    """Write ``data`` to ``path`` and fsync it before returning"""
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Replace ``path`` atomically: readers see either the old or the new content, never a partial file"""
+    path = Path(path)
+    # One temp file per writer thread: concurrent writers of the same path never share one
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write_fsync(tmp_path, data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    fsync_dir(path.parent)
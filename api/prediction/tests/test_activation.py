@@ -0,0 +1,47 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from prediction import views
+from prediction.model_manager import ModelManager
+from prediction.tests.utils import FakeRedisMixin
+
+
+@override_settings(DEBUG=False, ADMIN_API_TOKEN="s3cret")
+class ActivateModelAuthTests(FakeRedisMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self._patch(mock.patch.object(views.model_manager, "activate_version", return_value="4.0.0"))
+
+    def activate(self, **headers):
+        return self.client.post("/api/models/activate/", {"version": "4.1.0"}, format="json", **headers)
+
+    def test_requires_admin_token(self):
+        self.assertEqual(self.activate().status_code, 403)
+        self.assertEqual(self.activate(HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        views.model_manager.activate_version.assert_not_called()
+
+    def test_activates_with_admin_token(self):
+        response = self.activate(HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["active"], "4.1.0")
+
+    @override_settings(ADMIN_API_TOKEN="")
+    def test_refused_in_production_without_configured_token(self):
+        self.assertEqual(self.activate(HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+
+
+class ActiveFallbackTests(SimpleTestCase):
+    def test_fallback_is_re_resolved_without_pointer(self):
+        manager = ModelManager()
+        manager.active_file = Path(tempfile.mkdtemp()) / "ACTIVE"
+        manager.active_poll_interval = 0
+        with mock.patch.object(manager, "_fallback_version", side_effect=["4.0.0", "4.1.0"]), \
+                mock.patch.object(manager, "load_model", side_effect=lambda version: {"version": version}):
+            self.assertEqual(manager.get_active_version(), "4.0.0")
+            # A newer version appeared (e.g. training): every worker moves to it on its next poll
+            self.assertEqual(manager.get_active_version(), "4.1.0")
@@ -0,0 +1,33 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from prediction import async_views
+from prediction.coalescer import PredictionCoalescer
+from prediction.tests.utils import FakeRedisMixin
+
+
+class AsyncPredictTests(FakeRedisMixin, SimpleTestCase):
+    async def test_non_object_json_body_is_rejected(self):
+        for body in ("[]", '"x"', "1", "null"):
+            with self.subTest(body=body):
+                response = await self.async_client.post("/api/async/predict/", body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid JSON body"})
+
+    @override_settings(PREDICTION_COALESCE_TIMEOUT_S=0.1)
+    async def test_stalled_coalescer_times_out(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stalled_batch(judul_list, model_version):
+            release.wait(5)
+            return [{"prediction": "Software", "probabilities": {"Software": 1.0}} for _ in judul_list], "4.1.0"
+
+        coalescer = PredictionCoalescer(stalled_batch, max_wait_ms=1, max_batch_size=1)
+        with mock.patch.object(async_views, "prediction_coalescer", coalescer):
+            response = await self.async_client.post("/api/async/predict/", {"judul": "sistem informasi"},
+                                                    content_type="application/json")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"error": "Prediction timed out"})
@@ -0,0 +1,28 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from prediction.background import BackgroundQueue
+
+
+class BackgroundQueueTests(SimpleTestCase):
+    def test_missing_process_fails_at_construction(self):
+        class NoProcess(BackgroundQueue):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoProcess()
+
+    def test_batches_reach_process(self):
+        done = threading.Event()
+
+        class Collector(BackgroundQueue):
+            def process(self, batch):
+                self.batch = batch
+                done.set()
+
+        collector = Collector(batch_size=8, max_wait_ms=20)
+        for i in range(3):
+            self.assertTrue(collector.offer(i))
+        self.assertTrue(done.wait(5))
+        self.assertEqual(collector.batch, [0, 1, 2])
@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from prediction.coalescer import PredictionCoalescer
+
+
+def score_batch(judul_list, model_version):
+    if model_version == "broken":
+        raise RuntimeError("scoring failed")
+    return [{"prediction": judul.upper()} for judul in judul_list], model_version or "1.0.0"
+
+
+class PredictionCoalescerTests(SimpleTestCase):
+    def setUp(self):
+        # Long enough wait that all submits below land in the same batch
+        self.coalescer = PredictionCoalescer(score_batch, max_wait_ms=200, max_batch_size=8)
+
+    def test_cancelled_future_does_not_break_its_batch(self):
+        first = self.coalescer.submit("a")
+        cancelled = self.coalescer.submit("b")
+        last = self.coalescer.submit("c")
+        self.assertTrue(cancelled.cancel())
+
+        self.assertEqual(first.result(timeout=5), ({"prediction": "A"}, "1.0.0"))
+        self.assertEqual(last.result(timeout=5), ({"prediction": "C"}, "1.0.0"))
+        self.assertTrue(cancelled.cancelled())
+        self.assertTrue(self.coalescer._thread.is_alive())
+
+        # The dispatcher keeps serving later requests
+        self.assertEqual(self.coalescer.submit("d").result(timeout=5), ({"prediction": "D"}, "1.0.0"))
+
+    def test_failing_batch_reaches_its_callers_only(self):
+        failing = self.coalescer.submit("a", "broken")
+        ok = self.coalescer.submit("b", "2.0.0")
+
+        with self.assertRaises(RuntimeError):
+            failing.result(timeout=5)
+        self.assertEqual(ok.result(timeout=5), ({"prediction": "B"}, "2.0.0"))
+        self.assertTrue(self.coalescer._thread.is_alive())
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from prediction import async_views, redis_client, views
+from prediction.tests.utils import FakeRedisMixin
+
+
+def frozen_at(moment):
+    class Frozen(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment
+    return mock.patch.object(redis_client, "datetime", Frozen)
+
+
+def record(i):
+    return {"judul": f"judul {i}", "predicted_kbk": "Software", "model_version": "4.1.0"}
+
+
+class HistoryPaginationTests(FakeRedisMixin, SimpleTestCase):
+    def add(self, count, moment):
+        with frozen_at(moment):
+            return [views.history_manager.add_history("s1", record(i)) for i in range(count)]
+
+    def test_equal_timestamps_are_not_skipped_at_page_boundaries(self):
+        ids = self.add(5, datetime(2026, 10, 1, 12)) + self.add(3, datetime(2026, 10, 1, 11))
+
+        seen, cursor = [], None
+        while True:
+            params = {"session_id": "s1", "limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/api/history/", params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            seen += [item["id"] for item in data["history"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), len(ids))
+        self.assertEqual(set(seen), set(ids))
+
+    async def test_async_view_pages_the_same_way(self):
+        with frozen_at(datetime(2026, 10, 1, 12)):
+            ids = [await async_views.async_history_manager.add_history("s1", record(i)) for i in range(3)]
+        first = (await self.async_client.get("/api/async/history/", {"session_id": "s1", "limit": 2})).json()
+        second = (await self.async_client.get("/api/async/history/", {"session_id": "s1", "limit": 2,
+                                                                       "cursor": first["next_cursor"]})).json()
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual({item["id"] for item in first["history"] + second["history"]}, set(ids))
+
+    def test_limit_above_page_size_is_capped(self):
+        self.add(3, datetime(2026, 10, 1, 12))
+        response = self.client.get("/api/history/", {"session_id": "s1", "limit": 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(self.client.get("/api/history/", {"session_id": "s1", "limit": 0}).status_code, 400)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/history/", {"session_id": "s1", "cursor": "12345"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_clear_removes_legacy_list_and_its_records(self):
+        self.add(2, datetime(2026, 10, 1, 12))
+        self.redis.set("history:s1:legacy-1", json.dumps({"id": "legacy-1"}))
+        self.redis.rpush("history:s1:list", "legacy-1")
+
+        self.assertEqual(views.history_manager.clear_history("s1"), 3)
+        self.assertEqual(self.redis.keys("history:s1:*"), [])
@@ -0,0 +1,33 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from prediction.model_manager import ModelManager
+
+
+class MemoryReportTests(SimpleTestCase):
+    # 3.2.0 is a CountVectorizer version (no idf_), 4.1.0 a TfidfVectorizer one
+    VERSIONS = ["3.2.0", "4.1.0"]
+
+    def check_report(self, manager, mode):
+        for version in self.VERSIONS:
+            manager.load_model(version)
+        report = manager.memory_report()
+        self.assertEqual(report['mode'], mode)
+        for version in self.VERSIONS:
+            self.assertGreater(report['versions'][version]['private_bytes_per_worker'], 0)
+
+    def test_private_mode_with_count_vectorizer_version(self):
+        with mock.patch.dict(os.environ, {'MODEL_STORE': 'private'}):
+            self.check_report(ModelManager(), 'private')
+
+    def test_shared_mode_with_count_vectorizer_version(self):
+        with tempfile.TemporaryDirectory() as shared_dir, \
+                mock.patch.dict(os.environ, {'MODEL_STORE': 'shared', 'MODEL_SHARED_DIR': shared_dir}):
+            manager = ModelManager()
+            self.check_report(manager, 'shared')
+            report = manager.memory_report()
+            self.assertFalse(report['versions']['3.2.0']['shared'])
+            self.assertTrue(report['versions']['4.1.0']['shared'])
@@ -0,0 +1,18 @@
+import errno
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from prediction.model_manager import ModelManager
+
+
+class LoadModelTests(SimpleTestCase):
+    def test_loads_from_read_only_model_directory(self):
+        manager = ModelManager()
+        with mock.patch("prediction.model_manager.os.utime", side_effect=OSError(errno.EROFS, "Read-only file system")):
+            model_data = manager.load_model("4.1.0")
+        self.assertEqual(model_data["version"], "4.1.0")
+
+    def test_unknown_version_is_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            ModelManager().load_model("0.0.404")
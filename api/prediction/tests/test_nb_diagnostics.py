@@ -0,0 +1,26 @@
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.naive_bayes import MultinomialNB
+
+from prediction.nb_diagnostics import kl_divergence_matrix, naive_bayes_diagnostics
+
+
+class KLDivergenceTests(SimpleTestCase):
+    def test_matrix_matches_per_pair_sum(self):
+        rng = np.random.RandomState(0)
+        X = rng.poisson(1.0, size=(60, 25))
+        y = np.array(["AI", "Jaringan", "Software", "Animasi"] * 15)
+        model = MultinomialNB(alpha=1.0).fit(X, y)
+
+        kl = kl_divergence_matrix(model.feature_log_prob_)
+        n_classes = len(model.classes_)
+        for i in range(n_classes):
+            for j in range(n_classes):
+                p = np.exp(model.feature_log_prob_[i])
+                q = np.exp(model.feature_log_prob_[j])
+                self.assertAlmostEqual(kl[i, j], float(np.sum(p * np.log(p / q))), places=12)
+
+        reported = naive_bayes_diagnostics(model)["class_separability_kl_divergence"]
+        self.assertEqual(len(reported), n_classes * (n_classes - 1) // 2)
+        i, j = 0, 1
+        self.assertAlmostEqual(reported[f"{model.classes_[i]}_vs_{model.classes_[j]}"], kl[i, j], places=12)
@@ -0,0 +1,86 @@
+import tempfile
+import time
+from itertools import combinations
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from prediction import views
+from prediction.ml_model import NaiveBayesModel
+from prediction.near_duplicates import (
+    DEFAULT_THRESHOLD, MinHashLSH, NearDuplicateIndexer, dedup_mask, jaccard, tokens,
+)
+from prediction.tests.utils import FakeRedisMixin
+
+DATA_CSV = Path(__file__).resolve().parents[2] / "data.csv"
+
+
+class MinHashLSHTests(SimpleTestCase):
+    def test_recall_against_brute_force_jaccard(self):
+        titles = pd.read_csv(DATA_CSV).iloc[:, 0].astype(str).str.lower().tolist()
+        sets = [tokens(title) for title in titles]
+        expected = {(i, j) for i, j in combinations(range(len(sets)), 2)
+                    if sets[i] and sets[j] and jaccard(sets[i], sets[j]) >= DEFAULT_THRESHOLD}
+        self.assertTrue(expected)
+
+        lsh = MinHashLSH(DEFAULT_THRESHOLD)
+        found = set()
+        for j, token_set in enumerate(sets):
+            found.update((i, j) for i in lsh.query(token_set))
+            lsh.add(token_set)
+
+        # Candidates are verified exactly, so nothing below the threshold is returned
+        self.assertLessEqual(found, expected)
+        self.assertGreaterEqual(len(found) / len(expected), 0.99)
+
+    def test_dedup_mask_keeps_conflicting_labels(self):
+        texts = ["sistem informasi nilai siswa smk", "sistem informasi nilai siswa smk",
+                 "sistem informasi nilai siswa smk", "animasi karakter 3d"]
+        keep, stats = dedup_mask(texts, ["Software", "Software", "Jaringan", "Animasi"])
+        self.assertEqual(keep.tolist(), [True, False, True, True])
+        self.assertEqual(stats, {"threshold": DEFAULT_THRESHOLD, "clusters": 1, "removed": 1})
+
+
+class DedupTrainingTests(SimpleTestCase):
+    def test_train_with_dedup_drops_near_duplicates(self):
+        self.assertIsNone(views.parse_dedup({}))
+        self.assertEqual(views.parse_dedup({"dedup": "true", "dedup_threshold": "0.9"}), 0.9)
+        with self.assertRaises(ValueError):
+            views.parse_dedup({"dedup": True, "dedup_threshold": 1.5})
+
+        model = NaiveBayesModel()
+        tmp = Path(tempfile.mkdtemp())
+        model.model_path, model.vectorizer_path, model.selector_path = (
+            tmp / "model.pkl", tmp / "vectorizer.pkl", tmp / "selector.pkl")
+
+        model.train(str(DATA_CSV))
+        self.assertIsNone(model.dedup)
+        rows = model.model.class_count_.sum()
+
+        model.train(str(DATA_CSV), dedup_threshold=DEFAULT_THRESHOLD)
+        self.assertGreater(model.dedup["removed"], 0)
+        self.assertEqual(model.model.class_count_.sum(), rows - model.dedup["removed"])
+
+
+class PredictNearDuplicatesTests(FakeRedisMixin, SimpleTestCase):
+    def test_response_reports_count_once_index_is_built(self):
+        predictor = views.load_predictor("4.1.0")
+        preprocess = predictor.preprocessor or predictor.preprocess
+        judul = "Sistem Informasi Nilai Siswa SMK Negeri 1 Padang"
+        indexer = NearDuplicateIndexer(lambda version: [preprocess(judul), preprocess("animasi karakter 3d")])
+
+        def predict():
+            response = self.client.post("/api/predict/", {"judul": judul, "model_version": "4.1.0"},
+                                        content_type="application/json")
+            self.assertEqual(response.status_code, 200)
+            return response.json()["near_duplicates"]
+
+        with mock.patch.object(views, "near_duplicate_indexer", indexer):
+            # The build runs in the background: no count on the request that triggers it
+            self.assertIsNone(predict())
+            deadline = time.monotonic() + 10
+            while indexer.get(predictor.model, "4.1.0") is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(predict(), 1)
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from benchmark_scoring import TOLERANCE, reference_predict_batch
+from prediction.ml_model import NaiveBayesModel
+from prediction.model_manager import ModelManager
+
+API_DIR = Path(__file__).resolve().parents[2]
+
+# Keyword boosts for several classes, both Animasi boost levels (score 1 and >= 2) and an empty title
+BOOSTED_TITLES = [
+    "animasi 3d karakter game unity blender",
+    "pembuatan video animasi",
+    "sistem informasi akademik berbasis web",
+    "jaringan komputer mikrotik vpn keamanan",
+    "",
+]
+
+
+class ScoringKernelEquivalenceTests(SimpleTestCase):
+    """The kernel matches predict_proba + keyword/Animasi boost + renormalization on every shipped version"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.manager = ModelManager()
+        cls.titles = BOOSTED_TITLES + pd.read_csv(API_DIR / "data.csv").iloc[:, 0].astype(str).tolist()
+
+    def test_boost_titles_cover_both_animasi_levels(self):
+        predictor = NaiveBayesModel.from_model_data(self.manager.load_model("4.1.0"))
+        preprocess = predictor.preprocessor or predictor.preprocess
+        scores = [predictor.extract_animasi_features(preprocess(t))['animasi_total_score'] for t in BOOSTED_TITLES]
+        self.assertGreaterEqual(scores[0], 2)
+        self.assertEqual(scores[1], 1)
+
+    def test_every_shipped_version(self):
+        versions = [m['version'] for m in self.manager.list_models()]
+        self.assertIn("3.2.0", versions)  # CountVectorizer versions
+        self.assertIn("3.3.0", versions)
+
+        for version in versions:
+            with self.subTest(version=version):
+                predictor = NaiveBayesModel.from_model_data(self.manager.load_model(version))
+                expected = reference_predict_batch(predictor, self.titles)
+                actual = predictor.predict_batch(self.titles)
+
+                classes = list(predictor.model.classes_)
+                np.testing.assert_allclose(
+                    [[a['probabilities'][c] for c in classes] for a in actual],
+                    [[e['probabilities'][c] for c in classes] for e in expected],
+                    rtol=0, atol=TOLERANCE,
+                )
+                self.assertEqual([a['prediction'] for a in actual], [e['prediction'] for e in expected])
+
+
+class ExplainTests(SimpleTestCase):
+    def test_contributions_sum_to_centered_joint_log_likelihood(self):
+        predictor = NaiveBayesModel.from_model_data(ModelManager().load_model("4.1.0"))
+        preprocess = predictor.preprocessor or predictor.preprocess
+        texts = [preprocess(title) for title in BOOSTED_TITLES]
+        X = predictor.vectorizer.transform(texts)
+        kernel = predictor.scoring_kernel()
+        n_features = len(predictor.vectorizer.vocabulary_)
+
+        explanations = kernel.explain(X, texts, predictor.vectorizer, predictor.selector, top_k=n_features)
+        jll = kernel.joint_log_likelihood(X)
+        centered = jll - jll.mean(axis=1, keepdims=True)
+        log_boost = kernel.log_boost(texts)
+        for row, explanation in enumerate(explanations):
+            for i, cls in enumerate(kernel.classes):
+                with self.subTest(title=BOOSTED_TITLES[row], cls=cls):
+                    entry = explanation[cls]
+                    total = entry["log_prior"] + sum(f["contribution"] for f in entry["top_features"])
+                    self.assertAlmostEqual(total, centered[row, i], places=9)
+                    self.assertAlmostEqual(entry["keyword_log_boost"], log_boost[row, i], places=12)
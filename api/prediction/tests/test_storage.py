@@ -0,0 +1,57 @@
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from prediction.model_manager import ModelManager
+from prediction.storage import atomic_write_bytes
+
+
+class AtomicWriteTests(SimpleTestCase):
+    def test_concurrent_writers_of_one_path(self):
+        path = Path(tempfile.mkdtemp()) / "cache.npz"
+        contents = [bytes([i]) * 200_000 for i in range(4)]
+        errors = []
+
+        def write(data):
+            try:
+                for _ in range(20):
+                    atomic_write_bytes(path, data)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(data,)) for data in contents]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertIn(path.read_bytes(), contents)
+        self.assertEqual(list(path.parent.glob("*.tmp")), [])
+
+
+class SaveModelTests(SimpleTestCase):
+    def setUp(self):
+        self.manager = ModelManager()
+        self.manager.models_dir = Path(tempfile.mkdtemp())
+        patcher = mock.patch("prediction.model_manager.vectorizer_config", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_published_version_is_world_readable(self):
+        self.manager.save_model({"m": 1}, None, None, "9.0.0", {})
+        mode = stat.S_IMODE(self.manager.get_model_path("9.0.0").stat().st_mode)
+        self.assertEqual(mode, 0o755)
+
+    def test_does_not_replace_a_version_created_meanwhile(self):
+        target = self.manager.get_model_path("9.0.1")
+        # The empty directory appears after the up-front check, just before publishing
+        with mock.patch("prediction.model_manager.fsync_dir", side_effect=lambda path: target.mkdir(exist_ok=True)):
+            with self.assertRaises(FileExistsError):
+                self.manager.save_model({"m": 1}, None, None, "9.0.1", {})
+        self.assertEqual(list(target.iterdir()), [])
+        self.assertEqual(list(self.manager.models_dir.glob(".tmp-*")), [])
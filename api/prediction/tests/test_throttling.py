@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.test import AsyncClient, Client, SimpleTestCase, override_settings
+
+from prediction.tests.utils import FakeRedisMixin
+
+
+def rates(**overrides):
+    return {**settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], **overrides}}
+
+
+class NonDrfViewThrottleTests(FakeRedisMixin, SimpleTestCase):
+    """Views outside DRF's dispatch draw from the same Redis buckets"""
+
+    @override_settings(REST_FRAMEWORK=rates(predict="1/hour"))
+    async def test_async_predict_returns_429(self):
+        client = AsyncClient()
+        # Rejected input still costs a token, as in the DRF views
+        first = await client.post("/api/async/predict/", {"judul": ""}, content_type="application/json")
+        self.assertEqual(first.status_code, 400)
+
+        second = await client.post("/api/async/predict/", {"judul": ""}, content_type="application/json")
+        self.assertEqual(second.status_code, 429)
+        self.assertIn("Retry-After", second.headers)
+
+    @override_settings(REST_FRAMEWORK=rates(predict="100/hour", predict_session="1/hour"))
+    async def test_async_history_uses_session_bucket(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get("/api/async/history/", {"session_id": "s1"})).status_code, 200)
+        self.assertEqual((await client.get("/api/async/history/", {"session_id": "s1"})).status_code, 429)
+        self.assertEqual((await client.get("/api/async/history/", {"session_id": "s2"})).status_code, 200)
+
+    @override_settings(REST_FRAMEWORK=rates(predict="100/hour", predict_session="1/hour"))
+    def test_sync_history_uses_the_same_buckets(self):
+        client = Client()
+        self.assertEqual(client.get("/api/history/", {"session_id": "s1"}).status_code, 200)
+        self.assertEqual(client.get("/api/history/", {"session_id": "s1"}).status_code, 429)
+
+    @override_settings(REST_FRAMEWORK=rates(bulk="1/hour"))
+    def test_bulk_upload_has_its_own_scope(self):
+        client = Client()
+        self.assertEqual(client.post("/api/predict/bulk/", "x", content_type="text/plain").status_code, 415)
+        self.assertEqual(client.post("/api/predict/bulk/", "x", content_type="text/plain").status_code, 429)
@@ -0,0 +1,47 @@
+from unittest import mock
+
+import fakeredis
+from django.conf import settings
+
+from prediction import async_views, throttling, views
+from prediction.monitoring import PredictionMonitor
+from prediction.redis_client import ADD_HISTORY_LUA, RECORD_STATS_LUA
+
+
+class FakeRedisMixin:
+    """Point the throttles, history managers and background writers at one in-memory Redis per test"""
+
+    def setUp(self):
+        super().setUp()
+        server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+
+        bucket_client = fakeredis.FakeRedis(server=server)
+        self._patch(mock.patch.object(throttling, "get_token_bucket",
+                                      return_value=bucket_client.register_script(throttling.TOKEN_BUCKET_LUA)))
+
+        manager = views.history_manager
+        self._patch(mock.patch.object(manager, "client", self.redis))
+        self._patch(mock.patch.object(manager, "_add_script", None))
+        self._patch(mock.patch.object(manager, "_stats_script", None))
+
+        async_manager = async_views.async_history_manager
+        async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        self._patch(mock.patch.object(async_manager, "client", async_client))
+        self._patch(mock.patch.object(async_manager, "add_script", async_client.register_script(ADD_HISTORY_LUA)))
+        self._patch(mock.patch.object(async_manager, "stats_script", async_client.register_script(RECORD_STATS_LUA)))
+
+        # A fresh monitor bound to the fake (its queue may still flush after the test ends);
+        # shadow scoring is off, it would score with a second version on every prediction
+        if views.prediction_monitor is not None:
+            self._patch(mock.patch.object(views, "prediction_monitor", PredictionMonitor(
+                views.load_predictor, self.redis,
+                bucket_seconds=settings.MONITORING_BUCKET_SECONDS,
+                retention_buckets=settings.MONITORING_RETENTION_BUCKETS,
+            )))
+        if views.shadow_scorer is not None:
+            self._patch(mock.patch.object(views, "shadow_scorer", None))
+
+    def _patch(self, patcher):
+        patcher.start()
+        self.addCleanup(patcher.stop)
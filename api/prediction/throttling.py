@@ -0,0 +1,181 @@
+"""
+Redis-backed token-bucket throttles shared by every worker process.
+
+DRF's built-in throttles keep their history in Django's cache, which without a
+``CACHES`` setting is a per-process LocMem cache: each gunicorn worker enforces its
+own budget and restarts reset it. These throttles keep one bucket per client in Redis
+and check/consume it atomically with a Lua script, i.e. one round trip per request.
+
+A scope (``predict``, ``bulk``, ``analyze``, ``train``, ``anon`` for everything else) has a
+per-IP rate and optionally a per-``session_id`` rate, configured as DRF rate strings
+in ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]`` under ``<scope>`` and
+``<scope>_session``. A request must have a token in every bucket that applies to it.
+
+Views that are not DRF views (the streaming bulk upload, the async ASGI views) call
+``throttle_response`` themselves with the session_id they parsed.
+"""
+
+import os
+import threading
+from typing import Optional, Tuple
+import logging
+
+import redis
+from django.http import JsonResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+MAX_SESSION_ID_LENGTH = 128
+
+# KEYS: bucket hashes; ARGV: cost, then (capacity, refill tokens per ms) per key.
+# Returns {1, 0} when every bucket had a token (all consumed), else {0, ms until one is available}.
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local levels = {}
+local wait = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local level = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if level == nil or ts == nil then
+        level = capacity
+        ts = now
+    end
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    levels[i] = level
+    if level < cost then
+        wait = math.max(wait, math.ceil((cost - level) / rate))
+    end
+end
+if wait > 0 then
+    return {0, wait}
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', KEYS[i], 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate))
+end
+return {1, 0}
+"""
+
+_client = None
+_script = None
+_client_lock = threading.Lock()
+
+
+def get_token_bucket():
+    """Shared Redis client and registered Lua script (EVALSHA, re-loaded on NOSCRIPT)"""
+    global _client, _script
+    with _client_lock:
+        if _script is None:
+            # Connection is established lazily on first command, no ping at import time
+            _client = redis.Redis(
+                host=os.getenv('REDIS_HOST', 'localhost'),
+                port=int(os.getenv('REDIS_PORT', '6379')),
+                db=int(os.getenv('REDIS_DB', '0')),
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+            _script = _client.register_script(TOKEN_BUCKET_LUA)
+        return _script
+
+
+def valid_session_id(session_id) -> Optional[str]:
+    if isinstance(session_id, str) and 0 < len(session_id) <= MAX_SESSION_ID_LENGTH:
+        return session_id
+    return None
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[int, float]]:
+    """DRF rate string ("100/hour") -> (capacity, refill tokens per millisecond)"""
+    if not rate:
+        return None
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / (PERIODS[period[0]] * 1000)
+
+
+class RedisRateThrottle(BaseThrottle):
+    """Token bucket per client IP (and per session_id when a session rate is set) for one scope"""
+
+    scope = 'anon'
+
+    def __init__(self):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        self.ip_rate = parse_rate(rates.get(self.scope))
+        self.session_rate = parse_rate(rates.get(f"{self.scope}_session"))
+        self.wait_seconds = None
+
+    def get_session_id(self, request) -> Optional[str]:
+        session_id = request.query_params.get('session_id')
+        if session_id is None and request.method == 'POST':
+            try:
+                session_id = request.data.get('session_id')
+            except Exception:
+                # Unparseable bodies are rejected by the view itself
+                session_id = None
+        return valid_session_id(session_id)
+
+    def allow_request(self, request, view):
+        return self.consume(self.get_ident(request), self.get_session_id(request))
+
+    def consume(self, ident: str, session_id: Optional[str] = None) -> bool:
+        """Take one token from the client's IP bucket and, if any, its session bucket"""
+        keys, args = [], [1]
+        if self.ip_rate:
+            keys.append(f"throttle:{self.scope}:ip:{ident}")
+            args.extend(self.ip_rate)
+        if self.session_rate:
+            if session_id:
+                keys.append(f"throttle:{self.scope}:session:{session_id}")
+                args.extend(self.session_rate)
+        if not keys:
+            return True
+
+        try:
+            allowed, wait_ms = get_token_bucket()(keys=keys, args=args)
+        except redis.RedisError as e:
+            # Fail open: an unavailable Redis must not take the API down with it
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return True
+
+        self.wait_seconds = int(wait_ms) / 1000
+        return bool(allowed)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class PredictRateThrottle(RedisRateThrottle):
+    scope = 'predict'
+
+
+class BulkRateThrottle(RedisRateThrottle):
+    scope = 'bulk'
+
+
+class AnalyzeRateThrottle(RedisRateThrottle):
+    scope = 'analyze'
+
+
+class TrainRateThrottle(RedisRateThrottle):
+    scope = 'train'
+
+
+def throttle_response(throttle: RedisRateThrottle, request, session_id=None) -> Optional[JsonResponse]:
+    """DRF-style 429 for a plain Django view when the client is out of tokens, else None"""
+    if throttle.consume(throttle.get_ident(request), valid_session_id(session_id)):
+        return None
+    exc = Throttled(throttle.wait())
+    response = JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+    response["Retry-After"] = "%d" % exc.wait
+    return response
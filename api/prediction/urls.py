@@ -1,13 +1,24 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path("predict/", views.predict_kbk, name="predict_kbk"),
+    path("predict/bulk/", views.predict_bulk, name="predict_bulk"),
+    path("predict/compare/", views.compare_models, name="compare_models"),
     path("train/", views.train_model, name="train_model"),
     path("analyze/", views.analyze_model, name="analyze_model"),
+    path("analyze/nb/", views.analyze_naive_bayes, name="analyze_naive_bayes"),
     path("models/", views.list_models, name="list_models"),
+    path("models/activate/", views.activate_model, name="activate_model"),
+    path("models/memory/", views.models_memory, name="models_memory"),
+    path("models/shadow/", views.shadow_report, name="shadow_report"),
+    path("monitoring/", views.monitoring, name="monitoring"),
+    path("stats/", views.usage_stats, name="usage_stats"),
     path("history/", views.get_history, name="get_history"),
     path("history/clear/", views.clear_history, name="clear_history"),
     path("history/<str:history_id>/", views.delete_history_item, name="delete_history_item"),
     path("health/", views.health_check, name="health_check"),
+    # Native async variants, served by the ASGI (uvicorn) workers
+    path("async/predict/", async_views.predict_kbk, name="async_predict_kbk"),
+    path("async/history/", async_views.get_history, name="async_get_history"),
 ]
@@ -1,28 +1,242 @@
-from rest_framework.decorators import api_view, throttle_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.throttling import AnonRateThrottle
 from .ml_model import NaiveBayesModel, ModelNotLoadedError
-from .model_manager import ModelManager
-from .redis_client import RedisHistoryManager
+from .model_manager import ModelManager, ModelIntegrityError
+from .redis_client import MAX_PAGE_SIZE, MAX_TOP_TITLES, RedisHistoryManager, parse_cursor
+from .bulk import csv_chunk, csv_header, iter_csv, iter_ndjson, ndjson_chunk, score_records
+from .coalescer import PredictionCoalescer
+from .compare import compare_versions
+from .nb_diagnostics import naive_bayes_diagnostics
+from .monitoring import PredictionMonitor
+from .near_duplicates import DEFAULT_THRESHOLD as DEDUP_DEFAULT_THRESHOLD, NearDuplicateIndexer, tokens
+from .shadow import ShadowScorer
+from .scoring import EXPLAIN_DEFAULT_TOP_K, EXPLAIN_MAX_TOP_K
+from .permissions import HasAdminToken
+from .throttling import (
+    AnalyzeRateThrottle, BulkRateThrottle, PredictRateThrottle, TrainRateThrottle, throttle_response,
+)
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
 import logging
 import threading
+import time
 
 logger = logging.getLogger(__name__)
 model = NaiveBayesModel()
+legacy_model = NaiveBayesModel()  # Fallback for predictions when no versioned model exists
 model_manager = ModelManager()
 history_manager = RedisHistoryManager()
 training_lock = threading.Lock()
 
-# Migrate legacy model on startup
-try:
-    model_manager.migrate_legacy_model()
-except Exception as e:
-    logger.warning(f"Legacy model migration skipped: {e}")
+COMPARE_MAX_TITLES = 100
+COMPARE_MAX_VERSIONS = 10
+# Per-version transforms/scoring of /api/predict/compare/ run concurrently on this pool
+compare_executor = ThreadPoolExecutor(
+    max_workers=settings.PREDICTION_THREAD_POOL_SIZE,
+    thread_name_prefix="compare",
+)
+
+BULK_INPUT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def resolve_predictor(model_version=None):
+    """Predictor for the given (or active) version, returns (predictor, resolved_version)"""
+    if model_version:
+        model_data = model_manager.load_model(model_version)
+    else:
+        active = model_manager.get_active()
+        if not active:
+            # Fallback to legacy model
+            return legacy_model, "legacy"
+        # In-flight calls keep this (version, model_data) pair even if a swap happens meanwhile
+        model_version, model_data = active
+
+    # A fresh predictor per call: the shared cached model objects are only read
+    return NaiveBayesModel.from_model_data(model_data), model_version
+
+
+def score_titles(judul_list, model_version=None, explain_top_k=None):
+    """Score titles with the given (or active) version, returns (results, resolved_version)
+
+    Once the version's near-duplicate index is built, each result also carries
+    ``near_duplicates``, looked up with the title preprocessed for scoring.
+    """
+    predictor, model_version = resolve_predictor(model_version)
+    index = None
+    if near_duplicate_indexer is not None and model_version != "legacy":
+        index = near_duplicate_indexer.get(predictor.model, model_version)
+    if index is None:
+        return predictor.predict_batch(judul_list, explain_top_k), model_version
+
+    preprocess_fn = predictor.preprocessor or predictor.preprocess
+    judul_clean_list = [preprocess_fn(judul) for judul in judul_list]
+    results = predictor.predict_preprocessed(judul_clean_list, explain_top_k)
+    for result, judul_clean in zip(results, judul_clean_list):
+        result["near_duplicates"] = len(index.query(tokens(judul_clean)))
+    return results, model_version
+
+
+def parse_explain(data):
+    """top_k for an opt-in ``explain`` request (None when not requested); raises ValueError"""
+    explain = data.get("explain", False)
+    if isinstance(explain, str):
+        explain = explain.lower() in ("1", "true", "yes")
+    if not explain:
+        return None
+    top_k = data.get("top_k", EXPLAIN_DEFAULT_TOP_K)
+    if isinstance(top_k, bool):
+        raise ValueError("top_k must be an integer")
+    try:
+        top_k = int(top_k)
+    except (TypeError, ValueError):
+        raise ValueError("top_k must be an integer")
+    if not 1 <= top_k <= EXPLAIN_MAX_TOP_K:
+        raise ValueError(f"top_k must be between 1 and {EXPLAIN_MAX_TOP_K}")
+    return top_k
+
+
+def parse_time(value: str) -> datetime:
+    """ISO 8601 or epoch seconds; raises ValueError"""
+    try:
+        return datetime.fromtimestamp(float(value))
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+
+def parse_history_query(params):
+    """query_history() keyword arguments from GET parameters; raises ValueError"""
+    try:
+        limit = int(params.get("limit", 50))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    # Larger pages are capped, as before the cursor API existed
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = params.get("cursor")
+    if cursor:
+        try:
+            cursor = parse_cursor(cursor)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+
+    query = {
+        "limit": limit,
+        "cursor": cursor or None,
+        "predicted_kbk": params.get("predicted_kbk") or None,
+        "model_version": params.get("model_version") or None,
+    }
+    for name in ("since", "until"):
+        value = params.get(name)
+        if value:
+            try:
+                query[name] = parse_time(value)
+            except (ValueError, OverflowError, OSError):
+                raise ValueError(f"{name} must be an ISO 8601 datetime or epoch seconds")
+    return query
+
+
+def parse_dedup(data):
+    """Jaccard threshold for an opt-in training ``dedup`` (None when not requested); raises ValueError"""
+    dedup = data.get("dedup", False)
+    if isinstance(dedup, str):
+        dedup = dedup.lower() in ("1", "true", "yes")
+    if not dedup:
+        return None
+    threshold = data.get("dedup_threshold", DEDUP_DEFAULT_THRESHOLD)
+    try:
+        threshold = float(threshold)
+    except (TypeError, ValueError):
+        raise ValueError("dedup_threshold must be a number")
+    if not 0 < threshold <= 1:
+        raise ValueError("dedup_threshold must be in (0, 1]")
+    return threshold
+
+
+def with_explanation(response_data, result):
+    """Response body plus the result's explanation, if any (history keeps the plain prediction)"""
+    if "explanation" not in result:
+        return response_data
+    return {**response_data, "explanation": result["explanation"]}
+
+
+prediction_coalescer = None
+if settings.PREDICTION_COALESCING:
+    prediction_coalescer = PredictionCoalescer(
+        score_titles,
+        max_wait_ms=settings.PREDICTION_COALESCE_MAX_WAIT_MS,
+        max_batch_size=settings.PREDICTION_COALESCE_MAX_BATCH_SIZE,
+    )
+
+shadow_scorer = None
+if settings.SHADOW_MODEL_VERSION:
+    shadow_scorer = ShadowScorer(
+        settings.SHADOW_MODEL_VERSION,
+        model_manager.load_model,
+        history_manager.client,
+        max_queue=settings.SHADOW_QUEUE_SIZE,
+        batch_size=settings.SHADOW_BATCH_SIZE,
+        max_wait_ms=settings.SHADOW_MAX_WAIT_MS,
+    )
+
+
+def load_predictor(model_version):
+    """Predictor of a resolved version as reported in responses (including "legacy")"""
+    if model_version == "legacy":
+        return legacy_model
+    return resolve_predictor(model_version)[0]
+
+
+prediction_monitor = None
+if settings.MONITORING_ENABLED:
+    prediction_monitor = PredictionMonitor(
+        load_predictor,
+        history_manager.client,
+        bucket_seconds=settings.MONITORING_BUCKET_SECONDS,
+        retention_buckets=settings.MONITORING_RETENTION_BUCKETS,
+        max_queue=settings.MONITORING_QUEUE_SIZE,
+        batch_size=settings.MONITORING_BATCH_SIZE,
+        max_wait_ms=settings.MONITORING_MAX_WAIT_MS,
+    )
+
+
+def load_training_titles(model_version):
+    """Preprocessed training titles of a version (None when its dataset is unknown)"""
+    dataset_hash = model_manager.get_dataset_hash(model_version)
+    if dataset_hash is None:
+        return None
+    predictor = load_predictor(model_version)
+    df = model_manager.dataset_store.load(dataset_hash)
+    return predictor._prepare_corpus(dataset_hash, df, predictor.preprocessing)[0]
+
+
+near_duplicate_indexer = None
+if settings.NEAR_DUPLICATE_THRESHOLD:
+    near_duplicate_indexer = NearDuplicateIndexer(load_training_titles, settings.NEAR_DUPLICATE_THRESHOLD)
+
+
+def observe_prediction(judul, model_version, result, latency_ms):
+    """Hand a served /api/predict/ result to the background monitor and shadow scorer"""
+    if prediction_monitor is not None:
+        prediction_monitor.observe(judul, model_version, result)
+    if shadow_scorer is not None:
+        shadow_scorer.offer_prediction(judul, model_version, result["prediction"], latency_ms)
 
 
 @api_view(["POST"])
-@throttle_classes([AnonRateThrottle])
+@throttle_classes([PredictRateThrottle])
 def predict_kbk(request):
     judul = request.data.get("judul", "")
     model_version = request.data.get("model_version")  # Optional
@@ -35,43 +249,46 @@ def predict_kbk(request):
         return Response({"error": "Judul must be a string"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        # Use specified version or latest
-        if not model_version:
-            model_version = model_manager.get_latest_version()
-            if not model_version:
-                # Fallback to legacy model
-                result = model.predict(judul)
-                response_data = {
-                    "judul": judul,
-                    "predicted_kbk": result["prediction"],
-                    "probabilities": result["probabilities"],
-                    "model_version": "legacy"
-                }
-                return Response(response_data)
-        
-        # Load versioned model
-        model_data = model_manager.load_model(model_version)
-        model.model = model_data['model']
-        model.vectorizer = model_data['vectorizer']
-        model.selector = model_data['selector']
-        
-        result = model.predict(judul)
+        explain_top_k = parse_explain(request.data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start = time.perf_counter()
+        # Use specified version or latest, batched with concurrent requests when coalescing is on
+        if explain_top_k:
+            # Explanations are opt-in and scored directly, outside the coalesced batches
+            results, model_version = score_titles([judul], model_version, explain_top_k)
+            result = results[0]
+        elif prediction_coalescer is not None:
+            future = prediction_coalescer.submit(judul, model_version)
+            try:
+                result, model_version = future.result(timeout=settings.PREDICTION_COALESCE_TIMEOUT_S)
+            except FutureTimeoutError:
+                future.cancel()
+                logger.error("Coalesced prediction timed out")
+                return Response({"error": "Prediction timed out"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        else:
+            results, model_version = score_titles([judul], model_version)
+            result = results[0]
+
+        observe_prediction(judul, model_version, result, (time.perf_counter() - start) * 1000)
         
         response_data = {
             "judul": judul,
             "predicted_kbk": result["prediction"],
             "probabilities": result["probabilities"],
-            "model_version": model_version
+            "model_version": model_version,
+            "near_duplicates": result.get("near_duplicates")
         }
-        
         # Save to history if session_id provided
-        if session_id:
+        if session_id and model_version != "legacy":
             try:
                 history_manager.add_history(session_id, response_data)
             except Exception as e:
                 logger.warning(f"Failed to save history: {e}")
         
-        return Response(response_data)
+        return Response(with_explanation(response_data, result))
         
     except FileNotFoundError as e:
         logger.error(f"Model not found: {e}")
@@ -79,13 +296,142 @@ def predict_kbk(request):
     except ModelNotLoadedError:
         logger.error("Model not loaded")
         return Response({"error": "Model not available"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except ModelIntegrityError as e:
+        logger.error(f"Model integrity check failed: {e}")
+        return Response({"error": "Model files failed integrity check"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         return Response({"error": "An error occurred during prediction"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(["POST"])
+@throttle_classes([PredictRateThrottle])
+def compare_models(request):
+    """Score a title (or a batch) with several versions: per-title version x class matrix plus agreement"""
+    judul = request.data.get("judul")
+    judul_list = request.data.get("titles", [judul] if judul else None)
+    versions = request.data.get("versions")
+    
+    if not judul_list or not isinstance(judul_list, list) or not all(isinstance(j, str) and j for j in judul_list):
+        return Response({"error": "judul (or a list of titles) is required"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(judul_list) > COMPARE_MAX_TITLES:
+        return Response(
+            {"error": f"At most {COMPARE_MAX_TITLES} titles per request, use /api/predict/bulk/ for more"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not versions or not isinstance(versions, list) or not all(isinstance(v, str) and v for v in versions):
+        return Response(
+            {"error": "versions (a list of model versions) is required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    versions = list(dict.fromkeys(versions))
+    if len(versions) > COMPARE_MAX_VERSIONS:
+        return Response(
+            {"error": f"At most {COMPARE_MAX_VERSIONS} versions per request"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        loaded = [(version, model_manager.load_model(version)) for version in versions]
+        return Response(compare_versions(judul_list, loaded, compare_executor))
+    except FileNotFoundError as e:
+        logger.error(f"Model not found: {e}")
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except ModelIntegrityError as e:
+        logger.error(f"Model integrity check failed: {e}")
+        return Response({"error": "Model files failed integrity check"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as e:
+        logger.error(f"Comparison error: {e}")
+        return Response({"error": "An error occurred during comparison"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def streaming_content(iterator, request):
+    """Serve a sync generator chunk by chunk under both WSGI and ASGI
+
+    Under ASGI Django would drain a sync iterator into a list before sending anything,
+    so each chunk is pulled in a worker thread through an async generator instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return iterator
+
+    async def stream():
+        done = object()
+        while True:
+            part = await sync_to_async(next, thread_sensitive=False)(iterator, done)
+            if part is done:
+                break
+            yield part
+
+    return stream()
+
+
+@csrf_exempt
+@require_POST
+def predict_bulk(request):
+    """Classify an NDJSON or CSV upload, streaming results as they are scored
+
+    The body is read line by line and scored in chunks of BULK_PREDICTION_CHUNK_SIZE
+    titles with a single model version (``?model_version=``, else the active one), so
+    memory stays flat for any upload size. ``?format=csv`` returns CSV instead of NDJSON.
+    """
+    throttled = throttle_response(BulkRateThrottle(), request, request.GET.get("session_id"))
+    if throttled:
+        return throttled
+    
+    input_format = request.GET.get("input") or BULK_INPUT_FORMATS.get(request.content_type)
+    output_format = request.GET.get("format", "ndjson")
+    
+    if input_format not in ("ndjson", "csv"):
+        return JsonResponse(
+            {"error": "Upload NDJSON (application/x-ndjson) or CSV (text/csv)"},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        )
+    if output_format not in ("ndjson", "csv"):
+        return JsonResponse({"error": "format must be ndjson or csv"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        predictor, model_version = resolve_predictor(request.GET.get("model_version"))
+        if model_version == "legacy" and not legacy_model.model and not legacy_model.load():
+            raise ModelNotLoadedError("Model not trained yet")
+    except FileNotFoundError as e:
+        logger.error(f"Model not found: {e}")
+        return JsonResponse({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except ModelNotLoadedError:
+        logger.error("Model not loaded")
+        return JsonResponse({"error": "Model not available"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except ModelIntegrityError as e:
+        logger.error(f"Model integrity check failed: {e}")
+        return JsonResponse({"error": "Model files failed integrity check"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    records = iter_ndjson(request) if input_format == "ndjson" else iter_csv(request)
+    encode = ndjson_chunk if output_format == "ndjson" else csv_chunk
+    
+    def body():
+        if output_format == "csv":
+            yield csv_header()
+        try:
+            for chunk in score_records(predictor, records, settings.BULK_PREDICTION_CHUNK_SIZE):
+                yield encode(chunk)
+        except Exception as e:
+            # Headers are already sent: report the failure as a final record
+            logger.error(f"Bulk prediction error: {e}")
+            yield encode([{"error": "An error occurred during prediction"}])
+    
+    response = StreamingHttpResponse(
+        streaming_content(body(), request),
+        content_type="application/x-ndjson" if output_format == "ndjson" else "text/csv",
+    )
+    response["X-Model-Version"] = model_version
+    return response
+
+
+@api_view(["POST"])
+@throttle_classes([TrainRateThrottle])
 def train_model(request):
+    try:
+        dedup_threshold = parse_dedup(request.data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     try:
         from pathlib import Path
 
@@ -96,10 +442,10 @@ def train_model(request):
 
         with training_lock:
             # Train model
-            model.train(str(csv_path))
+            model.train(str(csv_path), dedup_threshold=dedup_threshold)
             
-            # Get analysis for metadata
-            analysis = model.analyze_model(str(csv_path))
+            # Get analysis for metadata (only the sections the metadata uses)
+            analysis = model.analyze_model(str(csv_path), sections=['summary', 'performance'])
             
             # Calculate next version
             new_version = model_manager.get_next_version(bump_type)
@@ -111,7 +457,10 @@ def train_model(request):
                 'accuracy': analysis['performance']['train_accuracy'],
                 'cv_accuracy': analysis['performance']['cv_mean_accuracy'],
                 'overfitting_score': analysis['model_health']['overfitting_score'],
-                'total_samples': analysis['total_samples']
+                'total_samples': analysis['total_samples'],
+                'dataset_hash': model_manager.dataset_store.put_file(csv_path),
+                'preprocessing': model.preprocessing,
+                'dedup': model.dedup
             }
             
             model_manager.save_model(
@@ -139,12 +488,19 @@ def train_model(request):
 
 
 @api_view(["GET"])
+@throttle_classes([AnalyzeRateThrottle])
 def analyze_model(request):
     try:
         from pathlib import Path
+        from .analysis import parse_sections  # Analysis machinery loads on first use
 
         csv_path = Path(__file__).parent.parent / "data.csv"
+
         model_version = request.query_params.get("model_version")
+        try:
+            sections = parse_sections(request.query_params.get("sections"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Load specific version if requested
         if model_version:
@@ -152,13 +508,19 @@ def analyze_model(request):
             model.model = model_data['model']
             model.vectorizer = model_data['vectorizer']
             model.selector = model_data['selector']
+            model.set_preprocessing(model_data['preprocessing'])
+            model.dedup = (model_manager.get_metadata(model_version) or {}).get('dedup')
 
-        analysis = model.analyze_model(str(csv_path), model_version=model_version)
+        analysis = model.analyze_model(str(csv_path), model_version=model_version, sections=sections)
         analysis['model_version'] = model_version or 'current'
+        analysis['sections'] = sections
         return Response(analysis)
     except FileNotFoundError as e:
         logger.error(f"Model or data not found: {e}")
         return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except ModelIntegrityError as e:
+        logger.error(f"Model integrity check failed: {e}")
+        return Response({"error": "Model files failed integrity check"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except ModelNotLoadedError:
         logger.error("Model not loaded for analysis")
         return Response(
@@ -169,6 +531,44 @@ def analyze_model(request):
         return Response({"error": "An error occurred during analysis"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(["GET"])
+@throttle_classes([AnalyzeRateThrottle])
+def analyze_naive_bayes(request):
+    """Model-only NB diagnostics (priors, smoothing, zero-prob features, pairwise KL), no dataset pass"""
+    model_version = request.query_params.get("model_version")
+    
+    try:
+        if model_version:
+            estimator = model_manager.load_model(model_version)['model']
+        else:
+            if not model.model and not model.load():
+                raise ModelNotLoadedError("Model not trained yet")
+            estimator = model.model
+        
+        diagnostics = naive_bayes_diagnostics(estimator)
+        return Response({
+            "model_version": model_version or 'current',
+            "classes": estimator.classes_.tolist(),
+            "n_features": int(estimator.feature_count_.shape[1]),
+            "alpha": float(estimator.alpha),
+            "naive_bayes_specific": diagnostics,
+        })
+    except FileNotFoundError as e:
+        logger.error(f"Model not found: {e}")
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except ModelIntegrityError as e:
+        logger.error(f"Model integrity check failed: {e}")
+        return Response({"error": "Model files failed integrity check"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except ModelNotLoadedError:
+        logger.error("Model not loaded for analysis")
+        return Response(
+            {"error": "Model not available. Please train the model first."}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    except Exception as e:
+        logger.error(f"NB analysis error: {e}")
+        return Response({"error": "An error occurred during analysis"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(["GET"])
 def list_models(request):
     """List all available model versions"""
@@ -177,28 +577,119 @@ def list_models(request):
         return Response({
             "models": models,
             "total": len(models),
-            "latest": model_manager.get_latest_version()
+            "latest": model_manager.get_latest_version(),
+            "active": model_manager.get_active_version()
         })
     except Exception as e:
         logger.error(f"Error listing models: {e}")
         return Response({"error": "Failed to list models"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(["POST"])
+@permission_classes([HasAdminToken])
+@throttle_classes([TrainRateThrottle])
+def activate_model(request):
+    """Promote (or roll back to) a model version for all workers without a restart"""
+    version = request.data.get("version")
+    
+    if not version or not isinstance(version, str):
+        return Response({"error": "version is required"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        previous = model_manager.activate_version(version)
+        return Response({
+            "message": "Model activated",
+            "active": version,
+            "previous": previous
+        })
+    except FileNotFoundError as e:
+        logger.error(f"Model not found: {e}")
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error activating model: {e}")
+        return Response({"error": "Failed to activate model"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+def models_memory(request):
+    """Report per-version model memory (shared store vs. this worker's private copy)"""
+    try:
+        return Response(model_manager.memory_report())
+    except Exception as e:
+        logger.error(f"Error building memory report: {e}")
+        return Response({"error": "Failed to build memory report"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+def shadow_report(request):
+    """Agreement, class flips and latency delta of the shadow candidate vs. live traffic"""
+    if shadow_scorer is None:
+        return Response({"enabled": False})
+    try:
+        return Response({"enabled": True, **shadow_scorer.report()})
+    except Exception as e:
+        logger.error(f"Error building shadow report: {e}")
+        return Response({"error": "Failed to build shadow report"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+def monitoring(request):
+    """Class distribution, confidence histogram and OOV rate of live predictions per version"""
+    if prediction_monitor is None:
+        return Response({"enabled": False})
+    versions = [v for v in request.query_params.get("model_version", "").split(",") if v]
+    try:
+        buckets = int(request.query_params.get("buckets", 24))
+    except ValueError:
+        return Response({"error": "buckets must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response({"enabled": True, **prediction_monitor.report(versions, buckets)})
+    except Exception as e:
+        logger.error(f"Error building monitoring report: {e}")
+        return Response({"error": "Failed to build monitoring report"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(["GET"])
+def usage_stats(request):
+    """Predictions per class/version/day, unique sessions and popular titles across all sessions"""
+    try:
+        days = int(request.query_params.get("days", 7))
+        top = int(request.query_params.get("top", 10))
+    except ValueError:
+        return Response({"error": "days and top must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= days <= history_manager.stats_retention_days:
+        return Response({"error": f"days must be between 1 and {history_manager.stats_retention_days}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= top <= MAX_TOP_TITLES:
+        return Response({"error": f"top must be between 1 and {MAX_TOP_TITLES}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(history_manager.get_stats(days, top))
+    except Exception as e:
+        logger.error(f"Error getting usage stats: {e}")
+        return Response({"error": "Failed to get usage stats"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+@throttle_classes([PredictRateThrottle])
 def get_history(request):
-    """Get prediction history for session"""
+    """Get one page of prediction history for session, optionally filtered"""
     session_id = request.query_params.get("session_id")
     
     if not session_id:
         return Response({"error": "session_id is required"}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        limit = int(request.query_params.get("limit", 50))
-        history = history_manager.get_history(session_id, limit)
+        query = parse_history_query(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        history, next_cursor = history_manager.query_history(session_id, **query)
         return Response({
             "session_id": session_id,
             "history": history,
-            "count": len(history)
+            "count": len(history),
+            "next_cursor": next_cursor
         })
     except Exception as e:
         logger.error(f"Error getting history: {e}")
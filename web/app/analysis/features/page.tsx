@@ -28,7 +28,7 @@ export default function FeaturesPage() {
   useEffect(() => {
     const fetchData = async () => {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-      const response = await fetch(`${apiUrl}/api/analyze/`);
+      const response = await fetch(`${apiUrl}/api/analyze/?sections=features,naive_bayes`);
       const result = await response.json();
       setData(result);
     };
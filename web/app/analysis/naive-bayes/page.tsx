@@ -21,7 +21,7 @@ export default function NaiveBayesPage() {
   useEffect(() => {
     const fetchData = async () => {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-      const response = await fetch(`${apiUrl}/api/analyze/`);
+      const response = await fetch(`${apiUrl}/api/analyze/?sections=naive_bayes,overlap,misclassification`);
       const result = await response.json();
       setData(result);
     };
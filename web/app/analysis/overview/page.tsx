@@ -73,7 +73,7 @@ export default function OverviewPage() {
         setModelMetadata(currentModel);
         
         // Try to fetch analysis
-        const response = await fetch(`${apiUrl}/api/analyze/?model_version=${selectedModel}`);
+        const response = await fetch(`${apiUrl}/api/analyze/?model_version=${selectedModel}&sections=summary,performance,overlap,independence,learning_curve`);
         const result = await response.json();
         
         if (!result.error) {
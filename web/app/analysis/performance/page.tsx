@@ -34,7 +34,7 @@ export default function PerformancePage() {
       setLoading(true);
       try {
         const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-        const response = await fetch(`${apiUrl}/api/analyze/?model_version=${selectedModel}`);
+        const response = await fetch(`${apiUrl}/api/analyze/?model_version=${selectedModel}&sections=performance,confusion`);
         const result = await response.json();
         
         if (!result.error && result.performance) {
@@ -98,7 +98,7 @@ export default function Home() {
   const fetchAnalysis = async (version: string) => {
     try {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-      const response = await fetch(`${apiUrl}/api/analyze/?model_version=${version}`);
+      const response = await fetch(`${apiUrl}/api/analyze/?model_version=${version}&sections=summary,performance`);
       const data = await response.json();
       setAnalysis(data);
     } catch (error) {
@@ -11,6 +11,9 @@ interface HistoryItem {
   model_version: string;
 }
 
+const PAGE_SIZE = 20;
+const KBK_OPTIONS = ['Software', 'Jaringan', 'AI / Machine Learning', 'Animasi'];
+
 interface HistoryPanelProps {
   sessionId: string;
   onSelectItem: (item: HistoryItem) => void;
@@ -20,22 +23,29 @@ export default function HistoryPanel({ sessionId, onSelectItem }: HistoryPanelPr
   const [history, setHistory] = useState<HistoryItem[]>([]);
   const [loading, setLoading] = useState(false);
   const [isOpen, setIsOpen] = useState(false);
+  const [kbkFilter, setKbkFilter] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   useEffect(() => {
     if (sessionId && isOpen) {
       fetchHistory();
     }
-  }, [sessionId, isOpen]);
+  }, [sessionId, isOpen, kbkFilter]);
 
-  const fetchHistory = async () => {
+  const fetchHistory = async (cursor?: string) => {
     if (!sessionId) return;
     
     setLoading(true);
     try {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-      const response = await fetch(`${apiUrl}/api/history/?session_id=${sessionId}`);
+      const params = new URLSearchParams({ session_id: sessionId, limit: String(PAGE_SIZE) });
+      if (kbkFilter) params.set('predicted_kbk', kbkFilter);
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${apiUrl}/api/history/?${params}`);
       const data = await response.json();
-      setHistory(data.history || []);
+      const page: HistoryItem[] = data.history || [];
+      setHistory(cursor ? (prev) => [...prev, ...page] : page);
+      setNextCursor(data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching history:', error);
     } finally {
@@ -54,6 +64,7 @@ export default function HistoryPanel({ sessionId, onSelectItem }: HistoryPanelPr
         body: JSON.stringify({ session_id: sessionId })
       });
       setHistory([]);
+      setNextCursor(null);
     } catch (error) {
       console.error('Error clearing history:', error);
     }
@@ -103,8 +114,21 @@ export default function HistoryPanel({ sessionId, onSelectItem }: HistoryPanelPr
               </button>
             </div>
 
+            <div className="px-6 pt-4">
+              <select
+                value={kbkFilter}
+                onChange={(e) => setKbkFilter(e.target.value)}
+                className="w-full border border-gray-200 rounded-xl px-4 py-2 text-gray-700 focus:outline-none focus:border-orange-400"
+              >
+                <option value="">Semua KBK</option>
+                {KBK_OPTIONS.map((kbk) => (
+                  <option key={kbk} value={kbk}>{kbk}</option>
+                ))}
+              </select>
+            </div>
+
             <div className="flex-1 overflow-y-auto p-6">
-              {loading ? (
+              {loading && history.length === 0 ? (
                 <div className="text-center py-8 text-gray-500">Loading...</div>
               ) : history.length === 0 ? (
                 <div className="text-center py-8 text-gray-500">
@@ -150,6 +174,15 @@ export default function HistoryPanel({ sessionId, onSelectItem }: HistoryPanelPr
                       </div>
                     </div>
                   ))}
+                  {nextCursor && (
+                    <button
+                      onClick={() => fetchHistory(nextCursor)}
+                      disabled={loading}
+                      className="w-full border border-orange-300 text-orange-600 py-2 rounded-xl font-semibold hover:bg-orange-50 transition-all disabled:opacity-50"
+                    >
+                      {loading ? 'Loading...' : 'Muat lagi'}
+                    </button>
+                  )}
                 </div>
               )}
             </div>